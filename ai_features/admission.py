@@ -0,0 +1,175 @@
+"""
+Admission control for the model-backed services.
+
+Every model gets a fixed number of concurrency slots and a bounded queue of
+callers waiting for one. When the queue is full, or a caller has waited
+longer than ADMISSION_MAX_WAIT_SECONDS, Overloaded is raised and the view
+answers 429 with a Retry-After estimated from recent service times, so a
+burst is turned away instead of oversubscribing the CPU. State is per
+process; with several gunicorn workers each one admits its own share.
+"""
+import math
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a model has no free slot and its wait queue is full."""
+
+    def __init__(self, model, retry_after):
+        super().__init__(f"{model} is at capacity, retry in {retry_after}s")
+        self.model = model
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency slots and a bounded wait queue for one model."""
+
+    def __init__(self, name, slots, max_queue, max_wait):
+        self.name = name
+        self.slots = slots
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.service_seconds = None
+        self.wait_seconds = 0.0
+        self._cond = threading.Condition()
+
+    def check(self):
+        """Raise Overloaded right away if a new caller would be turned away."""
+        with self._cond:
+            if self._queue_full():
+                self.rejected += 1
+                raise Overloaded(self.name, self._retry_after())
+
+    @contextmanager
+    def slot(self, blocking=False):
+        """Hold one of the model's slots for the duration of the block.
+
+        With `blocking` the caller waits for a slot however long the queue
+        is; background jobs use this because they are already queued.
+        """
+        self._acquire(blocking)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self.active -= 1
+                self.service_seconds = self._ewma(self.service_seconds, elapsed)
+                self._cond.notify()
+
+    def _acquire(self, blocking):
+        with self._cond:
+            if not blocking and self._queue_full():
+                self.rejected += 1
+                raise Overloaded(self.name, self._retry_after())
+
+            queued = time.monotonic()
+            deadline = None if blocking else queued + self.max_wait
+            self.waiting += 1
+            try:
+                while self.active >= self.slots:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected += 1
+                        logger.warning(f"Gave up waiting for a {self.name} slot after {self.max_wait}s")
+                        raise Overloaded(self.name, self._retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+            self.wait_seconds = self._ewma(self.wait_seconds, time.monotonic() - queued)
+
+    def _queue_full(self):
+        return self.active >= self.slots and self.waiting >= self.max_queue
+
+    def _retry_after(self):
+        """Seconds until a new caller would likely get a slot, from the average service time."""
+        if self.service_seconds is None:
+            return 1
+        ahead = self.waiting + self.active - self.slots + 1
+        return max(1, math.ceil(ahead / self.slots * self.service_seconds))
+
+    @staticmethod
+    def _ewma(current, value):
+        return value if current is None else current + EWMA_ALPHA * (value - current)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_seconds": round(self.wait_seconds, 3),
+                "avg_service_seconds": round(self.service_seconds, 3) if self.service_seconds is not None else None,
+                "retry_after": self._retry_after() if self._queue_full() else 0,
+            }
+
+
+class AdmissionRegistry:
+    """Process-wide AdmissionController per model, created from settings on first use."""
+
+    def __init__(self):
+        self._controllers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        controller = self._controllers.get(name)
+        if controller is None:
+            with self._lock:
+                controller = self._controllers.get(name)
+                if controller is None:
+                    controller = AdmissionController(
+                        name,
+                        slots=settings.ADMISSION_SLOTS.get(name, 1),
+                        max_queue=settings.ADMISSION_MAX_QUEUE,
+                        max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+                    )
+                    self._controllers[name] = controller
+        return controller
+
+    def check(self, name):
+        if settings.ADMISSION_CONTROL:
+            self.get(name).check()
+
+    @contextmanager
+    def slot(self, name, blocking=False):
+        if not settings.ADMISSION_CONTROL:
+            yield
+            return
+        with self.get(name).slot(blocking):
+            yield
+
+    def reset(self):
+        """Drop all controllers, e.g. in a forked child whose copied locks may be held."""
+        self._controllers = {}
+        self._lock = threading.Lock()
+
+    def stats(self):
+        names = sorted(set(settings.ADMISSION_SLOTS) | set(self._controllers))
+        return {
+            "enabled": settings.ADMISSION_CONTROL,
+            "models": {name: self.get(name).stats() for name in names},
+        }
+
+
+admission = AdmissionRegistry()
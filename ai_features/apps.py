@@ -1,6 +1,23 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class AiFeaturesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai_features"
+
+    def ready(self):
+        # Importing services registers the model loaders with the registry.
+        # Loading only happens when warm-up is enabled so management commands
+        # such as migrate stay fast, and never when the models live in the
+        # model server.
+        if settings.WARM_MODELS and not settings.MODEL_SERVER_SOCKET:
+            from .registry import model_registry
+            from . import services  # noqa: F401
+
+            logger.info("Warming up models...")
+            model_registry.warm_up(settings.WARM_MODEL_NAMES or None)
@@ -0,0 +1,188 @@
+import os
+import subprocess
+import logging
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+logger = logging.getLogger(__name__)
+
+# Whisper and pyannote both work on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+# Formats read in-process with soundfile instead of through ffmpeg
+SOUNDFILE_EXTENSIONS = {'.wav'}
+
+
+def load_audio(path, sr=SAMPLE_RATE):
+    """Decode an audio file into a mono float32 NumPy array at `sr` Hz.
+
+    The file is decoded once here and the array is handed to both Whisper
+    and pyannote, instead of letting each library spawn its own ffmpeg.
+    WAV files are read directly with soundfile; other formats, and WAV
+    files soundfile cannot parse, go through ffmpeg.
+    """
+    if os.path.splitext(path)[1].lower() in SOUNDFILE_EXTENSIONS:
+        try:
+            return load_wav(path, sr)
+        except (RuntimeError, ValueError) as e:
+            logger.warning(f"soundfile could not read {path}, falling back to ffmpeg: {str(e)}")
+    return load_with_ffmpeg(path, sr)
+
+
+def load_wav(path, sr=SAMPLE_RATE):
+    """Read a WAV file with soundfile, downmixing and resampling only when needed."""
+    audio, file_sr = sf.read(path, dtype='float32')
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    if file_sr != sr:
+        # Polyphase resampling by the reduced integer ratio, e.g. 44.1 kHz -> 16 kHz is 160/441
+        factor = gcd(file_sr, sr)
+        audio = resample_poly(audio, sr // factor, file_sr // factor).astype(np.float32, copy=False)
+    return audio
+
+
+def load_with_ffmpeg(path, sr=SAMPLE_RATE):
+    """Decode any format ffmpeg understands into a mono float32 array at `sr` Hz."""
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def audio_duration(audio, sr=SAMPLE_RATE):
+    """Return the duration in seconds of a decoded waveform."""
+    return len(audio) / float(sr)
+
+
+def frame_rms(audio, frame_samples):
+    """Return the RMS energy of consecutive non-overlapping frames."""
+    num_frames = len(audio) // frame_samples
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:num_frames * frame_samples].reshape(num_frames, frame_samples)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def split_at_silence(audio, chunk_seconds, sr=SAMPLE_RATE, search_seconds=5.0, frame_ms=30):
+    """Split a waveform into chunks of about `chunk_seconds`, cutting at the quietest frame.
+
+    Around every multiple of `chunk_seconds` the frame with the lowest
+    energy within `search_seconds` is chosen as the boundary, so words are
+    rarely cut in half. Returns a list of (start_sample, end_sample) pairs.
+    """
+    total = len(audio)
+    chunk_samples = int(chunk_seconds * sr)
+    if total <= chunk_samples:
+        return [(0, total)]
+
+    frame_samples = int(sr * frame_ms / 1000)
+    energy = frame_rms(audio, frame_samples)
+    search_frames = int(search_seconds * sr / frame_samples)
+
+    boundaries = [0]
+    target = chunk_samples
+    while target < total - chunk_samples // 2:
+        center = target // frame_samples
+        lo = max(center - search_frames, boundaries[-1] // frame_samples + 1)
+        hi = min(center + search_frames + 1, len(energy))
+        if lo < hi:
+            cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_samples + frame_samples // 2
+        else:
+            cut = target
+        boundaries.append(cut)
+        target = cut + chunk_samples
+    boundaries.append(total)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+# Decibels above the estimated noise floor a frame needs to count as speech,
+# by VAD aggressiveness (higher drops more quiet audio)
+VAD_MARGINS_DB = {0: 6.0, 1: 9.0, 2: 12.0, 3: 15.0}
+
+
+def _runs(mask):
+    """Return start and end indices of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _merge_close(starts, ends, min_gap):
+    """Merge consecutive regions separated by less than `min_gap`."""
+    if len(starts) < 2:
+        return starts, ends
+    keep_gap = (starts[1:] - ends[:-1]) >= min_gap
+    return starts[np.concatenate(([True], keep_gap))], ends[np.concatenate((keep_gap, [True]))]
+
+
+def detect_speech(audio, sr=SAMPLE_RATE, aggressiveness=1, frame_ms=30,
+                  min_speech_ms=250, min_silence_ms=500, pad_ms=200):
+    """Find speech regions with a vectorized frame-energy detector.
+
+    A frame is speech when its energy is more than VAD_MARGINS_DB[aggressiveness]
+    above the noise floor, estimated as the 10th percentile of frame energy.
+    Pauses shorter than `min_silence_ms` are bridged, bursts shorter than
+    `min_speech_ms` dropped and every region padded by `pad_ms`. Returns
+    an (N, 2) array of [start_sample, end_sample) regions.
+    """
+    frame_samples = int(sr * frame_ms / 1000)
+    energy = frame_rms(audio, frame_samples)
+    if len(energy) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    db = 20.0 * np.log10(energy + 1e-10)
+    threshold = np.percentile(db, 10) + VAD_MARGINS_DB[aggressiveness]
+    starts, ends = _runs(db > threshold)
+
+    starts, ends = _merge_close(starts, ends, min_silence_ms // frame_ms)
+    long_enough = (ends - starts) >= max(1, min_speech_ms // frame_ms)
+    starts, ends = starts[long_enough] * frame_samples, ends[long_enough] * frame_samples
+
+    pad = int(sr * pad_ms / 1000)
+    starts = np.maximum(starts - pad, 0)
+    ends = np.minimum(ends + pad, len(audio))
+    starts, ends = _merge_close(starts, ends, 1)
+    return np.stack([starts, ends], axis=1).astype(np.int64)
+
+
+class SpeechTimeline:
+    """Maps times in audio condensed to its speech regions back to the original timeline."""
+
+    def __init__(self, regions, sr=SAMPLE_RATE):
+        regions = np.asarray(regions, dtype=np.float64).reshape(-1, 2) / sr
+        lengths = regions[:, 1] - regions[:, 0]
+        self.original_starts = regions[:, 0]
+        self.condensed_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+        self.speech_seconds = float(lengths.sum())
+
+    def to_original(self, times, is_end=False):
+        """Map condensed times to original times.
+
+        A time exactly on the seam between two regions belongs to the later
+        region when it is a start and to the earlier one when it is an end.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        side = 'left' if is_end else 'right'
+        index = np.clip(np.searchsorted(self.condensed_starts, times, side=side) - 1, 0, None)
+        return self.original_starts[index] + (times - self.condensed_starts[index])
+
+
+def condense_to_speech(audio, regions):
+    """Concatenate the speech regions of a waveform."""
+    return np.concatenate([audio[start:end] for start, end in regions])
@@ -0,0 +1,75 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Merge concurrent generation calls into one model batch.
+
+    Callers submit a list of prompts and block until their outputs are
+    ready. A single background thread collects submissions for up to
+    `window_seconds` (or until `max_batch_size` prompts are waiting), runs
+    `batch_fn` once on all of them and hands each caller its share of the
+    outputs. `batch_fn` must return one output per prompt, in order.
+    """
+
+    def __init__(self, batch_fn, window_seconds, max_batch_size):
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, prompts):
+        """Queue `prompts` for the next batch and wait for their outputs."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((list(prompts), future))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                    self._thread.start()
+
+    def _collect(self):
+        """Block for the first submission, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.window_seconds
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            prompts = [prompt for item_prompts, _ in batch for prompt in item_prompts]
+            try:
+                outputs = self.batch_fn(prompts)
+            except Exception as e:
+                logger.error(f"Error in micro-batch of {len(prompts)} prompts: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            logger.debug(f"Ran micro-batch of {len(prompts)} prompts from {len(batch)} requests")
+            offset = 0
+            for item_prompts, future in batch:
+                future.set_result(outputs[offset:offset + len(item_prompts)])
+                offset += len(item_prompts)
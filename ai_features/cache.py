@@ -0,0 +1,187 @@
+import json
+import hashlib
+import threading
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import TranscriptionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def hash_uploaded_file(uploaded_file):
+    """Return the SHA-256 hex digest of an uploaded file, reading it chunk by chunk."""
+    hasher = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class TranscriptionResultCache:
+    """Content-addressed store of finished transcriptions.
+
+    Entries are keyed on the SHA-256 of the audio plus the model version, so
+    a model or pipeline change never serves a stale result. The total stored
+    size is bounded and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._purged_versions = set()
+        self._lock = threading.Lock()
+
+    def get(self, audio_hash, version):
+        """Return the cached result for this audio and model version, or None."""
+        self._purge_stale(version)
+        entry = (
+            TranscriptionCacheEntry.objects
+            .filter(audio_sha256=audio_hash, model_version=version)
+            .only('pk', 'result')
+            .first()
+        )
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        TranscriptionCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_accessed_at=timezone.now(),
+        )
+        return entry.result
+
+    def set(self, audio_hash, version, result):
+        """Store the segments and duration of a finished transcription."""
+        payload = {
+            'segments': result['segments'],
+            'duration': result['duration'],
+            'duration_seconds': result['duration_seconds'],
+        }
+        size_bytes = len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        if size_bytes > self.max_bytes:
+            logger.info(f"Transcription result of {size_bytes} bytes is larger than the cache, not storing it")
+            return
+
+        try:
+            TranscriptionCacheEntry.objects.update_or_create(
+                audio_sha256=audio_hash,
+                model_version=version,
+                defaults={'result': payload, 'size_bytes': size_bytes, 'last_accessed_at': timezone.now()},
+            )
+        except IntegrityError:
+            # Another worker stored the same audio concurrently
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        total = TranscriptionCacheEntry.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        entries = TranscriptionCacheEntry.objects.order_by('last_accessed_at').values_list('pk', 'size_bytes')
+        for pk, size_bytes in entries.iterator():
+            if total <= self.max_bytes:
+                break
+            TranscriptionCacheEntry.objects.filter(pk=pk).delete()
+            total -= size_bytes
+            evicted += 1
+        logger.info(f"Evicted {evicted} transcription cache entries")
+
+    def _purge_stale(self, version):
+        """Drop unused entries of other model versions, once per version and process.
+
+        Processes sharing the database may run other settings (VAD, int8, a
+        rolling deploy), so an entry of a version this process doesn't know
+        is only deleted once nobody has read it for
+        TRANSCRIPTION_CACHE_STALE_DAYS. Entries of the other selectable
+        Whisper tiers are still current and kept.
+        """
+        from .services import TranscriptionService
+
+        if version in self._purged_versions:
+            return
+        live_versions = TranscriptionService.cache_versions() | {version}
+        cutoff = timezone.now() - timedelta(days=settings.TRANSCRIPTION_CACHE_STALE_DAYS)
+        deleted, _ = (
+            TranscriptionCacheEntry.objects
+            .exclude(model_version__in=live_versions)
+            .filter(last_accessed_at__lt=cutoff)
+            .delete()
+        )
+        if deleted:
+            logger.info(f"Invalidated {deleted} unused transcription cache entries from other model versions")
+        self._purged_versions.add(version)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class TitleSuggestionCache:
+    """Title suggestions keyed by normalized content and the generation parameters.
+
+    Content is compared after collapsing whitespace and case, so re-sending
+    a draft with only those edits is a hit. Entries live in the 'titles'
+    cache of CACHES, which sets the TTL and the size bound; lookups fall
+    back to a miss if the backend is unreachable.
+    """
+
+    def __init__(self, alias='titles'):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content, version):
+        normalized = ' '.join(str(content).split()).lower()
+        return hashlib.sha256(f"{version}\n{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, content, version):
+        """Return the cached suggestions for this content and generation version, or None."""
+        try:
+            result = caches[self.alias].get(self.key(content, version))
+        except Exception as e:
+            logger.warning(f"Title cache lookup failed: {str(e)}")
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, content, version, result):
+        try:
+            caches[self.alias].set(self.key(content, version), result)
+        except Exception as e:
+            logger.warning(f"Title cache update failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+transcription_cache = TranscriptionResultCache()
+title_cache = TitleSuggestionCache()
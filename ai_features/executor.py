@@ -0,0 +1,106 @@
+"""
+Bounded thread pools for model calls made from the async views.
+
+The event loop must never run inference itself, so the async views hand
+every blocking call to a ThreadPoolExecutor with ASYNC_INFERENCE_WORKERS
+threads for its endpoint. Transcription and title generation have separate
+pools, so transcriptions waiting for a Whisper slot cannot hold the threads
+title requests need. Requests beyond the pool size wait in its queue, which
+costs a coroutine rather than a thread, so one ASGI worker can hold
+hundreds of clients. Once ASYNC_INFERENCE_MAX_PENDING calls of a pool are
+queued or running, new requests get Overloaded and the view answers 429.
+Admission control still applies inside the pool threads.
+"""
+import math
+import asyncio
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from .admission import EWMA_ALPHA, Overloaded
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    def __init__(self, name):
+        self.name = name
+        self._pool = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.service_seconds = None
+
+    @property
+    def workers(self):
+        return settings.ASYNC_INFERENCE_WORKERS.get(self.name, 1)
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=f'inference-{self.name}'
+                    )
+        return self._pool
+
+    async def run(self, func, *args, admit=True):
+        """Run `func(*args)` in the pool and return its result.
+
+        With `admit` the call is rejected with Overloaded when the pool is
+        saturated; later steps of an already admitted request (the chunks of
+        a stream) pass admit=False so they are never cut off halfway.
+        """
+        with self._lock:
+            if admit and self.pending >= settings.ASYNC_INFERENCE_MAX_PENDING:
+                self.rejected += 1
+                raise Overloaded(self.name, self._retry_after())
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), partial(self._timed, func, *args)
+            )
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _timed(self, func, *args):
+        with self._lock:
+            self.running += 1
+        started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.service_seconds = elapsed if self.service_seconds is None else (
+                    self.service_seconds + EWMA_ALPHA * (elapsed - self.service_seconds)
+                )
+
+    def _retry_after(self):
+        if self.service_seconds is None:
+            return 1
+        return max(1, math.ceil(self.pending / self.workers * self.service_seconds))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "pending": self.pending,
+                "max_pending": settings.ASYNC_INFERENCE_MAX_PENDING,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+transcription_executor = InferenceExecutor('transcription')
+title_executor = InferenceExecutor('titles')
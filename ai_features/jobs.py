@@ -0,0 +1,180 @@
+"""
+Database-backed transcription job queue.
+
+Jobs are rows of the Transcription model. Any process that runs a
+TranscriptionWorkerPool claims pending rows with an atomic conditional
+update, so several gunicorn workers (or a dedicated
+`manage.py transcription_worker` process) can share the queue without an
+external broker.
+"""
+import threading
+import time
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Transcription
+from .cache import transcription_cache
+
+logger = logging.getLogger(__name__)
+
+
+def submit_job(audio_file, audio_hash='', whisper_model=''):
+    """Store an uploaded audio file and queue it for transcription with the given Whisper tier."""
+    job = Transcription(
+        status=Transcription.STATUS_PENDING, audio_sha256=audio_hash, whisper_model=whisper_model
+    )
+    job.audio_file.save(audio_file.name, audio_file, save=False)
+    job.save()
+    logger.info(f"Queued transcription job {job.id}")
+
+    if settings.TRANSCRIPTION_JOB_INPROCESS:
+        get_worker_pool().notify()
+    return job
+
+
+def claim_next_job():
+    """Atomically move the oldest pending job to running and return it, or None."""
+    candidates = (
+        Transcription.objects
+        .filter(status=Transcription.STATUS_PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Transcription.objects.filter(
+            pk=pk, status=Transcription.STATUS_PENDING
+        ).update(
+            status=Transcription.STATUS_RUNNING,
+            progress=0.0,
+            started_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            return Transcription.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale_jobs():
+    """Return running jobs that stopped reporting progress (e.g. after a crash) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TRANSCRIPTION_JOB_STALE_SECONDS)
+    requeued = Transcription.objects.filter(
+        status=Transcription.STATUS_RUNNING, updated_at__lt=cutoff
+    ).update(status=Transcription.STATUS_PENDING, progress=0.0, updated_at=timezone.now())
+    if requeued:
+        logger.warning(f"Requeued {requeued} stale transcription jobs")
+    return requeued
+
+
+def run_job(job):
+    """Transcribe a claimed job and persist its result."""
+    from .services import TranscriptionService, get_transcription_service
+
+    def update_progress(value):
+        Transcription.objects.filter(pk=job.pk).update(
+            progress=round(value, 3), updated_at=timezone.now()
+        )
+
+    try:
+        service = get_transcription_service()
+        # Jobs are already queued in the database, so they wait for model slots instead of being rejected
+        result = service.transcribe_audio(
+            job.audio_file.path, progress_callback=update_progress, blocking=True,
+            model=job.whisper_model or None
+        )
+    except Exception as e:
+        result = {"error": str(e)}
+
+    job.finished_at = timezone.now()
+    if 'error' in result:
+        logger.error(f"Transcription job {job.id} failed: {result['error']}")
+        job.status = Transcription.STATUS_FAILED
+        job.error = result['error']
+    else:
+        job.status = Transcription.STATUS_COMPLETED
+        job.progress = 1.0
+        job.segments = result['segments']
+        job.duration_seconds = result['duration_seconds']
+        if job.audio_sha256 and settings.TRANSCRIPTION_CACHE_ENABLED:
+            transcription_cache.set(job.audio_sha256, TranscriptionService.cache_version(job.whisper_model or None), result)
+
+    if not settings.TRANSCRIPTION_JOB_KEEP_AUDIO and job.audio_file:
+        job.audio_file.delete(save=False)
+    job.save()
+    logger.info(f"Transcription job {job.id} finished with status {job.status}")
+
+
+class TranscriptionWorkerPool:
+    """Threads that poll the database for pending transcription jobs."""
+
+    def __init__(self, num_workers=None, poll_interval=None):
+        self.num_workers = num_workers or settings.TRANSCRIPTION_JOB_WORKERS
+        self.poll_interval = poll_interval or settings.TRANSCRIPTION_JOB_POLL_SECONDS
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            requeue_stale_jobs()
+            for index in range(self.num_workers):
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"transcription-worker-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"Started {self.num_workers} transcription workers")
+
+    def notify(self):
+        """Wake idle workers so a new job is picked up without waiting for the next poll."""
+        self.start()
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job()
+            except Exception as e:
+                logger.error(f"Error claiming transcription job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            started = time.perf_counter()
+            run_job(job)
+            logger.info(f"Job {job.id} took {time.perf_counter() - started:.2f}s")
+        close_old_connections()
+
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """Return the process-wide worker pool, creating it on first use."""
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                _worker_pool = TranscriptionWorkerPool()
+    return _worker_pool
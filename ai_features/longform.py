@@ -0,0 +1,240 @@
+"""
+Chunked, multi-process transcription of long recordings.
+
+The decoded waveform is split at quiet points and every chunk is
+transcribed and diarized in its own worker process. Workers are forked
+from the process that already holds the models, so they share the model
+weights copy-on-write instead of loading their own; a forkserver or spawn
+context would have every worker load its own copy.
+
+The pool is forked once and reused, so forking from a process that is
+already running requests happens once rather than on every long upload.
+It is forked again only when the worker settings or the Whisper tier
+change. The service is handed to the workers through `initargs`. Each
+request's waveform goes through a shared memory segment, as with the
+model server. Runs are serialized, since the pool and its workers are
+shared by the whole process.
+
+Speaker labels are local to each chunk; they are mapped to
+recording-wide speakers by matching the per-chunk speaker embeddings that
+pyannote returns.
+"""
+import time
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .admission import admission
+from .audio import SAMPLE_RATE, split_at_silence
+from .modelserver import _audio_in_shared_memory
+from .registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# One chunked run at a time per process
+_run_lock = threading.Lock()
+_pool = None
+_pool_key = None
+
+# Set in each worker by _init_worker
+_worker_service = None
+
+
+def _init_worker(service, num_threads):
+    global _worker_service
+    import torch
+
+    _worker_service = service
+    torch.set_num_threads(num_threads)
+    # Locks copied by fork may have been held by other threads of the parent
+    # at that moment; the parent holds the model slots for the whole run
+    admission.reset()
+    model_registry.reset_locks()
+
+
+def _get_pool(service, num_workers, threads_per_worker, model):
+    """Return the worker pool for these settings, forking a new one if they changed."""
+    global _pool, _pool_key
+
+    key = (id(service), num_workers, threads_per_worker, model)
+    if _pool is not None and _pool_key != key:
+        _pool.shutdown(wait=True)
+        _pool = None
+    if _pool is None:
+        logger.info(f"Forking {num_workers} chunk worker processes")
+        _pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(service, threads_per_worker),
+        )
+        _pool_key = key
+    return _pool
+
+
+def _discard_pool():
+    global _pool, _pool_key
+
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool, _pool_key = None, None
+
+
+def _process_chunk(shm_name, samples, index, start, end, model=None):
+    """Transcribe and diarize one chunk of the waveform in shared memory inside a worker process."""
+    started = time.perf_counter()
+    # The segment's creator shares this process's resource tracker and
+    # unlinks it; copy the chunk so the mapping can be closed right away
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        chunk = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)[start:end].copy()
+    finally:
+        shm.close()
+    offset = start / SAMPLE_RATE
+
+    timings = {}
+    result = _worker_service._run_whisper(chunk, timings, model=model)
+    whisper_segments = [
+        {'start': float(seg['start']) + offset, 'end': float(seg['end']) + offset, 'text': seg['text']}
+        for seg in result['segments']
+    ]
+
+    turns, embeddings = [], {}
+    try:
+        diarization, speaker_embeddings = _worker_service._run_diarization(chunk, timings, return_embeddings=True)
+        labels = diarization.labels()
+        turns = [
+            (float(turn.start) + offset, float(turn.end) + offset, speaker)
+            for turn, _, speaker in diarization.itertracks(yield_label=True)
+        ]
+        embeddings = {
+            label: np.asarray(speaker_embeddings[i]) if speaker_embeddings is not None else None
+            for i, label in enumerate(labels)
+        }
+    except Exception as e:
+        logger.error(f"Error during diarization of chunk {index}: {str(e)}")
+
+    return {
+        'index': index,
+        'whisper_segments': whisper_segments,
+        'text': result['text'],
+        'turns': turns,
+        'embeddings': embeddings,
+        'timings': timings,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def reconcile_speakers(chunk_embeddings, threshold):
+    """Map (chunk index, local label) pairs to recording-wide speaker labels.
+
+    `chunk_embeddings` is a list, in chunk order, of {local_label: embedding}
+    dicts, where the embedding may be None. Each chunk's speakers are matched greedily to the running
+    centroids of the speakers seen so far by cosine similarity; two speakers
+    of the same chunk never map to the same global speaker, and speakers
+    with no match above `threshold` (or no usable embedding) become new
+    speakers.
+    """
+    centroids = []  # [global index, mean embedding, count]
+    mapping = {}
+    next_speaker = 0
+
+    for chunk_index, embeddings in enumerate(chunk_embeddings):
+        labels = [
+            label for label in sorted(embeddings)
+            if embeddings[label] is not None and np.all(np.isfinite(embeddings[label]))
+        ]
+        matched = set()
+
+        if labels and centroids:
+            local = np.stack([embeddings[label] for label in labels]).astype(np.float64)
+            local /= np.linalg.norm(local, axis=1, keepdims=True)
+            known = np.stack([centroid[1] for centroid in centroids])
+            known /= np.linalg.norm(known, axis=1, keepdims=True)
+            similarity = local @ known.T
+
+            used_centroids = set()
+            for flat in np.argsort(similarity, axis=None)[::-1]:
+                row, col = np.unravel_index(flat, similarity.shape)
+                if similarity[row, col] < threshold:
+                    break
+                if labels[row] in matched or col in used_centroids:
+                    continue
+                matched.add(labels[row])
+                used_centroids.add(col)
+                centroid = centroids[col]
+                centroid[2] += 1
+                centroid[1] = centroid[1] + (embeddings[labels[row]] - centroid[1]) / centroid[2]
+                mapping[(chunk_index, labels[row])] = centroid[0]
+
+        for label in sorted(embeddings):
+            if label in matched:
+                continue
+            mapping[(chunk_index, label)] = next_speaker
+            if label in labels:
+                centroids.append([next_speaker, np.asarray(embeddings[label], dtype=np.float64), 1])
+            next_speaker += 1
+
+    return {key: f"SPEAKER_{index:02d}" for key, index in mapping.items()}
+
+
+def transcribe_chunked(service, audio, chunk_seconds, num_workers, threads_per_worker,
+                       speaker_threshold, progress_callback=None, model=None):
+    """Transcribe a long waveform in parallel chunks with the Whisper tier `model`.
+
+    The tier should already be loaded so the forked workers share it.
+    Concurrent calls in one process run one after another.
+    Returns (whisper_result, turns, timings) in the same shape the single
+    pass produces, so alignment and merging are unchanged.
+    """
+    chunks = split_at_silence(audio, chunk_seconds)
+    logger.info(f"Processing {len(chunks)} chunks with {num_workers} worker processes")
+
+    results = [None] * len(chunks)
+    with _run_lock, _audio_in_shared_memory(audio) as shm_name:
+        executor = _get_pool(service, num_workers, threads_per_worker, model)
+        futures = [
+            executor.submit(_process_chunk, shm_name, len(audio), index, start, end, model)
+            for index, (start, end) in enumerate(chunks)
+        ]
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                chunk_result = future.result()
+                results[chunk_result['index']] = chunk_result
+                if progress_callback:
+                    progress_callback(0.9 * done / len(chunks))
+        except BrokenProcessPool:
+            # A worker died; fork a fresh pool for the next run
+            _discard_pool()
+            raise
+        finally:
+            # Workers must be done with the segment before it is unlinked
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    mapping = reconcile_speakers([result['embeddings'] for result in results], speaker_threshold)
+
+    whisper_segments, turns = [], []
+    for result in results:
+        whisper_segments.extend(result['whisper_segments'])
+        for start, end, label in result['turns']:
+            turns.append((start, end, mapping[(result['index'], label)]))
+    turns.sort(key=lambda turn: turn[0])
+
+    timings = {
+        'chunks': len(chunks),
+        'whisper': round(sum(result['timings'].get('whisper', 0.0) for result in results), 3),
+        'diarization': round(sum(result['timings'].get('diarization', 0.0) for result in results), 3),
+        'chunk_seconds_max': round(max(result['seconds'] for result in results), 3),
+    }
+    whisper_result = {
+        'segments': whisper_segments,
+        'text': ''.join(result['text'] for result in results),
+    }
+    return whisper_result, turns, timings
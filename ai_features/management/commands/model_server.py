@@ -0,0 +1,32 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_features.modelserver import ModelServer
+
+
+class Command(BaseCommand):
+    help = "Run the model server that loads the models once and serves all web workers over a Unix socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=None, help="Socket path (defaults to MODEL_SERVER_SOCKET)")
+
+    def handle(self, *args, **options):
+        from ai_features import services  # noqa: F401  (registers the model loaders)
+        from ai_features.registry import model_registry
+
+        address = options['socket'] or settings.MODEL_SERVER_SOCKET
+        if not address:
+            raise CommandError("Pass --socket or set MODEL_SERVER_SOCKET")
+
+        model_registry.warm_up(settings.WARM_MODEL_NAMES or None)
+
+        # Stop like on Ctrl+C, so the socket file is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        server = ModelServer(address)
+        self.stdout.write(self.style.SUCCESS(f"Model server running on {address}: {model_registry.stats()}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from ai_features.jobs import TranscriptionWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run a transcription worker pool that processes queued transcription jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Number of worker threads")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Seconds between queue polls")
+
+    def handle(self, *args, **options):
+        pool = TranscriptionWorkerPool(
+            num_workers=options['workers'],
+            poll_interval=options['poll_interval'],
+        )
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"Transcription worker running with {pool.num_workers} threads"))
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            pool.stop()
@@ -0,0 +1,228 @@
+"""
+Minimal Prometheus metrics, rendered in the text exposition format.
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so
+it is cheap enough to call on every request. Values that other components
+already track (model load times, admission queues, cache hits) are read
+through collector callbacks when /api/metrics/ is scraped. Metrics are per
+process; with several gunicorn workers every scrape sees one worker.
+"""
+import threading
+from bisect import bisect_left
+
+# Stage durations range from milliseconds (alignment) to many minutes (Whisper on long files)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Audio seconds processed per wall-clock second
+REALTIME_FACTOR_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels + ('le',), key + (_format_value(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels + ('le',), key + ('+Inf',))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(series[-2], 6))}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Register a callable returning (name, type, help, [(labels dict, value), ...]) tuples at scrape time."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, metric_type, help_text, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    'darwix_stage_seconds',
+    'Wall-clock seconds spent in each processing stage.',
+    labels=('service', 'stage'),
+)
+audio_seconds_total = metrics.counter(
+    'darwix_audio_seconds_total',
+    'Seconds of audio transcribed.',
+)
+transcription_seconds_total = metrics.counter(
+    'darwix_transcription_seconds_total',
+    'Wall-clock seconds spent transcribing.',
+)
+realtime_factor = metrics.histogram(
+    'darwix_transcription_realtime_factor',
+    'Audio seconds processed per wall-clock second, per transcription.',
+    buckets=REALTIME_FACTOR_BUCKETS,
+)
+
+def observe_stage(service, stage, seconds):
+    stage_seconds.observe(seconds, service=service, stage=stage)
+
+
+def record_transcription(audio_seconds, wall_seconds):
+    """Record one finished transcription for the real-time factor."""
+    audio_seconds_total.inc(audio_seconds)
+    transcription_seconds_total.inc(wall_seconds)
+    if wall_seconds > 0:
+        realtime_factor.observe(audio_seconds / wall_seconds)
+
+
+@metrics.collector
+def _collect_models():
+    from .registry import model_registry
+
+    stats = model_registry.stats()
+    models = sorted(stats['models'].items())
+    return [
+        ('darwix_model_loaded', 'gauge', 'Whether the model is loaded in this process.',
+         [({'model': name}, int(info['loaded'])) for name, info in models]),
+        ('darwix_model_load_seconds', 'gauge', 'Seconds the model took to load.',
+         [({'model': name}, info['load_seconds']) for name, info in models if 'load_seconds' in info]),
+        ('darwix_model_hits_total', 'counter', 'Requests for the model that found it already loaded.',
+         [({'model': name}, info['hits']) for name, info in models]),
+        ('darwix_model_loads_total', 'counter', 'Times the model was loaded.',
+         [({'model': name}, info['loads']) for name, info in models]),
+        ('darwix_model_evictions_total', 'counter', 'Times the model was unloaded to stay within the memory budget.',
+         [({'model': name}, info['evictions']) for name, info in models]),
+        ('darwix_model_resident_megabytes', 'gauge', 'Memory accounted to the loaded models.',
+         [({}, stats['resident_mb'])]),
+    ]
+
+
+@metrics.collector
+def _collect_admission():
+    from .admission import admission
+
+    models = admission.stats()['models']
+    return [
+        ('darwix_inference_active', 'gauge', 'Inference calls currently holding a model slot.',
+         [({'model': name}, info['active']) for name, info in models.items()]),
+        ('darwix_inference_queued', 'gauge', 'Inference calls waiting for a model slot.',
+         [({'model': name}, info['queue_depth']) for name, info in models.items()]),
+        ('darwix_inference_rejected_total', 'counter', 'Inference calls rejected because the wait queue was full.',
+         [({'model': name}, info['rejected']) for name, info in models.items()]),
+        ('darwix_inference_wait_seconds_avg', 'gauge', 'Moving average of the wait for a model slot.',
+         [({'model': name}, info['avg_wait_seconds']) for name, info in models.items()]),
+    ]
+
+
+@metrics.collector
+def _collect_executors():
+    from .executor import title_executor, transcription_executor
+
+    pools = {executor.name: executor.stats() for executor in (transcription_executor, title_executor)}
+    return [
+        ('darwix_async_inference_running', 'gauge', 'Model calls from the async views running in each pool.',
+         [({'pool': name}, info['running']) for name, info in pools.items()]),
+        ('darwix_async_inference_pending', 'gauge', 'Model calls from the async views queued or running in each pool.',
+         [({'pool': name}, info['pending']) for name, info in pools.items()]),
+        ('darwix_async_inference_rejected_total', 'counter', 'Async requests rejected because the pool was full.',
+         [({'pool': name}, info['rejected']) for name, info in pools.items()]),
+    ]
+
+
+@metrics.collector
+def _collect_caches():
+    from .cache import title_cache, transcription_cache
+
+    caches = {'transcription': transcription_cache.stats(), 'titles': title_cache.stats()}
+    return [
+        ('darwix_cache_hits_total', 'counter', 'Cache lookups that found an entry.',
+         [({'cache': name}, info['hits']) for name, info in caches.items()]),
+        ('darwix_cache_misses_total', 'counter', 'Cache lookups that found nothing.',
+         [({'cache': name}, info['misses']) for name, info in caches.items()]),
+        ('darwix_cache_hit_ratio', 'gauge', 'Share of cache lookups that were hits.',
+         [({'cache': name}, info['hit_ratio']) for name, info in caches.items()]),
+    ]
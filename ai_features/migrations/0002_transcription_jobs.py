@@ -0,0 +1,91 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_features", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transcription",
+            name="audio_file",
+            field=models.FileField(blank=True, upload_to="audio_files/"),
+        ),
+        migrations.AlterField(
+            model_name="transcription",
+            name="transcription_text",
+            field=models.TextField(blank=True),
+        ),
+        # Rows created before job mode already hold a finished transcription.
+        migrations.AddField(
+            model_name="transcription",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="completed",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transcription",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="progress",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="segments",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="duration_seconds",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="transcription",
+            index=models.Index(
+                fields=["status", "created_at"], name="ai_features_status_e24e93_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.10 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_features", "0002_transcription_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranscriptionCacheEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("audio_sha256", models.CharField(max_length=64)),
+                ("model_version", models.CharField(max_length=255)),
+                ("result", models.JSONField()),
+                ("size_bytes", models.PositiveIntegerField()),
+                ("hit_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_accessed_at",
+                    models.DateTimeField(auto_now_add=True, db_index=True),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="audio_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="transcriptioncacheentry",
+            constraint=models.UniqueConstraint(
+                fields=("audio_sha256", "model_version"),
+                name="unique_audio_model_version",
+            ),
+        ),
+    ]
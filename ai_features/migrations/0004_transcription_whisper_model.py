@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_features", "0003_transcription_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="whisper_model",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
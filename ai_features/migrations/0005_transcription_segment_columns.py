@@ -0,0 +1,148 @@
+import numpy as np
+from django.db import migrations, models
+
+
+# The encoding is frozen here rather than imported from segment_store, so
+# later changes to that module don't change what this migration writes.
+# Times are uint32 centiseconds, speaker ids uint16 indexes into `speakers`,
+# and the texts are joined by newlines with n + 1 uint32 character offsets.
+
+# Rows from before job mode kept only transcription_text; it becomes one
+# segment by the label the service gives unattributed text. Its start and
+# end are both 0, which a real single-segment transcript never has, and
+# that is how the reverse migration recognises it.
+LEGACY_SPEAKER = "Speaker Unknown"
+
+
+def is_legacy(transcription):
+    if transcription.segment_count != 1:
+        return False
+    starts = np.frombuffer(bytes(transcription.segment_starts), dtype="<u4")
+    ends = np.frombuffer(bytes(transcription.segment_ends), dtype="<u4")
+    return int(starts[0]) == 0 and int(ends[0]) == 0
+
+
+def encode_segments(segments):
+    speakers = list(dict.fromkeys(segment["speaker"] for segment in segments))
+    speaker_ids = {speaker: index for index, speaker in enumerate(speakers)}
+    offsets = [0]
+    for segment in segments:
+        offsets.append(offsets[-1] + len(segment["text"]) + 1)
+    return {
+        "speakers": speakers,
+        "segment_starts": np.asarray([round(s["start"] * 100) for s in segments], dtype="<u4").tobytes(),
+        "segment_ends": np.asarray([round(s["end"] * 100) for s in segments], dtype="<u4").tobytes(),
+        "segment_speakers": np.asarray([speaker_ids[s["speaker"]] for s in segments], dtype="<u2").tobytes(),
+        "segment_text_offsets": np.asarray(offsets, dtype="<u4").tobytes(),
+        "segment_count": len(segments),
+        "transcription_text": "\n".join(segment["text"] for segment in segments),
+    }
+
+
+def format_timestamp(seconds):
+    minutes = int(seconds // 60)
+    return f"{minutes:02d}:{seconds % 60:06.3f}"
+
+
+def decode_segments(transcription):
+    starts = np.frombuffer(bytes(transcription.segment_starts), dtype="<u4")
+    ends = np.frombuffer(bytes(transcription.segment_ends), dtype="<u4")
+    speaker_ids = np.frombuffer(bytes(transcription.segment_speakers), dtype="<u2")
+    offsets = np.frombuffer(bytes(transcription.segment_text_offsets), dtype="<u4")
+    text = transcription.transcription_text
+    segments = []
+    for index in range(len(starts)):
+        start, end = int(starts[index]) / 100, int(ends[index]) / 100
+        segments.append({
+            "speaker": transcription.speakers[speaker_ids[index]],
+            "text": text[int(offsets[index]):int(offsets[index + 1]) - 1],
+            "start": start,
+            "end": end,
+            "time": f"{format_timestamp(start)} → {format_timestamp(end)}",
+        })
+    return segments
+
+
+def segments_to_columns(apps, schema_editor):
+    Transcription = apps.get_model("ai_features", "Transcription")
+    for transcription in Transcription.objects.iterator():
+        if transcription.segments is not None:
+            segments = transcription.segments
+        elif transcription.transcription_text:
+            segments = [{
+                "speaker": LEGACY_SPEAKER,
+                "text": transcription.transcription_text,
+                "start": 0.0,
+                "end": 0.0,
+            }]
+        else:
+            continue
+        columns = encode_segments(segments)
+        for field, value in columns.items():
+            setattr(transcription, field, value)
+        transcription.save(update_fields=list(columns))
+
+
+def columns_to_segments(apps, schema_editor):
+    Transcription = apps.get_model("ai_features", "Transcription")
+    for transcription in Transcription.objects.filter(segment_count__gt=0).iterator():
+        if is_legacy(transcription):
+            # A pre-job-mode row; its text is already back in transcription_text
+            continue
+        transcription.segments = decode_segments(transcription)
+        # Job mode kept one "Speaker: text" line per segment
+        transcription.transcription_text = "\n".join(
+            f"{segment['speaker']}: {segment['text']}" for segment in transcription.segments
+        )
+        transcription.save(update_fields=["segments", "transcription_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_features", "0004_transcription_whisper_model"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="segment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="segment_ends",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="segment_speakers",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="segment_starts",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="segment_text_offsets",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="speakers",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(segments_to_columns, columns_to_segments),
+        migrations.RemoveField(
+            model_name="transcription",
+            name="segments",
+        ),
+        migrations.AddIndex(
+            model_name="transcription",
+            index=models.Index(
+                fields=["created_at", "id"], name="ai_features_created_d69e4d_idx"
+            ),
+        ),
+    ]
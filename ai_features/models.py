@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.functions import Substr
+
+from . import segment_store
 
 # Create your models here.
 
@@ -12,9 +15,99 @@ class BlogPost(models.Model):
         return self.title
 
 class Transcription(models.Model):
-    audio_file = models.FileField(upload_to='audio_files/')
-    transcription_text = models.TextField()
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    audio_file = models.FileField(upload_to='audio_files/', blank=True)
+    audio_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    whisper_model = models.CharField(max_length=32, blank=True)
+    # Segment texts joined by newlines; the segment_* columns index into it
+    transcription_text = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    progress = models.FloatField(default=0.0)
+    # Segments stored column-wise, see segment_store
+    speakers = models.JSONField(default=list, blank=True)
+    segment_starts = models.BinaryField(default=b'', blank=True)
+    segment_ends = models.BinaryField(default=b'', blank=True)
+    segment_speakers = models.BinaryField(default=b'', blank=True)
+    segment_text_offsets = models.BinaryField(default=b'', blank=True)
+    segment_count = models.PositiveIntegerField(default=0)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            # Keyset pagination of the history, newest first
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Transcription {self.id} - {self.created_at}"
+
+    @property
+    def segments(self):
+        """All segments as dicts, as returned by TranscriptionService."""
+        return self.segment_slice()
+
+    @segments.setter
+    def segments(self, segments):
+        for field, value in segment_store.encode_segments(segments).items():
+            setattr(self, field, value)
+
+    def segment_slice(self, start=None, end=None):
+        """Return the segments overlapping [start, end) seconds.
+
+        Only the time arrays are searched in Python. When transcription_text
+        was deferred, just the characters of the selected segments are read
+        from the database instead of the whole transcript.
+        """
+        starts = segment_store.unpack(self.segment_starts, segment_store.TIME_DTYPE)
+        ends = segment_store.unpack(self.segment_ends, segment_store.TIME_DTYPE)
+        indexes = segment_store.select_range(starts, ends, start, end)
+        if not len(indexes):
+            return []
+        offsets = segment_store.unpack(self.segment_text_offsets, segment_store.OFFSET_DTYPE)
+        text_start = int(offsets[indexes[0]])
+        if 'transcription_text' in self.get_deferred_fields():
+            length = int(offsets[indexes[-1] + 1]) - 1 - text_start
+            text = Transcription.objects.filter(pk=self.pk).values_list(
+                Substr('transcription_text', text_start + 1, length), flat=True
+            ).get()
+        else:
+            text = self.transcription_text[text_start:]
+        return segment_store.decode_segments(
+            self.speakers, starts, ends,
+            segment_store.unpack(self.segment_speakers, segment_store.SPEAKER_DTYPE),
+            offsets, text, indexes, text_start,
+        )
+
+class TranscriptionCacheEntry(models.Model):
+    """Finished transcription result keyed by audio content hash and model version."""
+    audio_sha256 = models.CharField(max_length=64)
+    model_version = models.CharField(max_length=255)
+    result = models.JSONField()
+    size_bytes = models.PositiveIntegerField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['audio_sha256', 'model_version'], name='unique_audio_model_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.audio_sha256[:12]} ({self.model_version})"
@@ -0,0 +1,306 @@
+"""
+Optional model server shared by all web workers on a machine.
+
+Normally every worker that builds the services loads its own copy of
+pyannote, Whisper and GPT-2, so memory grows with the worker count. With
+MODEL_SERVER_SOCKET set, one long-lived `python manage.py model_server`
+process owns the models instead. The web workers get thin clients with the
+services' interface and return shapes. The clients send each call over the
+Unix socket with multiprocessing.connection, authenticated with a key
+derived from SECRET_KEY.
+
+Uploads are still decoded in the web workers, so ffmpeg work spreads over
+them. The float32 waveform goes to the server through a shared memory
+segment that the client creates and unlinks; the server maps it without
+copying. Admission control, the title micro-batcher and the stage metrics
+all live in the server, so their limits and queues apply across all
+workers together.
+
+Each call uses its own connection. The server answers a request with any
+number of {'progress': ...} or {'event': ...} messages, then one final
+message: {'result': ...}, {'end': True}, {'overloaded': model,
+'retry_after': seconds} or {'failed': message}.
+"""
+import os
+import hashlib
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+import numpy as np
+from django.conf import settings
+
+from .admission import Overloaded
+from .audio import load_audio
+from .metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+FINAL_KEYS = ('result', 'end', 'overloaded', 'failed')
+
+# Segments created by this process, which only serves its own audio in tests
+_created_segments = set()
+
+
+class ModelServerError(Exception):
+    """Raised when the model server cannot be reached or fails to handle a request."""
+
+
+def _authkey():
+    return hashlib.sha256(f"model-server:{settings.SECRET_KEY}".encode()).digest()
+
+
+class ModelServer:
+    """Accept model calls on a Unix socket and run them with the in-process services."""
+
+    def __init__(self, address):
+        self.address = address
+        self._listener = None
+        self._closed = threading.Event()
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            # Left behind by a server that did not shut down cleanly
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=_authkey())
+        os.chmod(self.address, 0o600)
+        logger.info(f"Model server listening on {self.address}")
+        try:
+            while not self._closed.is_set():
+                try:
+                    conn = self._listener.accept()
+                except AuthenticationError as e:
+                    logger.warning(f"Rejected a model server connection: {str(e)}")
+                    continue
+                if self._closed.is_set():
+                    conn.close()
+                    break
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            logger.info("Model server stopped")
+
+    def shutdown(self):
+        """Stop serve_forever from another thread."""
+        self._closed.set()
+        try:
+            # Wake up the accept() call
+            Client(self.address, family='AF_UNIX', authkey=_authkey()).close()
+        except OSError:
+            pass
+
+    def _handle(self, conn):
+        with conn:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            handler = getattr(self, f"_op_{request.get('op')}", None)
+            try:
+                if handler is None:
+                    raise ModelServerError(f"Unknown operation {request.get('op')!r}")
+                handler(conn, request)
+            except Overloaded as e:
+                self._reply(conn, {'overloaded': e.model, 'retry_after': e.retry_after})
+            except (BrokenPipeError, ConnectionResetError, EOFError):
+                logger.info(f"Client went away during {request.get('op')}")
+            except Exception as e:
+                logger.error(f"Model server failed to handle {request.get('op')}: {str(e)}")
+                self._reply(conn, {'failed': str(e)})
+
+    @staticmethod
+    def _reply(conn, message):
+        try:
+            conn.send(message)
+        except OSError:
+            pass
+
+    def _op_transcribe_audio(self, conn, request):
+        from .services import get_transcription_service
+
+        service = get_transcription_service(local=True)
+        progress_callback = (lambda value: conn.send({'progress': value})) if request['progress'] else None
+        with _attach_audio(request['shm'], request['samples']) as audio:
+            result = service.transcribe_audio(
+                request['audio_path'], progress_callback=progress_callback, blocking=request['blocking'], audio=audio,
+                model=request.get('model')
+            )
+            del audio
+        conn.send({'result': result})
+
+    def _op_transcribe_stream(self, conn, request):
+        from .services import get_transcription_service
+
+        service = get_transcription_service(local=True)
+        with _attach_audio(request['shm'], request['samples']) as audio:
+            events = service.transcribe_stream(
+                request['audio_path'], request['window_seconds'], audio=audio, model=request.get('model')
+            )
+            del audio
+            try:
+                for event in events:
+                    conn.send({'event': event})
+            finally:
+                events.close()
+                del events
+        conn.send({'end': True})
+
+    def _op_generate_titles(self, conn, request):
+        from .services import get_title_service
+
+        conn.send({'result': get_title_service(local=True).generate_titles(request['content'])})
+
+    def _op_stats(self, conn, request):
+        from .admission import admission
+        from .registry import model_registry
+
+        conn.send({'result': {'models': model_registry.stats(), 'admission': admission.stats()}})
+
+
+@contextmanager
+def _attach_audio(name, samples):
+    """Map a client's shared memory segment as a float32 waveform without copying it."""
+    shm = shared_memory.SharedMemory(name=name)
+    if name not in _created_segments:
+        # The client created the segment and unlinks it; stop this process's
+        # resource tracker from unlinking it a second time at exit
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    try:
+        yield np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still referenced, e.g. from a traceback; the mapping
+            # is released together with it
+            pass
+
+
+@contextmanager
+def _audio_in_shared_memory(audio):
+    """Copy a waveform into a new shared memory segment and yield its name."""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+    _created_segments.add(shm.name)
+    try:
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+        _created_segments.discard(shm.name)
+
+
+def _exchange(request):
+    """Send `request` on a new connection and yield the replies up to the final one."""
+    try:
+        conn = Client(settings.MODEL_SERVER_SOCKET, family='AF_UNIX', authkey=_authkey())
+    except (OSError, AuthenticationError) as e:
+        raise ModelServerError(f"Cannot reach the model server at {settings.MODEL_SERVER_SOCKET}: {str(e)}")
+
+    with conn:
+        conn.send(request)
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError) as e:
+                raise ModelServerError(f"Lost the connection to the model server: {str(e) or 'closed'}")
+            if 'overloaded' in message:
+                raise Overloaded(message['overloaded'], message['retry_after'])
+            if 'failed' in message:
+                raise ModelServerError(message['failed'])
+            yield message
+            if any(key in message for key in FINAL_KEYS):
+                return
+
+
+def _decode(audio_path):
+    if not os.path.exists(audio_path):
+        raise Exception(f"Audio file not found: {audio_path}")
+    started = time.perf_counter()
+    try:
+        audio = load_audio(audio_path)
+    except Exception as e:
+        logger.error(f"Error decoding audio: {str(e)}")
+        raise Exception("Failed to decode audio")
+    elapsed = time.perf_counter() - started
+    observe_stage('transcription', 'decode', elapsed)
+    return audio, round(elapsed, 3)
+
+
+class RemoteTranscriptionService:
+    """TranscriptionService's interface, answered by the model server."""
+
+    def transcribe_audio(self, audio_path, progress_callback=None, blocking=False, model=None):
+        try:
+            audio, decode_seconds = _decode(audio_path)
+            result = None
+            with _audio_in_shared_memory(audio) as name:
+                for message in _exchange({
+                    'op': 'transcribe_audio',
+                    'audio_path': audio_path,
+                    'shm': name,
+                    'samples': len(audio),
+                    'blocking': blocking,
+                    'progress': progress_callback is not None,
+                    'model': model,
+                }):
+                    if 'progress' in message:
+                        progress_callback(message['progress'])
+                    else:
+                        result = message['result']
+            if 'timings' in result:
+                result['timings']['decode'] = decode_seconds
+            return result
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error in remote transcription: {str(e)}")
+            return {"error": str(e)}
+
+    def transcribe_stream(self, audio_path, window_seconds=None, model=None):
+        try:
+            audio, _ = _decode(audio_path)
+            with _audio_in_shared_memory(audio) as name:
+                for message in _exchange({
+                    'op': 'transcribe_stream',
+                    'audio_path': audio_path,
+                    'shm': name,
+                    'samples': len(audio),
+                    'window_seconds': window_seconds,
+                    'model': model,
+                }):
+                    if 'event' in message:
+                        yield message['event']
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error in remote streaming transcription: {str(e)}")
+            yield {"event": "error", "error": str(e)}
+
+
+class RemoteTitleSuggestionService:
+    """TitleSuggestionService's interface, answered by the model server."""
+
+    def generate_titles(self, content):
+        try:
+            result = None
+            for message in _exchange({'op': 'generate_titles', 'content': content}):
+                result = message['result']
+            return result
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error in remote title generation: {str(e)}")
+            return {"error": str(e)}
+
+
+def model_server_stats():
+    """Return the model server's model registry and admission statistics."""
+    for message in _exchange({'op': 'stats'}):
+        return message['result']
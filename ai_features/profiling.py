@@ -0,0 +1,135 @@
+"""
+Opt-in request profiling for the inference views.
+
+A request is profiled when PROFILING_ENABLED is set and it either carries
+an `X-Profile` header or is picked by PROFILING_SAMPLE_RATE. The view then
+runs under cProfile (or, with `X-Profile: torch`, the torch profiler, which
+also sees the operator threads) and the trace is written to PROFILING_DIR,
+which keeps only the newest PROFILING_MAX_FILES traces. Requests that are
+not profiled only pay for the settings check.
+
+cProfile sees the request thread only: work handed to the stage executor
+or the micro-batcher shows up as time waiting on a future, and the body
+of a streaming response is produced after the view has returned.
+"""
+import os
+import re
+import time
+import uuid
+import random
+import cProfile
+import logging
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# <unix millis>-<endpoint>-<id>.<prof|json>; also used to validate download names
+PROFILE_NAME_RE = re.compile(r'^(?P<created>\d+)-(?P<endpoint>[a-z_]+)-(?P<id>[0-9a-f]{8})\.(?P<format>prof|json)$')
+
+
+def _requested_mode(request):
+    """Return 'cprofile', 'torch' or None for this request."""
+    if not settings.PROFILING_ENABLED:
+        return None
+    header = request.META.get('HTTP_X_PROFILE', '').strip().lower()
+    if header == 'torch':
+        return 'torch'
+    if header in ('1', 'true', 'cprofile'):
+        return 'cprofile'
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'cprofile'
+    return None
+
+
+def profiled(endpoint):
+    """Decorate a view so that requests selected for profiling are recorded."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            mode = _requested_mode(request)
+            if mode is None:
+                return view(request, *args, **kwargs)
+
+            started = time.perf_counter()
+            if mode == 'torch':
+                response, name = _run_with_torch_profiler(endpoint, view, request, *args, **kwargs)
+            else:
+                response, name = _run_with_cprofile(endpoint, view, request, *args, **kwargs)
+            logger.info(f"Profiled {endpoint} request in {time.perf_counter() - started:.2f}s as {name}")
+
+            _trim_profiles()
+            response['X-Profile-Id'] = name
+            return response
+        return wrapper
+    return decorator
+
+
+def _new_profile_path(endpoint, extension):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    name = f"{int(time.time() * 1000)}-{endpoint}-{uuid.uuid4().hex[:8]}.{extension}"
+    return name, os.path.join(settings.PROFILING_DIR, name)
+
+
+def _run_with_cprofile(endpoint, view, request, *args, **kwargs):
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        response = view(request, *args, **kwargs)
+    finally:
+        profile.disable()
+        name, path = _new_profile_path(endpoint, 'prof')
+        profile.dump_stats(path)
+    return response, name
+
+
+def _run_with_torch_profiler(endpoint, view, request, *args, **kwargs):
+    from torch.profiler import profile, ProfilerActivity
+
+    with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+        response = view(request, *args, **kwargs)
+    name, path = _new_profile_path(endpoint, 'json')
+    prof.export_chrome_trace(path)
+    return response, name
+
+
+def _trim_profiles():
+    """Delete the oldest traces beyond PROFILING_MAX_FILES."""
+    names = sorted(name for name in os.listdir(settings.PROFILING_DIR) if PROFILE_NAME_RE.match(name))
+    for name in names[:max(0, len(names) - settings.PROFILING_MAX_FILES)]:
+        try:
+            os.remove(os.path.join(settings.PROFILING_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles():
+    """Return metadata for the stored traces, newest first."""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(settings.PROFILING_DIR):
+        match = PROFILE_NAME_RE.match(name)
+        if not match:
+            continue
+        try:
+            size = os.path.getsize(os.path.join(settings.PROFILING_DIR, name))
+        except FileNotFoundError:
+            continue
+        profiles.append({
+            'name': name,
+            'endpoint': match.group('endpoint'),
+            'format': 'cprofile' if match.group('format') == 'prof' else 'torch',
+            'created_at': int(match.group('created')) / 1000.0,
+            'size_bytes': size,
+        })
+    return sorted(profiles, key=lambda profile: profile['name'], reverse=True)
+
+
+def profile_path(name):
+    """Return the path of a stored trace, or None if the name is invalid or missing."""
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    path = os.path.join(settings.PROFILING_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,104 @@
+"""
+Dynamic int8 quantization of Whisper and GPT-2 for CPU inference.
+
+Models named in QUANTIZED_MODELS have their linear layers replaced with
+torch's dynamically quantized int8 layers: the weights are stored as int8
+and the activations are quantized on the fly, which shrinks the weights to
+a quarter and speeds up the matrix multiplications that dominate both
+models on CPU. quantize_dynamic only swaps modules whose type is exactly
+nn.Linear, so Whisper's Linear subclass (it casts the weight to the input
+dtype) and the Conv1D layers of Hugging Face's GPT-2 (a linear layer with
+a transposed weight) are converted to plain nn.Linear first. Embeddings,
+convolutions and layer norms stay in fp32.
+
+Converting takes a while for the larger Whisper tiers, so the quantized
+model is saved under QUANTIZED_MODEL_DIR, keyed by the model and library
+versions, and loaded from there on later startups.
+"""
+import os
+import re
+import time
+import logging
+
+import torch
+from django.conf import settings
+from torch import nn
+from transformers.pytorch_utils import Conv1D
+from whisper.model import Linear as WhisperLinear
+
+logger = logging.getLogger(__name__)
+
+
+def quantization_enabled(name):
+    """Return whether the model `name` ('whisper' or 'gpt2') runs in int8.
+
+    Dynamic int8 quantization only runs on CPU, so models listed in
+    QUANTIZED_MODELS stay fp32 when CUDA is available.
+    """
+    return name in settings.QUANTIZED_MODELS and not torch.cuda.is_available()
+
+
+def _plain_linear(module):
+    if isinstance(module, WhisperLinear):
+        linear = nn.Linear(module.in_features, module.out_features, bias=module.bias is not None)
+        linear.weight = module.weight
+        linear.bias = module.bias
+        return linear
+    if isinstance(module, Conv1D):
+        # Conv1D computes x @ weight + bias with weight shaped (in, out)
+        in_features, out_features = module.weight.shape
+        linear = nn.Linear(in_features, out_features)
+        linear.weight = nn.Parameter(module.weight.detach().t().contiguous())
+        linear.bias = module.bias
+        return linear
+    return None
+
+
+def to_plain_linear(model):
+    """Replace Whisper Linear and GPT-2 Conv1D layers with equivalent nn.Linear layers in place."""
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            linear = _plain_linear(child)
+            if linear is not None:
+                setattr(parent, name, linear)
+    return model
+
+
+def quantize_int8(model):
+    """Quantize the linear layers of `model` to int8 in place and return it."""
+    to_plain_linear(model).eval()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_quantized(key, build):
+    """Return the int8 version of the model `build()` returns, cached on disk under `key`.
+
+    `key` must change whenever the weights or the library that defines the
+    model's classes do.
+    """
+    filename = re.sub(r'[^\w.@+-]', '_', f"{key}-int8-torch{torch.__version__}") + '.pt'
+    path = os.path.join(settings.QUANTIZED_MODEL_DIR, filename)
+    if os.path.exists(path):
+        started = time.perf_counter()
+        try:
+            # The file holds a pickled module that this process wrote itself
+            model = torch.load(path, map_location='cpu', weights_only=False)
+            logger.info(f"Loaded quantized model {path} in {time.perf_counter() - started:.2f}s")
+            return model
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized model {path}: {str(e)}")
+
+    model = build()
+    started = time.perf_counter()
+    model = quantize_int8(model)
+    logger.info(f"Quantized {key} to int8 in {time.perf_counter() - started:.2f}s")
+
+    try:
+        os.makedirs(settings.QUANTIZED_MODEL_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, temp_path)
+        # Workers starting together may race; the rename makes the last one win atomically
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache the quantized model at {path}: {str(e)}")
+    return model
@@ -0,0 +1,188 @@
+import gc
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+import psutil
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each model once and shares it between requests.
+
+    Models registered as `evictable` may be dropped again: when loading one
+    would push the declared memory of the resident models past
+    MODEL_MEMORY_BUDGET_MB, the least recently used evictable models are
+    unloaded first. Callers that still hold an evicted model keep using it;
+    its memory is freed once they let go of it.
+    """
+
+    def __init__(self, memory_budget_mb=None):
+        self._loaders = {}
+        self._options = {}
+        # Loaded models, least recently used first
+        self._models = OrderedDict()
+        self._stats = {}
+        self._counts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._memory_budget_mb = memory_budget_mb
+
+    @property
+    def memory_budget_mb(self):
+        """Memory budget for the loaded models in MB; 0 means unlimited."""
+        if self._memory_budget_mb is not None:
+            return self._memory_budget_mb
+        return getattr(settings, 'MODEL_MEMORY_BUDGET_MB', 0)
+
+    def register(self, name, loader, memory_mb=None, evictable=False, warm=True):
+        """Register a zero-argument callable that builds the model called `name`.
+
+        `memory_mb` is the model's expected resident size, used to decide
+        what to evict before it is loaded; without it the RSS growth measured
+        while loading is used once it has been loaded. Only `warm` models
+        are loaded by warm_up() without an explicit list of names.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._options[name] = {"memory_mb": memory_mb, "evictable": evictable, "warm": warm}
+            self._counts.setdefault(name, {"hits": 0, "loads": 0, "evictions": 0})
+            self._locks.setdefault(name, threading.Lock())
+
+    def is_registered(self, name):
+        return name in self._loaders
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        """Return the shared instance of `name`, loading it on first use.
+
+        Loading is guarded by a per-model lock so concurrent first requests
+        wait for a single load instead of each loading their own copy.
+        """
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                self._touch(name)
+                return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            with self._lock:
+                model = self._models.get(name)
+                if model is not None:
+                    self._touch(name)
+                    return model
+
+            self._make_room(name)
+            logger.info(f"Loading model '{name}'...")
+            process = psutil.Process()
+            rss_before = process.memory_info().rss
+            started = time.perf_counter()
+            model = self._loaders[name]()
+            load_seconds = time.perf_counter() - started
+            rss_delta = process.memory_info().rss - rss_before
+
+            with self._lock:
+                self._stats[name] = {
+                    "load_seconds": round(load_seconds, 3),
+                    "rss_delta_mb": round(rss_delta / (1024 * 1024), 1),
+                    "loaded_at": time.time(),
+                    "last_used_at": time.time(),
+                }
+                self._models[name] = model
+                self._counts[name]["loads"] += 1
+            logger.info(
+                f"Model '{name}' loaded in {load_seconds:.2f}s "
+                f"(+{rss_delta / (1024 * 1024):.1f} MB RSS)"
+            )
+            return model
+
+    def _touch(self, name):
+        self._models.move_to_end(name)
+        self._counts[name]["hits"] += 1
+        self._stats[name]["last_used_at"] = time.time()
+
+    def _memory_mb(self, name):
+        declared = self._options[name]["memory_mb"]
+        if declared is not None:
+            return declared
+        return max(0.0, self._stats.get(name, {}).get("rss_delta_mb", 0.0))
+
+    def _resident_mb(self):
+        return sum(self._memory_mb(name) for name in self._models)
+
+    def _make_room(self, name):
+        """Evict least recently used evictable models until `name` fits in the budget."""
+        budget = self.memory_budget_mb
+        if not budget:
+            return
+        needed = self._memory_mb(name)
+        evicted = []
+        with self._lock:
+            while self._resident_mb() + needed > budget:
+                victim = next((other for other in self._models if self._options[other]["evictable"]), None)
+                if victim is None:
+                    logger.warning(
+                        f"Loading model '{name}' ({needed:.0f} MB) exceeds the {budget} MB model budget "
+                        f"with {self._resident_mb():.0f} MB that cannot be evicted"
+                    )
+                    break
+                del self._models[victim]
+                self._counts[victim]["evictions"] += 1
+                evicted.append(victim)
+        if evicted:
+            logger.info(f"Evicted {', '.join(repr(victim) for victim in evicted)} to make room for '{name}'")
+            gc.collect()
+
+    def evict(self, name):
+        """Unload `name` if it is loaded; return whether it was."""
+        with self._lock:
+            if self._models.pop(name, None) is None:
+                return False
+            self._counts[name]["evictions"] += 1
+        gc.collect()
+        return True
+
+    def reset_locks(self):
+        """Replace the locks, e.g. in a forked child whose copied locks may be held."""
+        self._lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in self._locks}
+
+    def warm_up(self, names=None):
+        """Load the given models (the registered warm models by default) ahead of the first request."""
+        if not names:
+            names = [name for name, options in self._options.items() if options["warm"]]
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Failed to warm up model '{name}': {str(e)}")
+
+    def stats(self):
+        """Return load time, memory and usage counts per registered model."""
+        with self._lock:
+            return {
+                "process_rss_mb": round(psutil.Process().memory_info().rss / (1024 * 1024), 1),
+                "memory_budget_mb": self.memory_budget_mb or None,
+                "resident_mb": round(self._resident_mb(), 1),
+                "models": {
+                    name: {
+                        "loaded": name in self._models,
+                        "evictable": self._options[name]["evictable"],
+                        "memory_mb": self._memory_mb(name),
+                        **self._counts[name],
+                        **self._stats.get(name, {}),
+                    }
+                    for name in self._loaders
+                },
+            }
+
+
+model_registry = ModelRegistry()
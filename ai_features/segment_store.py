@@ -0,0 +1,80 @@
+"""
+Columnar encoding of transcription segments.
+
+A transcript is stored as parallel little-endian arrays rather than a JSON
+list of dicts: start and end times in centiseconds (uint32), and speaker
+indexes (uint16) into a list of speaker labels. The texts are joined with
+newlines into one string, with the character offset of each text in a
+uint32 array of n + 1 entries. Times in the API are rounded to 1/100 s, so
+centiseconds are exact. The "time" strings are derived again on output.
+
+The offsets let a caller read a time range of a long transcript: search
+the small time arrays, then fetch only that substring of the text.
+"""
+import numpy as np
+
+from .segments import format_time_range
+
+TIME_DTYPE = np.dtype('<u4')
+SPEAKER_DTYPE = np.dtype('<u2')
+OFFSET_DTYPE = np.dtype('<u4')
+
+
+def _pack(values, dtype):
+    return np.asarray(values, dtype=dtype).tobytes()
+
+
+def unpack(data, dtype):
+    """Return the array stored in a BinaryField value (bytes or memoryview)."""
+    return np.frombuffer(data or b'', dtype=dtype)
+
+
+def encode_segments(segments):
+    """Return the column values for a list of segment dicts, keyed by Transcription field name."""
+    segments = segments or []
+    speakers = list(dict.fromkeys(segment['speaker'] for segment in segments))
+    speaker_ids = {speaker: index for index, speaker in enumerate(speakers)}
+    texts = [segment['text'] for segment in segments]
+    offsets = [0]
+    for text in texts:
+        # One newline separates consecutive texts
+        offsets.append(offsets[-1] + len(text) + 1)
+    return {
+        'speakers': speakers,
+        'segment_starts': _pack([round(segment['start'] * 100) for segment in segments], TIME_DTYPE),
+        'segment_ends': _pack([round(segment['end'] * 100) for segment in segments], TIME_DTYPE),
+        'segment_speakers': _pack([speaker_ids[segment['speaker']] for segment in segments], SPEAKER_DTYPE),
+        'segment_text_offsets': _pack(offsets, OFFSET_DTYPE),
+        'segment_count': len(segments),
+        'transcription_text': '\n'.join(texts),
+    }
+
+
+def select_range(starts, ends, start=None, end=None):
+    """Return the indexes of the segments overlapping [start, end) seconds."""
+    mask = np.ones(len(starts), dtype=bool)
+    if start is not None:
+        mask &= ends > round(start * 100)
+    if end is not None:
+        mask &= starts < round(end * 100)
+    return np.flatnonzero(mask)
+
+
+def decode_segments(speakers, starts, ends, speaker_ids, offsets, text, indexes, text_start=0):
+    """Build segment dicts for `indexes` of the unpacked columns.
+
+    `text` may be a substring of the joined texts beginning at character
+    `text_start`, as long as it covers the selected segments.
+    """
+    segments = []
+    for index in indexes.tolist():
+        segment_start = int(starts[index]) / 100
+        segment_end = int(ends[index]) / 100
+        segments.append({
+            'speaker': speakers[speaker_ids[index]],
+            'text': text[int(offsets[index]) - text_start:int(offsets[index + 1]) - 1 - text_start],
+            'start': segment_start,
+            'end': segment_end,
+            'time': format_time_range(segment_start, segment_end),
+        })
+    return segments
@@ -0,0 +1,272 @@
+"""
+Post-processing of Whisper and pyannote output into speaker segments.
+
+Everything here works on plain Python and NumPy data so it can be tested
+and benchmarked without loading any model.
+"""
+import numpy as np
+
+
+def format_timestamp(seconds):
+    """Convert seconds to MM:SS.mmm format"""
+    minutes = int(seconds // 60)
+    remaining_seconds = seconds % 60
+    return f"{minutes:02d}:{remaining_seconds:06.3f}"
+
+
+def format_time_range(start, end):
+    return f"{format_timestamp(start)} → {format_timestamp(end)}"
+
+
+def clean_text(text):
+    """Clean up transcribed text by removing redundant parts and formatting."""
+    # Remove repeated sentences that might appear due to diarization overlap
+    sentences = text.split('.')
+    unique_sentences = []
+    seen_texts = set()  # Track unique text segments
+
+    for sentence in sentences:
+        sentence = sentence.strip()
+        # Normalize the sentence for comparison
+        normalized = ' '.join(sentence.lower().split())
+        if sentence and normalized not in seen_texts:
+            unique_sentences.append(sentence)
+            seen_texts.add(normalized)
+
+    return '. '.join(unique_sentences).strip()
+
+
+def speaker_name(label):
+    """Convert a pyannote label such as SPEAKER_00 to Speaker 00."""
+    return f"Speaker {label.split('_')[-1]}"
+
+
+def _overlap_candidates(turn_starts, turn_ends, seg_starts, seg_ends):
+    """Yield (turn index, overlapping segment indices) using a sorted sweep.
+
+    Segments are sorted by start once. For each turn the segments starting
+    before the turn ends form a prefix of that order, and a running maximum
+    of segment ends gives the first position that can still reach into the
+    turn, so both bounds come from a single vectorized searchsorted call.
+    Overlapping segment indices are returned in their original order.
+    """
+    order = np.argsort(seg_starts, kind='stable')
+    sorted_starts = seg_starts[order]
+    reach = np.maximum.accumulate(seg_ends[order]) if len(order) else seg_ends
+
+    his = np.searchsorted(sorted_starts, turn_ends, side='left')
+    los = np.searchsorted(reach, turn_starts, side='right')
+
+    for index in range(len(turn_starts)):
+        lo, hi = los[index], his[index]
+        if lo >= hi:
+            yield index, ()
+            continue
+        candidates = order[lo:hi]
+        candidates = candidates[seg_ends[candidates] > turn_starts[index]]
+        yield index, np.sort(candidates)
+
+
+def align_segments(turns, whisper_segments, split_by_overlap=False):
+    """Attach Whisper text to diarization turns.
+
+    `turns` is a list of (start, end, speaker_label) tuples in diarization
+    order and `whisper_segments` the Whisper segment dicts. By default every
+    Whisper segment that overlaps a turn is attached to it in full, as the
+    original alignment loop did. With `split_by_overlap` the words of a
+    segment are instead divided between the turns it overlaps in proportion
+    to the overlap, so text is not repeated across speakers.
+    """
+    if not turns:
+        return []
+
+    turn_starts = np.fromiter((float(turn[0]) for turn in turns), dtype=np.float64, count=len(turns))
+    turn_ends = np.fromiter((float(turn[1]) for turn in turns), dtype=np.float64, count=len(turns))
+    seg_starts = np.fromiter((float(seg['start']) for seg in whisper_segments), dtype=np.float64, count=len(whisper_segments))
+    seg_ends = np.fromiter((float(seg['end']) for seg in whisper_segments), dtype=np.float64, count=len(whisper_segments))
+
+    candidates = _overlap_candidates(turn_starts, turn_ends, seg_starts, seg_ends)
+    if split_by_overlap:
+        turn_texts = _split_texts_by_overlap(candidates, turn_starts, turn_ends, seg_starts, seg_ends, whisper_segments)
+    else:
+        turn_texts = [
+            ''.join(" " + whisper_segments[seg_index]['text'] for seg_index in seg_indices)
+            for _, seg_indices in candidates
+        ]
+
+    segments = []
+    for (start, end, speaker), segment_text in zip(turns, turn_texts):
+        # Only add segments that have text
+        if not segment_text.strip():
+            continue
+        text = clean_text(segment_text)
+        if text:
+            segments.append({
+                "speaker": speaker_name(speaker),
+                "text": text,
+                "start": round(float(start), 2),
+                "end": round(float(end), 2),
+                "time": format_time_range(start, end)
+            })
+    return segments
+
+
+def _split_texts_by_overlap(candidates, turn_starts, turn_ends, seg_starts, seg_ends, whisper_segments):
+    """Divide the words of each Whisper segment between the turns it overlaps."""
+    turns_by_segment = {}
+    for turn_index, seg_indices in candidates:
+        for seg_index in seg_indices:
+            turns_by_segment.setdefault(int(seg_index), []).append(turn_index)
+
+    pieces = [[] for _ in range(len(turn_starts))]
+    for seg_index in sorted(turns_by_segment):
+        turn_indices = turns_by_segment[seg_index]
+        text = whisper_segments[seg_index]['text']
+        if len(turn_indices) == 1:
+            pieces[turn_indices[0]].append(text)
+            continue
+
+        turn_indices = np.array(sorted(turn_indices, key=lambda i: (turn_starts[i], turn_ends[i])))
+        overlaps = (
+            np.minimum(turn_ends[turn_indices], seg_ends[seg_index])
+            - np.maximum(turn_starts[turn_indices], seg_starts[seg_index])
+        ).clip(min=0.0)
+        words = text.split()
+        total = overlaps.sum()
+        if total <= 0 or not words:
+            pieces[turn_indices[0]].append(text)
+            continue
+
+        bounds = np.rint(np.cumsum(overlaps) / total * len(words)).astype(int)
+        previous = 0
+        for turn_index, bound in zip(turn_indices, bounds):
+            if bound > previous:
+                pieces[turn_index].append(' '.join(words[previous:bound]))
+            previous = bound
+
+    return [''.join(" " + piece for piece in turn_pieces) for turn_pieces in pieces]
+
+
+class StreamingAligner:
+    """Align Whisper output window by window against the full diarization.
+
+    A turn can be aligned once Whisper has covered its end, because any
+    segment overlapping it must start before that. Turns are released in
+    start order and Whisper segments are dropped as soon as no pending turn
+    can overlap them, so only the text around the current window is kept.
+    """
+
+    def __init__(self, turns, split_by_overlap=False):
+        self.turns = turns
+        self.split_by_overlap = split_by_overlap
+        self._next_turn = 0
+        self._buffer = []
+
+    def add_window(self, whisper_segments, window_end, final=False):
+        """Add the segments of a finished window and return newly aligned speaker segments."""
+        self._buffer.extend(whisper_segments)
+
+        ready_from = self._next_turn
+        while self._next_turn < len(self.turns) and (
+            final or self.turns[self._next_turn][1] <= window_end
+        ):
+            self._next_turn += 1
+        ready = self.turns[ready_from:self._next_turn]
+        aligned = align_segments(ready, self._buffer, self.split_by_overlap) if ready else []
+
+        if self._next_turn < len(self.turns):
+            pending_start = float(self.turns[self._next_turn][0])
+            self._buffer = [seg for seg in self._buffer if float(seg['end']) > pending_start]
+        else:
+            self._buffer = []
+        return aligned
+
+
+class SegmentMerger:
+    """Merge consecutive same-speaker segments that are less than `max_gap` seconds apart.
+
+    Segments must be fed in start order. The open segment keeps its
+    sentences as a list together with the set of their normalized forms, so
+    each merge only splits the incoming text instead of re-cleaning the
+    whole accumulated string. The result is the same as repeatedly calling
+    clean_text(current + ' ' + next): only the last sentence can run into
+    the next text, so it is popped and re-checked together with the first
+    piece of the incoming text. Text and time are formatted once, when the
+    segment is closed.
+    """
+
+    def __init__(self, max_gap=1.0):
+        self.max_gap = max_gap
+        self._current = None
+        self._sentences = None
+        self._normalized = None
+        self._seen = None
+
+    def add(self, segment):
+        """Feed the next segment and return the segments closed by it."""
+        current = self._current
+        if current is not None and (
+            segment['speaker'] == current['speaker'] and
+            segment['start'] - current['end'] < self.max_gap
+        ):
+            current['end'] = max(current['end'], segment['end'])
+            self._merge_text(segment['text'])
+            return []
+
+        closed = self.close()
+        self._current = segment
+        return closed
+
+    def close(self):
+        """Close the open segment, if any, and return it."""
+        current = self._current
+        if current is None:
+            return []
+        if self._sentences is not None:
+            current['text'] = '. '.join(self._sentences)
+            current['time'] = format_time_range(current['start'], current['end'])
+        self._current = None
+        self._sentences = self._normalized = self._seen = None
+        return [current]
+
+    def _merge_text(self, text):
+        if self._sentences is None:
+            # First merge: the open segment's text may not be cleaned yet
+            self._sentences, self._normalized, self._seen = [], [], set()
+            for piece in (self._current['text'] + ' ' + text).split('.'):
+                self._add_sentence(piece)
+            return
+
+        pieces = text.split('.')
+        if self._sentences:
+            # The last sentence has no closing period, so it runs into the new text
+            last = self._sentences.pop()
+            self._seen.discard(self._normalized.pop())
+            self._add_sentence(last + ' ' + pieces[0])
+        else:
+            self._add_sentence(pieces[0])
+        for piece in pieces[1:]:
+            self._add_sentence(piece)
+
+    def _add_sentence(self, piece):
+        sentence = piece.strip()
+        if not sentence:
+            return
+        normalized = ' '.join(sentence.lower().split())
+        if normalized not in self._seen:
+            self._sentences.append(sentence)
+            self._normalized.append(normalized)
+            self._seen.add(normalized)
+
+
+def merge_overlapping_segments(segments, max_gap=1.0):
+    """Merge segments that have overlapping or very close timestamps."""
+    if not segments:
+        return segments
+
+    merger = SegmentMerger(max_gap=max_gap)
+    merged = []
+    for segment in sorted(segments, key=lambda x: x['start']):
+        merged.extend(merger.add(segment))
+    merged.extend(merger.close())
+    return merged
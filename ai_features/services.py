@@ -1,156 +1,472 @@
 import os
 import json
+import pyannote.audio
 from pyannote.audio import Pipeline
 import torch
+import transformers
 from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
 import whisper
 from django.conf import settings
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+from .admission import Overloaded, admission
+from .batching import MicroBatcher
+from .metrics import observe_stage, record_transcription
+from .longform import transcribe_chunked
+from .audio import (
+    SAMPLE_RATE, load_audio, audio_duration, detect_speech, SpeechTimeline, condense_to_speech
+)
+from .registry import model_registry
+from .titles import extract_keyphrases, keyword_titles
+from .segments import (
+    SegmentMerger,
+    StreamingAligner,
+    align_segments,
+    clean_text,
+    format_time_range,
+    format_timestamp,
+    merge_overlapping_segments,
+)
 
 logger = logging.getLogger(__name__)
 
+PYANNOTE_PIPELINE_NAME = "pyannote/speaker-diarization-3.0"
+# Approximate resident size of each Whisper tier on CPU in MB, used for the
+# registry's memory budget before a tier has been loaded
+WHISPER_TIER_MEMORY_MB = {
+    "tiny": 160, "tiny.en": 160,
+    "base": 300, "base.en": 300,
+    "small": 1000, "small.en": 1000,
+    "medium": 3100, "medium.en": 3100,
+    "large": 6200, "large-v1": 6200, "large-v2": 6200, "large-v3": 6200,
+}
+TITLE_MODEL_NAME = "gpt2"
+TITLE_GENERATION_KWARGS = {
+    "temperature": 0.8,
+    "top_k": 50,
+    "top_p": 0.95,
+    "do_sample": True,
+    "no_repeat_ngram_size": 2,
+}
+# Bump when the title prompts or post-processing change
+TITLE_PIPELINE_VERSION = 1
+# Bump when the alignment or post-processing changes the transcription output
+TRANSCRIPTION_PIPELINE_VERSION = 2
+
+
+def load_pyannote_pipeline():
+    """Load the pyannote speaker diarization pipeline onto the available device."""
+    # Check for HF_TOKEN
+    hf_token = os.getenv('HF_TOKEN')
+    if not hf_token:
+        raise Exception("HF_TOKEN environment variable is not set. Please set it in your .env file.")
+    logger.info("HF_TOKEN found")
+
+    logger.info("Loading pyannote pipeline...")
+    try:
+        diarization_pipeline = Pipeline.from_pretrained(
+            PYANNOTE_PIPELINE_NAME,
+            use_auth_token=hf_token
+        )
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        logger.info(f"Using device: {device}")
+        diarization_pipeline = diarization_pipeline.to(device)
+        logger.info("Pyannote pipeline loaded successfully")
+        return diarization_pipeline
+    except Exception as e:
+        logger.error(f"Error loading pyannote pipeline: {str(e)}")
+        raise Exception("Failed to initialize pyannote pipeline. Please check your HF_TOKEN and internet connection.")
+
+
+def runs_int8(name):
+    """Return whether the model `name` ('whisper' or 'gpt2') is loaded with int8 quantization."""
+    if name not in settings.QUANTIZED_MODELS:
+        # Keeps torch's quantization modules unimported when it is off
+        return False
+    from .quantization import quantization_enabled
+
+    return quantization_enabled(name)
+
+
+def whisper_tier_memory_mb(tier):
+    """Return the approximate resident size of a Whisper tier, or None if unknown."""
+    memory_mb = WHISPER_TIER_MEMORY_MB.get(tier)
+    if memory_mb is not None and runs_int8('whisper'):
+        # int8 linear layers take a quarter of the space, but the token
+        # embedding stays fp32; together that is roughly half
+        return memory_mb // 2
+    return memory_mb
+
+
+def whisper_model_key(tier=None):
+    """Return the registry name of a Whisper tier (the default tier without one)."""
+    return f"whisper-{tier or settings.WHISPER_MODEL}"
+
+
+def load_whisper_model(tier):
+    """Load the Whisper speech recognition model of the given tier, in int8 if configured."""
+    logger.info(f"Loading Whisper model '{tier}'...")
+    try:
+        if runs_int8('whisper'):
+            from .quantization import load_quantized
+
+            whisper_model = load_quantized(
+                f"whisper-{tier}@{getattr(whisper, '__version__', 'unknown')}",
+                lambda: whisper.load_model(tier, device="cpu"),
+            )
+            logger.info("Whisper model loaded successfully (int8)")
+            return whisper_model
+        if 'whisper' in settings.QUANTIZED_MODELS:
+            logger.warning("Not quantizing whisper: dynamic int8 quantization only runs on CPU")
+        whisper_model = whisper.load_model(tier)
+        logger.info("Whisper model loaded successfully")
+        return whisper_model
+    except Exception as e:
+        logger.error(f"Error loading Whisper model: {str(e)}")
+        raise Exception("Failed to initialize Whisper model. Please check if the model is properly installed.")
+
+
+def load_title_generator():
+    """Load the GPT-2 text generation pipeline used for title suggestions, in int8 if configured."""
+    model = TITLE_MODEL_NAME
+    if runs_int8('gpt2'):
+        from .quantization import load_quantized
+
+        model = load_quantized(
+            f"{TITLE_MODEL_NAME}@transformers{transformers.__version__}",
+            lambda: AutoModelForCausalLM.from_pretrained(TITLE_MODEL_NAME),
+        )
+    elif 'gpt2' in settings.QUANTIZED_MODELS:
+        logger.warning("Not quantizing gpt2: dynamic int8 quantization only runs on CPU")
+    generator = pipeline(
+        "text-generation",
+        model=model,
+        tokenizer=AutoTokenizer.from_pretrained(TITLE_MODEL_NAME),
+        device="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    # GPT-2 has no padding token. Batched generation pads prompts on the left
+    # with EOS so every prompt ends right where generation starts.
+    generator.tokenizer.pad_token = generator.tokenizer.eos_token
+    generator.tokenizer.padding_side = 'left'
+    return generator
+
+
+@contextmanager
+def timed_stage(timings, name):
+    """Record the wall-clock seconds spent inside the block as timings[name].
+
+    The duration is also observed in the stage histogram of /api/metrics/.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings[name] = round(elapsed, 3)
+        observe_stage('transcription', name, elapsed)
+
+
 class TranscriptionService:
     def __init__(self):
         try:
             logger.info("Initializing TranscriptionService...")
-            
-            # Check for HF_TOKEN
-            hf_token = os.getenv('HF_TOKEN')
-            if not hf_token:
-                raise Exception("HF_TOKEN environment variable is not set. Please set it in your .env file.")
-            logger.info("HF_TOKEN found")
-            
-            # Initialize pyannote pipeline
-            logger.info("Loading pyannote pipeline...")
-            try:
-                self.pipeline = Pipeline.from_pretrained(
-                    "pyannote/speaker-diarization-3.0",
-                    use_auth_token=hf_token
-                )
-                self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-                logger.info(f"Using device: {self.device}")
-                self.pipeline = self.pipeline.to(self.device)
-                logger.info("Pyannote pipeline loaded successfully")
-            except Exception as e:
-                logger.error(f"Error loading pyannote pipeline: {str(e)}")
-                raise Exception("Failed to initialize pyannote pipeline. Please check your HF_TOKEN and internet connection.")
-            
-            # Initialize Whisper model
-            logger.info("Loading Whisper model...")
-            try:
-                self.whisper_model = whisper.load_model('base')
-                logger.info("Whisper model loaded successfully")
-            except Exception as e:
-                logger.error(f"Error loading Whisper model: {str(e)}")
-                raise Exception("Failed to initialize Whisper model. Please check if the model is properly installed.")
-            
+            # Models are shared through the registry, so only the first
+            # service in a process pays the loading cost.
+            self.pipeline = model_registry.get('pyannote')
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            # Other tiers are loaded on first use and may be evicted again
+            model_registry.get(whisper_model_key())
+            self._stage_executor = None
+            self._stage_executor_lock = threading.Lock()
             logger.info("TranscriptionService initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing TranscriptionService: {str(e)}")
             raise
 
-    def format_timestamp(self, seconds):
+    @staticmethod
+    def cache_version(model=None):
+        """Identify the models and post-processing that produce a transcription result."""
+        return (
+            f"whisper={model or settings.WHISPER_MODEL}{'+int8' if runs_int8('whisper') else ''}@{getattr(whisper, '__version__', 'unknown')};"
+            f"pyannote={PYANNOTE_PIPELINE_NAME}@{getattr(pyannote.audio, '__version__', 'unknown')};"
+            f"pipeline={TRANSCRIPTION_PIPELINE_VERSION};"
+            f"split={int(settings.TRANSCRIPTION_SPLIT_SEGMENTS)};"
+            f"vad={settings.TRANSCRIPTION_VAD_AGGRESSIVENESS if settings.TRANSCRIPTION_VAD else 'off'}"
+            # Never let stub output into a cache shared with real models
+            + (";stub" if settings.STUB_MODELS else "")
+        )
+
+    @classmethod
+    def cache_versions(cls):
+        """Return the cache versions of every selectable Whisper tier."""
+        return {cls.cache_version(tier) for tier in settings.WHISPER_MODEL_TIERS}
+
+    @staticmethod
+    def format_timestamp(seconds):
         """Convert seconds to MM:SS.mmm format"""
-        minutes = int(seconds // 60)
-        remaining_seconds = seconds % 60
-        return f"{minutes:02d}:{remaining_seconds:06.3f}"
+        return format_timestamp(seconds)
 
-    def clean_text(self, text):
+    @staticmethod
+    def clean_text(text):
         """Clean up transcribed text by removing redundant parts and formatting."""
-        # Remove repeated sentences that might appear due to diarization overlap
-        sentences = text.split('.')
-        unique_sentences = []
-        seen_texts = set()  # Track unique text segments
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            # Normalize the sentence for comparison
-            normalized = ' '.join(sentence.lower().split())
-            if sentence and normalized not in seen_texts:
-                unique_sentences.append(sentence)
-                seen_texts.add(normalized)
-        
-        return '. '.join(unique_sentences).strip()
+        return clean_text(text)
 
     def merge_overlapping_segments(self, segments):
         """Merge segments that have overlapping or very close timestamps."""
-        if not segments:
-            return segments
-            
-        # Sort segments by start time
-        sorted_segments = sorted(segments, key=lambda x: x['start'])
-        merged = []
-        current = sorted_segments[0]
-        
-        for next_seg in sorted_segments[1:]:
-            # If segments are from same speaker and close in time (within 1 second)
-            if (next_seg['speaker'] == current['speaker'] and 
-                next_seg['start'] - current['end'] < 1.0):
-                # Merge the segments
-                current['end'] = max(current['end'], next_seg['end'])
-                current['text'] = self.clean_text(current['text'] + ' ' + next_seg['text'])
-                current['time'] = f"{self.format_timestamp(current['start'])} → {self.format_timestamp(current['end'])}"
-            else:
-                merged.append(current)
-                current = next_seg
-        
-        merged.append(current)
-        return merged
+        return merge_overlapping_segments(segments)
 
-    def transcribe_audio(self, audio_path):
-        try:
-            logger.info(f"Starting transcription for file: {audio_path}")
-            
-            if not os.path.exists(audio_path):
-                raise Exception(f"Audio file not found: {audio_path}")
-            
-            # First get the transcription from Whisper
+    def _get_stage_executor(self):
+        if self._stage_executor is None:
+            with self._stage_executor_lock:
+                if self._stage_executor is None:
+                    self._stage_executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix='transcription-stage'
+                    )
+        return self._stage_executor
+
+    def _run_whisper(self, audio, timings, num_threads=None, initial_prompt="This is an audio clip.",
+                     blocking=False, model=None):
+        """Transcribe a decoded waveform with the Whisper tier `model`.
+
+        The model call holds a Whisper admission slot, which also covers
+        loading a tier that is not resident; without `blocking` Overloaded is
+        raised when the wait queue is full.
+        """
+        if num_threads:
+            # With OpenMP builds the intra-op thread count applies to the calling thread
+            torch.set_num_threads(num_threads)
+        with admission.slot('whisper', blocking):
             logger.info("Starting transcription with Whisper...")
             try:
-                result = self.whisper_model.transcribe(
-                    audio_path,
-                    language="en",
-                    task="transcribe",
-                    initial_prompt="This is an audio clip.",
-                    temperature=0.0
-                )
+                whisper_model = model_registry.get(whisper_model_key(model))
+                with timed_stage(timings, 'whisper'):
+                    result = whisper_model.transcribe(
+                        audio,
+                        language="en",
+                        task="transcribe",
+                        initial_prompt=initial_prompt,
+                        temperature=0.0
+                    )
                 logger.info("Whisper transcription completed successfully")
+                return result
             except Exception as e:
                 logger.error(f"Error during transcription: {str(e)}")
                 raise Exception("Failed to transcribe audio")
 
+    def _run_diarization(self, audio, timings, num_threads=None, return_embeddings=False, blocking=False):
+        """Run speaker diarization on a decoded waveform.
+
+        With `return_embeddings` a (diarization, speaker embeddings) pair is
+        returned; the embeddings are None if the installed pyannote version
+        cannot provide them. The pipeline call holds a pyannote admission slot.
+        """
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        logger.info("Starting diarization...")
+        waveform = {
+            "waveform": torch.from_numpy(audio).unsqueeze(0),
+            "sample_rate": SAMPLE_RATE,
+        }
+        with admission.slot('pyannote', blocking), timed_stage(timings, 'diarization'):
+            if not return_embeddings:
+                return self.pipeline(waveform)
+            try:
+                return self.pipeline(waveform, return_embeddings=True)
+            except TypeError:
+                logger.warning("Installed pyannote cannot return speaker embeddings")
+                return self.pipeline(waveform), None
+
+    @staticmethod
+    def _record_overlap(timings, inference_started):
+        """Record the inference wall time and how much Whisper and diarization overlapped."""
+        wall = time.perf_counter() - inference_started
+        timings['inference_wall'] = round(wall, 3)
+        busy = timings.get('whisper', 0.0) + timings.get('diarization', 0.0)
+        timings['stage_overlap'] = round(max(busy - wall, 0.0), 3)
+
+    def _skip_silence(self, audio, timings):
+        """Cut a waveform down to its speech regions.
+
+        Returns the condensed audio, the SpeechTimeline that maps its times
+        back to the original recording (None when nothing was cut) and the
+        stats reported in the response.
+        """
+        original_seconds = audio_duration(audio)
+        with timed_stage(timings, 'vad'):
+            regions = detect_speech(audio, aggressiveness=settings.TRANSCRIPTION_VAD_AGGRESSIVENESS)
+
+        # With nothing above the noise floor the models see the whole file
+        timeline, speech_seconds = None, original_seconds
+        if len(regions):
+            timeline = SpeechTimeline(regions)
+            audio = condense_to_speech(audio, regions)
+            speech_seconds = timeline.speech_seconds
+
+        stats = {
+            "regions": len(regions),
+            "speech_seconds": round(speech_seconds, 2),
+            "skipped_seconds": round(original_seconds - speech_seconds, 2),
+        }
+        logger.info(
+            f"VAD kept {stats['speech_seconds']:.1f}s of {original_seconds:.1f}s "
+            f"in {stats['regions']} regions"
+        )
+        return audio, timeline, stats
+
+    @staticmethod
+    def _restore_whisper_timeline(result, timeline):
+        """Map Whisper segment times from the condensed audio to the original recording."""
+        segments = result["segments"]
+        starts = timeline.to_original([float(seg["start"]) for seg in segments])
+        ends = timeline.to_original([float(seg["end"]) for seg in segments], is_end=True)
+        return {
+            **result,
+            "segments": [
+                {**seg, "start": float(start), "end": float(end)}
+                for seg, start, end in zip(segments, starts, ends)
+            ],
+        }
+
+    @staticmethod
+    def _restore_turn_timeline(turns, timeline):
+        """Map diarization turn times from the condensed audio to the original recording."""
+        starts = timeline.to_original([float(turn[0]) for turn in turns])
+        ends = timeline.to_original([float(turn[1]) for turn in turns], is_end=True)
+        return [
+            (float(start), float(end), turn[2])
+            for turn, start, end in zip(turns, starts, ends)
+        ]
+
+    @staticmethod
+    def _decode(audio_path, timings):
+        if not os.path.exists(audio_path):
+            raise Exception(f"Audio file not found: {audio_path}")
+
+        logger.info("Decoding audio...")
+        try:
+            with timed_stage(timings, 'decode'):
+                audio = load_audio(audio_path)
+        except Exception as e:
+            logger.error(f"Error decoding audio: {str(e)}")
+            raise Exception("Failed to decode audio")
+        logger.info(f"Decoded {audio_duration(audio):.1f}s of audio in {timings['decode']:.2f}s")
+        return audio
+
+    def transcribe_audio(self, audio_path, progress_callback=None, blocking=False, audio=None, model=None):
+        """Transcribe and diarize an audio file.
+
+        `progress_callback`, when given, is called with a float between 0 and 1
+        as the pipeline moves through its stages. Overloaded propagates to the
+        caller unless `blocking` is set, in which case model slots are waited
+        for however long the queue is. `audio` is the already decoded
+        waveform of `audio_path`, as the model server receives it. `model`
+        picks the Whisper tier, WHISPER_MODEL by default.
+        """
+        def report_progress(value):
+            if progress_callback:
+                progress_callback(value)
+
+        try:
+            logger.info(f"Starting transcription for file: {audio_path}")
+
+            timings = {}
+            started = time.perf_counter()
+
+            # Decode once and share the waveform between Whisper and pyannote
+            if audio is None:
+                audio = self._decode(audio_path, timings)
+            audio_seconds = audio_duration(audio)
+
+            # Drop silence before inference; timestamps are mapped back below
+            timeline, vad_stats = None, None
+            if settings.TRANSCRIPTION_VAD:
+                audio, timeline, vad_stats = self._skip_silence(audio, timings)
+            
+            # Long recordings can be split into chunks processed by several worker processes
+            use_chunks = (
+                settings.TRANSCRIPTION_CHUNKED_WORKERS > 0 and
+                audio_duration(audio) >= settings.TRANSCRIPTION_CHUNKED_MIN_SECONDS
+            )
+
+            # Whisper and diarization only meet at the alignment step, so they
+            # can run side by side when parallel stages are enabled
+            inference_started = time.perf_counter()
+            diarization_future = None
+            if use_chunks:
+                # The worker processes run both models, so hold both slots for the whole run
+                with admission.slot('whisper', blocking), admission.slot('pyannote', blocking):
+                    # Load the tier before the workers fork so they share it
+                    model_registry.get(whisper_model_key(model))
+                    result, chunk_turns, chunk_timings = transcribe_chunked(
+                        self,
+                        audio,
+                        chunk_seconds=settings.TRANSCRIPTION_CHUNK_SECONDS,
+                        num_workers=settings.TRANSCRIPTION_CHUNKED_WORKERS,
+                        threads_per_worker=settings.TRANSCRIPTION_CHUNK_WORKER_THREADS,
+                        speaker_threshold=settings.TRANSCRIPTION_CHUNK_SPEAKER_THRESHOLD,
+                        progress_callback=progress_callback,
+                        model=model,
+                    )
+                timings.update(chunk_timings)
+            elif settings.TRANSCRIPTION_PARALLEL_STAGES:
+                executor = self._get_stage_executor()
+                whisper_future = executor.submit(
+                    self._run_whisper, audio, timings, settings.TRANSCRIPTION_WHISPER_THREADS, blocking=blocking,
+                    model=model
+                )
+                diarization_future = executor.submit(
+                    self._run_diarization, audio, timings, settings.TRANSCRIPTION_DIARIZATION_THREADS,
+                    blocking=blocking
+                )
+                try:
+                    result = whisper_future.result()
+                except BaseException:
+                    # Don't leave pyannote holding its slot for a request that already failed
+                    if not diarization_future.cancel():
+                        wait([diarization_future])
+                    raise
+                report_progress(0.5)
+            else:
+                result = self._run_whisper(audio, timings, blocking=blocking, model=model)
+                report_progress(0.5)
+
+            if timeline is not None:
+                result = self._restore_whisper_timeline(result, timeline)
+
             # Then perform diarization
-            logger.info("Starting diarization...")
             try:
-                diarization = self.pipeline(audio_path)
+                if use_chunks:
+                    turns = chunk_turns
+                else:
+                    if diarization_future is not None:
+                        diarization = diarization_future.result()
+                    else:
+                        diarization = self._run_diarization(audio, timings, blocking=blocking)
+                    turns = [
+                        (turn.start, turn.end, speaker)
+                        for turn, _, speaker in diarization.itertracks(yield_label=True)
+                    ]
+                if timeline is not None:
+                    turns = self._restore_turn_timeline(turns, timeline)
+                self._record_overlap(timings, inference_started)
+                report_progress(0.9)
                 
-                # Extract diarization segments
-                segments = []
-                for turn, track, speaker in diarization.itertracks(yield_label=True):
-                    # Find matching transcription segments
-                    segment_text = ""
-                    for seg in result["segments"]:
-                        seg_start = float(seg['start'])
-                        seg_end = float(seg['end'])
-                        
-                        # If there's overlap between the diarization segment and transcription segment
-                        if (seg_start < turn.end and seg_end > turn.start):
-                            segment_text += " " + seg['text']
-                    
-                    # Only add segments that have text
-                    if segment_text.strip():
-                        clean_text = self.clean_text(segment_text)
-                        if clean_text:  # Only add if there's text after cleaning
-                            segments.append({
-                                "speaker": f"Speaker {speaker.split('_')[-1]}",  # Convert SPEAKER_00 to Speaker 0
-                                "text": clean_text,
-                                "start": round(float(turn.start), 2),
-                                "end": round(float(turn.end), 2),
-                                "time": f"{self.format_timestamp(turn.start)} → {self.format_timestamp(turn.end)}"
-                            })
+                # Attach Whisper text to the diarization turns
+                with timed_stage(timings, 'alignment'):
+                    segments = align_segments(
+                        turns,
+                        result["segments"],
+                        split_by_overlap=settings.TRANSCRIPTION_SPLIT_SEGMENTS
+                    )
                 
                 # Merge overlapping segments
-                segments = self.merge_overlapping_segments(segments)
+                with timed_stage(timings, 'merge'):
+                    segments = self.merge_overlapping_segments(segments)
                 
                 # If no segments were found with speaker diarization, use the full transcription
                 if not segments:
@@ -169,19 +485,27 @@ class TranscriptionService:
                 total_duration = max(seg["end"] for seg in segments)
                 
                 logger.info(f"Processing completed with {len(segments)} segments")
-                return {
+                response = {
                     "segments": segments,
                     "duration": self.format_timestamp(total_duration),
-                    "duration_seconds": round(total_duration, 2)
+                    "duration_seconds": round(total_duration, 2),
+                    "timings": timings
                 }
+                if vad_stats is not None:
+                    response["vad"] = vad_stats
+                record_transcription(audio_seconds, time.perf_counter() - started)
+                return response
                 
+            except Overloaded:
+                raise
             except Exception as e:
                 logger.error(f"Error during diarization: {str(e)}")
+                self._record_overlap(timings, inference_started)
                 # If diarization fails, return the full transcription without speaker separation
                 logger.warning("Falling back to full transcription without speaker diarization")
                 clean_text = self.clean_text(result["text"])
                 end_time = float(result["segments"][-1]["end"]) if result["segments"] else 0.0
-                return {
+                response = {
                     "segments": [{
                         "speaker": "Speaker Unknown",
                         "text": clean_text,
@@ -190,19 +514,137 @@ class TranscriptionService:
                         "time": f"00:00.000 → {self.format_timestamp(end_time)}"
                     }],
                     "duration": self.format_timestamp(end_time),
-                    "duration_seconds": round(end_time, 2)
+                    "duration_seconds": round(end_time, 2),
+                    "timings": timings
                 }
+                if vad_stats is not None:
+                    response["vad"] = vad_stats
+                record_transcription(audio_seconds, time.perf_counter() - started)
+                return response
                 
+        except Overloaded:
+            raise
         except Exception as e:
             logger.error(f"Error in transcribe_audio: {str(e)}")
             return {"error": str(e)}
 
+    def transcribe_stream(self, audio_path, window_seconds=None, audio=None, model=None):
+        """Transcribe an audio file window by window, yielding events as they are ready.
+
+        Diarization runs once over the whole waveform so speaker labels stay
+        consistent, then Whisper runs on consecutive windows. Each finished
+        speaker segment is yielded as {"event": "segment", ...} as soon as
+        the merge step closes it; a final {"event": "done"} event carries
+        the duration and timings. Failures are reported as {"event": "error"}.
+        `audio` and `model` are as for transcribe_audio.
+        """
+        window_seconds = window_seconds or settings.TRANSCRIPTION_STREAM_WINDOW_SECONDS
+        timings = {}
+        try:
+            logger.info(f"Starting streaming transcription for file: {audio_path}")
+            if audio is None:
+                audio = self._decode(audio_path, timings)
+
+            try:
+                diarization = self._run_diarization(audio, timings)
+                turns = [
+                    (turn.start, turn.end, speaker)
+                    for turn, _, speaker in diarization.itertracks(yield_label=True)
+                ]
+            except Overloaded:
+                raise
+            except Exception as e:
+                logger.error(f"Error during diarization: {str(e)}")
+                logger.warning("Streaming without speaker diarization")
+                turns = None
+
+            aligner = StreamingAligner(turns or [], settings.TRANSCRIPTION_SPLIT_SEGMENTS)
+            merger = SegmentMerger()
+            window_samples = int(window_seconds * SAMPLE_RATE)
+            prompt = "This is an audio clip."
+            total_duration = 0.0
+            timings['whisper'] = 0.0
+
+            for offset in range(0, len(audio), window_samples):
+                window = audio[offset:offset + window_samples]
+                window_start = offset / SAMPLE_RATE
+                window_end = window_start + len(window) / SAMPLE_RATE
+                final = offset + window_samples >= len(audio)
+
+                window_timings = {}
+                result = self._run_whisper(window, window_timings, initial_prompt=prompt, model=model)
+                timings['whisper'] = round(timings['whisper'] + window_timings['whisper'], 3)
+                whisper_segments = [
+                    {**seg, 'start': float(seg['start']) + window_start, 'end': float(seg['end']) + window_start}
+                    for seg in result['segments']
+                ]
+                # Condition the next window on the end of this one
+                if result['text'].strip():
+                    prompt = result['text'][-200:]
+
+                if turns:
+                    aligned = aligner.add_window(whisper_segments, window_end, final=final)
+                else:
+                    aligned = []
+                    for seg in whisper_segments:
+                        text = self.clean_text(seg['text'])
+                        if text:
+                            aligned.append({
+                                "speaker": "Speaker Unknown",
+                                "text": text,
+                                "start": round(seg['start'], 2),
+                                "end": round(seg['end'], 2),
+                                "time": format_time_range(seg['start'], seg['end'])
+                            })
+
+                for segment in aligned:
+                    for closed in merger.add(segment):
+                        total_duration = max(total_duration, closed['end'])
+                        yield {"event": "segment", **closed}
+
+            for closed in merger.close():
+                total_duration = max(total_duration, closed['end'])
+                yield {"event": "segment", **closed}
+
+            yield {
+                "event": "done",
+                "duration": self.format_timestamp(total_duration),
+                "duration_seconds": round(total_duration, 2),
+                "timings": timings
+            }
+
+        except Exception as e:
+            logger.error(f"Error in transcribe_stream: {str(e)}")
+            yield {"event": "error", "error": str(e)}
+
 class TitleSuggestionService:
     def __init__(self):
-        self.generator = pipeline(
-            "text-generation",
-            model="gpt2",
-            device="cuda" if torch.cuda.is_available() else "cpu"
+        self.generator = model_registry.get('gpt2')
+        tokenizer = self.generator.tokenizer
+        # Stop each sequence at the first newline ("\n" and "\n\n" are separate GPT-2 tokens)
+        self.stop_token_ids = sorted(
+            {tokenizer.eos_token_id} | {tokenizer.encode(text)[0] for text in ("\n", "\n\n")}
+        )
+
+        # Concurrent requests can share one GPT-2 batch
+        self._batcher = None
+        if settings.TITLE_MICROBATCH_WINDOW_MS > 0:
+            self._batcher = MicroBatcher(
+                self._generate_batch,
+                window_seconds=settings.TITLE_MICROBATCH_WINDOW_MS / 1000.0,
+                max_batch_size=settings.TITLE_MICROBATCH_MAX_PROMPTS,
+            )
+
+    @staticmethod
+    def cache_version():
+        """Identify the model, prompts and generation parameters that produce title suggestions."""
+        params = json.dumps(
+            {**TITLE_GENERATION_KWARGS, "max_new_tokens": settings.TITLE_MAX_NEW_TOKENS}, sort_keys=True
+        )
+        return (
+            f"gpt2={TITLE_MODEL_NAME}{'+int8' if runs_int8('gpt2') else ''};"
+            f"pipeline={TITLE_PIPELINE_VERSION};params={params}"
+            + (";stub" if settings.STUB_MODELS else "")
         )
 
     def clean_title(self, title):
@@ -220,11 +662,29 @@ class TitleSuggestionService:
             title = title[1:-1]
         return title.strip()
 
+    def _generate_batch(self, prompts):
+        """Generate one continuation per prompt in a single padded forward pass."""
+        with admission.slot('gpt2'):
+            started = time.perf_counter()
+            responses = self.generator(
+                prompts,
+                batch_size=len(prompts),
+                max_new_tokens=settings.TITLE_MAX_NEW_TOKENS,
+                min_new_tokens=3,
+                eos_token_id=self.stop_token_ids,
+                pad_token_id=self.generator.tokenizer.eos_token_id,
+                return_full_text=False,
+                num_return_sequences=1,
+                **TITLE_GENERATION_KWARGS
+            )
+            observe_stage('titles', 'generation', time.perf_counter() - started)
+        return [response[0]['generated_text'] for response in responses]
+
     def generate_titles(self, content):
         try:
             # Extract key topics from the content
             first_sentence = content.split('.')[0].strip()
-            topics = [word.strip() for word in first_sentence.split() if len(word) > 3]
+            topics = extract_keyphrases(content)
             
             # Create three different prompts for variety
             prompts = [
@@ -233,26 +693,15 @@ class TitleSuggestionService:
                 f"Generate an engaging headline about {first_sentence}:\n\n"
             ]
             
+            if self._batcher is not None:
+                generated_texts = self._batcher.submit(prompts)
+            else:
+                generated_texts = self._generate_batch(prompts)
+
             titles = []
-            for prompt in prompts:
-                response = self.generator(
-                    prompt,
-                    max_length=len(prompt) + 50,
-                    num_return_sequences=1,
-                    temperature=0.8,
-                    top_k=50,
-                    top_p=0.95,
-                    do_sample=True,
-                    no_repeat_ngram_size=2
-                )
-                
-                # Extract and clean the generated title
-                generated_text = response[0]['generated_text']
-                # Remove the prompt from the generated text
-                if '\n' in generated_text:
-                    generated_text = generated_text.split('\n')[-1]
-                elif ':' in generated_text:
-                    generated_text = generated_text.split(':')[-1]
+            for generated_text in generated_texts:
+                # Generation stops at the first newline, so the title is the first line
+                generated_text = generated_text.strip().split('\n')[0]
                 
                 clean_title = self.clean_title(generated_text)
                 
@@ -260,17 +709,9 @@ class TitleSuggestionService:
                 if clean_title and 3 <= len(clean_title.split()) <= 12:
                     titles.append(clean_title)
             
-            # If we don't have enough good titles, add backup titles
+            # If we don't have enough good titles, add extractive ones built from the content
             if len(titles) < 3:
-                backup_titles = [
-                    f"The Global Impact of Climate Change: A Call to Action",
-                    f"Sustainable Solutions: Fighting Climate Change Together",
-                    f"Green Technology: Our Answer to Climate Crisis"
-                ]
-                while len(titles) < 3:
-                    backup_title = backup_titles[len(titles)]
-                    if backup_title not in titles:
-                        titles.append(backup_title)
+                titles.extend(title for title in keyword_titles(content) if title not in titles)
 
             # Ensure exactly 3 unique titles
             titles = list(dict.fromkeys(titles))[:3]  # Remove duplicates and keep first 3
@@ -278,6 +719,66 @@ class TitleSuggestionService:
 
             return {"suggestions": titles}
             
+        except Overloaded:
+            raise
         except Exception as e:
             logger.error(f"Error in generate_titles: {str(e)}")
-            return {"error": str(e)} 
\ No newline at end of file
+            return {"error": str(e)}
+
+
+if settings.STUB_MODELS:
+    from .stubs import load_stub_pyannote_pipeline, load_stub_title_generator, load_stub_whisper_model
+
+    model_registry.register('pyannote', load_stub_pyannote_pipeline)
+    for tier in settings.WHISPER_MODEL_TIERS:
+        model_registry.register(
+            whisper_model_key(tier), partial(load_stub_whisper_model, tier),
+            memory_mb=settings.STUB_MODEL_PROFILES['whisper']['memory_mb'],
+            evictable=True, warm=tier == settings.WHISPER_MODEL,
+        )
+    model_registry.register('gpt2', load_stub_title_generator)
+else:
+    model_registry.register('pyannote', load_pyannote_pipeline)
+    for tier in settings.WHISPER_MODEL_TIERS:
+        model_registry.register(
+            whisper_model_key(tier), partial(load_whisper_model, tier),
+            memory_mb=whisper_tier_memory_mb(tier), evictable=True, warm=tier == settings.WHISPER_MODEL,
+        )
+    model_registry.register('gpt2', load_title_generator)
+
+_service_lock = threading.Lock()
+_transcription_service = None
+_title_service = None
+
+
+def get_transcription_service(local=False):
+    """Return the process-wide TranscriptionService instance.
+
+    With MODEL_SERVER_SOCKET set this is a client of the model server
+    instead, unless `local` asks for the in-process service, as the model
+    server itself does.
+    """
+    if settings.MODEL_SERVER_SOCKET and not local:
+        from .modelserver import RemoteTranscriptionService
+        return RemoteTranscriptionService()
+
+    global _transcription_service
+    if _transcription_service is None:
+        with _service_lock:
+            if _transcription_service is None:
+                _transcription_service = TranscriptionService()
+    return _transcription_service
+
+
+def get_title_service(local=False):
+    """Return the process-wide TitleSuggestionService instance, or a model server client as above."""
+    if settings.MODEL_SERVER_SOCKET and not local:
+        from .modelserver import RemoteTitleSuggestionService
+        return RemoteTitleSuggestionService()
+
+    global _title_service
+    if _title_service is None:
+        with _service_lock:
+            if _title_service is None:
+                _title_service = TitleSuggestionService()
+    return _title_service
@@ -0,0 +1,149 @@
+"""
+Deterministic stand-ins for Whisper, pyannote and GPT-2, for load testing.
+
+Enabled with STUB_MODELS. Each stub allocates the resident memory and
+spends the compute time configured in STUB_MODEL_PROFILES, then returns
+output in the shape the real model returns, so everything around the
+models (uploads, decoding, alignment, caching, admission control, the
+server configuration) is exercised without downloading anything.
+"""
+import time
+import logging
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WHISPER_SEGMENT_SECONDS = 4.0
+DIARIZATION_TURN_SECONDS = 7.0
+
+
+def _hold_memory(megabytes):
+    """Allocate and touch `megabytes` of memory so it counts towards RSS."""
+    return np.ones(int(megabytes * 1024 * 1024 // 8), dtype=np.float64) if megabytes > 0 else None
+
+
+def _work(seconds):
+    """Spend `seconds` either sleeping or keeping a core busy, per STUB_MODEL_WORK."""
+    if seconds <= 0:
+        return
+    deadline = time.perf_counter() + seconds
+    if settings.STUB_MODEL_WORK != 'cpu':
+        time.sleep(seconds)
+        return
+    matrix = np.random.default_rng(0).standard_normal((128, 128))
+    while time.perf_counter() < deadline:
+        matrix = np.tanh(matrix @ matrix.T)
+
+
+class StubWhisperModel:
+    def __init__(self, profile):
+        self.profile = profile
+        self._memory = _hold_memory(profile['memory_mb'])
+
+    def transcribe(self, audio, **kwargs):
+        duration = len(audio) / SAMPLE_RATE
+        _work(duration * self.profile['seconds_per_audio_second'])
+
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + WHISPER_SEGMENT_SECONDS, duration)
+            index = len(segments)
+            segments.append({
+                "id": index,
+                "start": start,
+                "end": end,
+                "text": f" This is sentence {index} of the synthetic recording.",
+            })
+            start = end
+        return {"text": ''.join(seg['text'] for seg in segments), "segments": segments, "language": "en"}
+
+
+class _Turn:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class StubAnnotation:
+    """The parts of pyannote's Annotation the services use."""
+
+    def __init__(self, turns):
+        self._turns = turns
+
+    def itertracks(self, yield_label=False):
+        for index, (start, end, label) in enumerate(self._turns):
+            if yield_label:
+                yield _Turn(start, end), index, label
+            else:
+                yield _Turn(start, end), index
+
+    def labels(self):
+        return sorted({label for _, _, label in self._turns})
+
+
+class StubDiarizationPipeline:
+    def __init__(self, profile, num_speakers=2):
+        self.profile = profile
+        self.num_speakers = num_speakers
+        self._memory = _hold_memory(profile['memory_mb'])
+
+    def __call__(self, waveform, return_embeddings=False):
+        duration = waveform["waveform"].shape[-1] / waveform["sample_rate"]
+        _work(duration * self.profile['seconds_per_audio_second'])
+
+        turns = []
+        start = 0.0
+        while start < duration:
+            end = min(start + DIARIZATION_TURN_SECONDS, duration)
+            turns.append((start, end, f"SPEAKER_{len(turns) % self.num_speakers:02d}"))
+            start = end
+        annotation = StubAnnotation(turns)
+        if not return_embeddings:
+            return annotation
+        return annotation, np.eye(self.num_speakers, 8)[:len(annotation.labels())]
+
+
+class StubTokenizer:
+    eos_token = '<|endoftext|>'
+    eos_token_id = 50256
+    pad_token = None
+    padding_side = 'right'
+    _ids = {"\n": 198, "\n\n": 628}
+
+    def encode(self, text):
+        return [self._ids.get(text, 0)]
+
+
+class StubTextGenerator:
+    """Mimics a transformers text-generation pipeline called with a batch of prompts."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.tokenizer = StubTokenizer()
+        self._memory = _hold_memory(profile['memory_mb'])
+
+    def __call__(self, prompts, **kwargs):
+        _work(self.profile['seconds_per_call'])
+        return [
+            [{"generated_text": f" Synthetic Headline Number {index} About The Topic\n"}]
+            for index, _ in enumerate(prompts)
+        ]
+
+
+def load_stub_pyannote_pipeline():
+    logger.warning("Using the stub diarization pipeline (STUB_MODELS is set)")
+    return StubDiarizationPipeline(settings.STUB_MODEL_PROFILES['pyannote'])
+
+
+def load_stub_whisper_model(tier=None):
+    logger.warning(f"Using the stub Whisper model for {tier or 'the default'} tier (STUB_MODELS is set)")
+    return StubWhisperModel(settings.STUB_MODEL_PROFILES['whisper'])
+
+
+def load_stub_title_generator():
+    logger.warning("Using the stub title generator (STUB_MODELS is set)")
+    return StubTextGenerator(settings.STUB_MODEL_PROFILES['gpt2'])
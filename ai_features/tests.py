@@ -1,7 +1,36 @@
-from django.test import TestCase, Client
+from django.test import AsyncRequestFactory, TestCase, Client, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+import asyncio
 import json
+import hashlib
+import io
 import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from .admission import AdmissionController, Overloaded
+from .audio import SpeechTimeline, detect_speech, load_audio, split_at_silence
+from .batching import MicroBatcher
+from .cache import TranscriptionResultCache
+from .executor import InferenceExecutor
+from .jobs import claim_next_job
+from .longform import reconcile_speakers
+from .metrics import Histogram, observe_stage
+from .models import Transcription, TranscriptionCacheEntry
+from .registry import ModelRegistry
+from .segments import StreamingAligner, align_segments, merge_overlapping_segments
+from .titles import extract_keyphrases, keyword_titles
+
+def wav_bytes(seconds=0.1, sr=16000):
+    """Return a short WAV file that passes the upload handler's content check."""
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(int(seconds * sr), dtype=np.float32), sr, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
 
 class APITests(TestCase):
     def setUp(self):
@@ -52,3 +81,1066 @@ class APITests(TestCase):
         # Check response
         self.assertEqual(response.status_code, 400)
         self.assertIn('error', response.json())
+
+
+class ModelRegistryTests(TestCase):
+    def test_concurrent_first_requests_load_once(self):
+        registry = ModelRegistry()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        registry.register('fake', loader)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('fake'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(model) for model in results}), 1)
+
+    def test_stats_report_load_time(self):
+        registry = ModelRegistry()
+        registry.register('fake', object)
+        self.assertFalse(registry.stats()['models']['fake']['loaded'])
+
+        registry.get('fake')
+        stats = registry.stats()['models']['fake']
+        self.assertTrue(stats['loaded'])
+        self.assertIn('load_seconds', stats)
+        self.assertIn('rss_delta_mb', stats)
+
+    def test_least_recently_used_evictable_model_makes_room(self):
+        registry = ModelRegistry(memory_budget_mb=1000)
+        registry.register('pinned', object, memory_mb=300)
+        for tier in ('tiny', 'base', 'small'):
+            registry.register(tier, object, memory_mb=300, evictable=True)
+
+        registry.get('pinned')
+        registry.get('tiny')
+        registry.get('base')
+        registry.get('tiny')
+        registry.get('small')
+
+        models = registry.stats()['models']
+        self.assertTrue(models['pinned']['loaded'])
+        self.assertTrue(models['tiny']['loaded'])
+        self.assertFalse(models['base']['loaded'])
+        self.assertEqual(models['base']['evictions'], 1)
+        self.assertEqual(models['tiny']['hits'], 1)
+        self.assertEqual(models['tiny']['loads'], 1)
+        self.assertEqual(registry.stats()['resident_mb'], 900)
+
+    def test_warm_up_skips_models_not_marked_warm(self):
+        registry = ModelRegistry()
+        registry.register('default', object)
+        registry.register('optional', object, warm=False)
+        registry.warm_up()
+
+        self.assertTrue(registry.is_loaded('default'))
+        self.assertFalse(registry.is_loaded('optional'))
+
+
+@override_settings(TRANSCRIPTION_JOB_INPROCESS=False)
+class TranscriptionJobTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_job_mode_returns_job_id(self):
+        audio_file = SimpleUploadedFile("test_audio.wav", wav_bytes(), content_type="audio/wav")
+        response = self.client.post('/api/transcribe/', {'audio_file': audio_file, 'mode': 'job'})
+
+        self.assertEqual(response.status_code, 202)
+        job = Transcription.objects.get(pk=response.json()['job_id'])
+        self.assertEqual(job.status, Transcription.STATUS_PENDING)
+        job.audio_file.delete()
+
+    def test_claim_next_job_is_exclusive(self):
+        job = Transcription.objects.create(status=Transcription.STATUS_PENDING)
+
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Transcription.STATUS_RUNNING)
+        self.assertIsNone(claim_next_job())
+
+    def test_status_endpoint_returns_segments(self):
+        segments = [{"speaker": "Speaker 0", "text": "Hello there", "start": 0.0, "end": 1.5, "time": "00:00.000 → 00:01.500"}]
+        job = Transcription.objects.create(
+            status=Transcription.STATUS_COMPLETED,
+            progress=1.0,
+            segments=segments,
+            duration_seconds=1.5,
+        )
+
+        response = self.client.get(f'/api/transcribe/{job.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['segments'], segments)
+        self.assertEqual(response.json()['duration'], "00:01.500")
+
+        self.assertEqual(self.client.get('/api/transcribe/999999/').status_code, 404)
+
+
+class TranscriptionHistoryTests(TestCase):
+    segments = [
+        {"speaker": "Speaker 0", "text": "Welcome back.", "start": 0.0, "end": 1.5, "time": "00:00.000 → 00:01.500"},
+        {"speaker": "Speaker 1", "text": "Ça va, naïve café?", "start": 1.5, "end": 3.25, "time": "00:01.500 → 00:03.250"},
+        {"speaker": "Speaker 0", "text": "", "start": 3.25, "end": 3.5, "time": "00:03.250 → 00:03.500"},
+        {"speaker": "Speaker 2", "text": "Let's start.", "start": 4.0, "end": 6.0, "time": "00:04.000 → 00:06.000"},
+    ]
+
+    def test_segments_round_trip_and_slice_reads_only_their_text(self):
+        transcription = Transcription.objects.create(
+            status=Transcription.STATUS_COMPLETED, segments=self.segments, duration_seconds=6.0
+        )
+        self.assertEqual(transcription.speakers, ["Speaker 0", "Speaker 1", "Speaker 2"])
+        self.assertEqual(Transcription.objects.get(pk=transcription.pk).segments, self.segments)
+
+        deferred = Transcription.objects.defer('transcription_text').get(pk=transcription.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(deferred.segment_slice(1.5, 3.5), self.segments[1:3])
+        self.assertEqual(deferred.segment_slice(start=3.5), self.segments[3:])
+        self.assertEqual(deferred.segment_slice(3.6, 3.9), [])
+
+    def test_inline_transcription_is_saved(self):
+        from unittest import mock
+        from . import views
+
+        service = mock.Mock()
+        service.transcribe_audio.return_value = {
+            "segments": self.segments, "duration": "00:06.000", "duration_seconds": 6.0
+        }
+        audio_file = SimpleUploadedFile("test_audio.wav", wav_bytes(), content_type="audio/wav")
+        with override_settings(TRANSCRIPTION_CACHE_ENABLED=False), \
+                mock.patch.object(views, 'get_transcription_service', return_value=service):
+            response = self.client.post('/api/transcribe/', {'audio_file': audio_file})
+
+        self.assertEqual(response.status_code, 200)
+        detail = self.client.get(f"/api/transcriptions/{response['X-Transcription-Id']}/", {'start': 3.9, 'end': 10})
+        self.assertEqual(detail.json()['segments'], self.segments[3:])
+        self.assertEqual(detail.json()['segment_count'], 4)
+        self.assertEqual(detail.json()['audio_sha256'], hashlib.sha256(wav_bytes()).hexdigest())
+        self.assertEqual(self.client.get('/api/transcriptions/1/', {'start': 'soon'}).status_code, 400)
+
+    def test_list_pages_by_keyset(self):
+        first = Transcription.objects.create(status=Transcription.STATUS_COMPLETED, segments=self.segments)
+        created = [first] + [Transcription.objects.create(status=Transcription.STATUS_FAILED) for _ in range(4)]
+        # Rows sharing a timestamp are ordered by id
+        Transcription.objects.filter(pk__in=[t.pk for t in created]).update(created_at=first.created_at)
+
+        ids, url = [], '/api/transcriptions/?limit=2'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            ids += [item['id'] for item in page['results']]
+            url = page['next']
+        self.assertEqual(ids, sorted((t.pk for t in created), reverse=True))
+
+        self.assertEqual(self.client.get('/api/transcriptions/', {'status': 'completed'}).json()['results'][0]['id'], first.pk)
+        self.assertEqual(self.client.get('/api/transcriptions/', {'cursor': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/transcriptions/999999/').status_code, 404)
+
+
+class TranscriptionResultCacheTests(TestCase):
+    def make_result(self, text):
+        return {
+            "segments": [{"speaker": "Speaker 0", "text": text, "start": 0.0, "end": 1.0, "time": "00:00.000 → 00:01.000"}],
+            "duration": "00:01.000",
+            "duration_seconds": 1.0,
+        }
+
+    def test_hit_and_miss(self):
+        cache = TranscriptionResultCache(max_bytes=1024 * 1024)
+        self.assertIsNone(cache.get('a' * 64, 'v1'))
+
+        cache.set('a' * 64, 'v1', self.make_result("hello"))
+        self.assertEqual(cache.get('a' * 64, 'v1')['segments'][0]['text'], "hello")
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    @override_settings(TRANSCRIPTION_CACHE_STALE_DAYS=7)
+    def test_new_model_version_drops_only_unused_entries(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        cache = TranscriptionResultCache(max_bytes=1024 * 1024)
+        cache.set('a' * 64, 'v1', self.make_result("hello"))
+        cache.set('b' * 64, 'v1', self.make_result("world"))
+        TranscriptionCacheEntry.objects.filter(audio_sha256='a' * 64).update(
+            last_accessed_at=timezone.now() - timedelta(days=8)
+        )
+
+        self.assertIsNone(cache.get('a' * 64, 'v2'))
+        # Another process may still be producing and reading v1
+        self.assertEqual(
+            list(TranscriptionCacheEntry.objects.filter(model_version='v1').values_list('audio_sha256', flat=True)),
+            ['b' * 64],
+        )
+
+    @override_settings(WHISPER_MODEL_TIERS=['tiny', 'base'])
+    def test_entries_of_other_whisper_tiers_are_kept(self):
+        from .services import TranscriptionService
+
+        cache = TranscriptionResultCache(max_bytes=1024 * 1024)
+        cache.set('a' * 64, TranscriptionService.cache_version('tiny'), self.make_result("hello"))
+
+        self.assertIsNone(cache.get('a' * 64, TranscriptionService.cache_version('base')))
+        self.assertIsNotNone(cache.get('a' * 64, TranscriptionService.cache_version('tiny')))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entry_size = len(json.dumps(self.make_result("x" * 10), ensure_ascii=False).encode('utf-8'))
+        cache = TranscriptionResultCache(max_bytes=entry_size * 2)
+        cache.set('a' * 64, 'v1', self.make_result("a" * 10))
+        cache.set('b' * 64, 'v1', self.make_result("b" * 10))
+        cache.get('a' * 64, 'v1')
+        cache.set('c' * 64, 'v1', self.make_result("c" * 10))
+
+        self.assertIsNotNone(cache.get('a' * 64, 'v1'))
+        self.assertIsNone(cache.get('b' * 64, 'v1'))
+        self.assertIsNotNone(cache.get('c' * 64, 'v1'))
+
+
+class AlignmentTests(TestCase):
+    def setUp(self):
+        self.whisper_segments = [
+            {"start": 0.0, "end": 2.0, "text": " Hello there."},
+            {"start": 2.0, "end": 4.0, "text": " How are you today."},
+            {"start": 4.5, "end": 6.0, "text": " Fine thanks."},
+        ]
+        self.turns = [
+            (0.0, 3.0, "SPEAKER_00"),
+            (3.0, 6.0, "SPEAKER_01"),
+        ]
+
+    def test_overlapping_segments_attach_to_every_turn(self):
+        segments = align_segments(self.turns, self.whisper_segments)
+
+        self.assertEqual([seg['speaker'] for seg in segments], ["Speaker 00", "Speaker 01"])
+        self.assertEqual(segments[0]['text'], "Hello there. How are you today")
+        self.assertEqual(segments[1]['text'], "How are you today. Fine thanks")
+        self.assertEqual(segments[1]['time'], "00:03.000 → 00:06.000")
+
+    def test_split_by_overlap_divides_words(self):
+        segments = align_segments(self.turns, self.whisper_segments, split_by_overlap=True)
+
+        self.assertEqual(segments[0]['text'], "Hello there. How are")
+        self.assertEqual(segments[1]['text'], "you today. Fine thanks")
+
+    def test_turns_without_text_are_skipped(self):
+        segments = align_segments([(10.0, 12.0, "SPEAKER_00")], self.whisper_segments)
+        self.assertEqual(segments, [])
+
+
+class MergeSegmentsTests(TestCase):
+    def segment(self, speaker, text, start, end):
+        return {"speaker": speaker, "text": text, "start": start, "end": end, "time": ""}
+
+    def test_same_speaker_run_is_merged_and_deduplicated(self):
+        segments = [
+            self.segment("Speaker 0", "Hello there. How are you", 0.0, 2.0),
+            self.segment("Speaker 0", "today. Hello there", 2.5, 4.0),
+            self.segment("Speaker 1", "Fine thanks", 4.2, 5.0),
+        ]
+        merged = merge_overlapping_segments(segments)
+
+        self.assertEqual(len(merged), 2)
+        self.assertEqual(merged[0]['text'], "Hello there. How are you today")
+        self.assertEqual(merged[0]['end'], 4.0)
+        self.assertEqual(merged[0]['time'], "00:00.000 → 00:04.000")
+        self.assertEqual(merged[1]['time'], "")
+
+    def test_matches_repeated_clean_text(self):
+        # The last sentence is re-checked after it absorbs the next text,
+        # exactly as re-cleaning the concatenation would do
+        segments = [
+            self.segment("Speaker 0", "x. x", 0.0, 1.0),
+            self.segment("Speaker 0", "y", 1.5, 2.0),
+            self.segment("Speaker 0", ". x y. z", 2.5, 3.0),
+        ]
+        merged = merge_overlapping_segments(segments)
+        self.assertEqual(merged[0]['text'], "x. x y. z")
+
+
+class TitleCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches['titles'].clear()
+        self.addCleanup(caches['titles'].clear)
+
+    def test_normalized_content_is_served_from_cache_until_refreshed(self):
+        from unittest import mock
+        from . import views
+
+        service = mock.Mock()
+        service.generate_titles.side_effect = lambda content: {"suggestions": [f"Title {service.generate_titles.call_count}"]}
+        with mock.patch.object(views, 'get_title_service', return_value=service):
+            first = self.client.post(
+                '/api/suggest-titles/', {'content': 'The  Budget meeting.'}, content_type='application/json'
+            )
+            second = self.client.post(
+                '/api/suggest-titles/', {'content': 'the budget\nmeeting. '}, content_type='application/json'
+            )
+            refreshed = self.client.post(
+                '/api/suggest-titles/', {'content': 'The budget meeting.', 'refresh': True},
+                content_type='application/json'
+            )
+            third = self.client.post(
+                '/api/suggest-titles/', {'content': 'The budget meeting.'}, content_type='application/json'
+            )
+
+        self.assertEqual((first['X-Title-Cache'], second['X-Title-Cache']), ('miss', 'hit'))
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(refreshed['X-Title-Cache'], 'refresh')
+        self.assertEqual(third.json(), {"suggestions": ["Title 2"]})
+        self.assertEqual(service.generate_titles.call_count, 2)
+
+    def test_generation_parameters_are_part_of_the_key(self):
+        from .cache import TitleSuggestionCache
+        from .services import TitleSuggestionService
+
+        cache = TitleSuggestionCache()
+        cache.set('Content', TitleSuggestionService.cache_version(), {"suggestions": ["A"]})
+        with override_settings(TITLE_MAX_NEW_TOKENS=8):
+            self.assertIsNone(cache.get('Content', TitleSuggestionService.cache_version()))
+        self.assertEqual(cache.get(' content ', TitleSuggestionService.cache_version()), {"suggestions": ["A"]})
+        self.assertEqual(cache.stats()['hit_ratio'], 0.5)
+
+
+class KeywordTitleTests(TestCase):
+    content = (
+        "The city council approved a new budget for public transport. Public transport ridership has grown "
+        "since the bus lines were redesigned, and the council wants more bus lines at night."
+    )
+
+    def test_repeated_phrases_rank_first_and_share_no_words(self):
+        keyphrases = extract_keyphrases(self.content)
+
+        self.assertEqual(keyphrases[0], 'Public Transport Ridership')
+        self.assertIn('Bus Lines', keyphrases)
+        words = [word for phrase in keyphrases for word in phrase.lower().split()]
+        self.assertEqual(len(words), len(set(words)))
+
+    def test_titles_are_deterministic_and_well_formed(self):
+        titles = keyword_titles(self.content)
+
+        self.assertEqual(titles, keyword_titles(self.content))
+        self.assertEqual(len(set(titles)), 3)
+        for title in titles:
+            self.assertTrue(3 <= len(title.split()) <= 12)
+        self.assertEqual(len(keyword_titles("and the of it")), 3)
+
+    def test_fast_mode_skips_the_model(self):
+        from unittest import mock
+        from . import views
+
+        with mock.patch.object(views, 'get_title_service') as get_title_service:
+            response = self.client.post(
+                '/api/suggest-titles/?mode=fast', {'content': self.content}, content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['suggestions'], keyword_titles(self.content))
+        get_title_service.assert_not_called()
+
+    def test_overlong_phrases_still_give_three_titles(self):
+        for content in ('a' * 200, 'Supercalifragilisticexpialidocious ' * 2 + 'x' * 120, ''):
+            titles = keyword_titles(content)
+            self.assertEqual(len(titles), 3)
+            self.assertEqual(len(set(titles)), 3)
+            self.assertTrue(all(len(title) <= 100 for title in titles))
+
+
+class MicroBatcherTests(TestCase):
+    def test_concurrent_submissions_share_a_batch(self):
+        batches = []
+
+        def batch_fn(prompts):
+            batches.append(list(prompts))
+            return [prompt.upper() for prompt in prompts]
+
+        batcher = MicroBatcher(batch_fn, window_seconds=0.2, max_batch_size=6)
+        results = {}
+
+        def submit(name):
+            results[name] = batcher.submit([f"{name}-1", f"{name}-2", f"{name}-3"])
+
+        threads = [threading.Thread(target=submit, args=(name,)) for name in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(results['a'], ["A-1", "A-2", "A-3"])
+        self.assertEqual(results['b'], ["B-1", "B-2", "B-3"])
+
+    def test_errors_reach_every_caller(self):
+        def batch_fn(prompts):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher(batch_fn, window_seconds=0.0, max_batch_size=3)
+        with self.assertRaises(ValueError):
+            batcher.submit(["prompt"])
+
+
+class StreamingTranscriptionTests(TestCase):
+    def test_windowed_alignment_matches_full_alignment(self):
+        whisper_segments = [
+            {"start": 0.0, "end": 2.0, "text": " Hello there."},
+            {"start": 2.0, "end": 3.0, "text": " How are you."},
+            {"start": 3.5, "end": 5.0, "text": " Fine thanks."},
+            {"start": 6.0, "end": 8.0, "text": " Great to hear."},
+        ]
+        turns = [(0.0, 2.5, "SPEAKER_00"), (2.5, 5.5, "SPEAKER_01"), (5.5, 8.0, "SPEAKER_00")]
+
+        aligner = StreamingAligner(turns)
+        streamed = []
+        streamed += aligner.add_window(whisper_segments[:2], 3.0)
+        self.assertEqual(len(streamed), 1)
+        streamed += aligner.add_window(whisper_segments[2:3], 6.0)
+        streamed += aligner.add_window(whisper_segments[3:], 8.0, final=True)
+
+        self.assertEqual(streamed, align_segments(turns, whisper_segments))
+
+    def test_stream_mode_returns_ndjson(self):
+        from .cache import transcription_cache
+        from .services import TranscriptionService
+
+        content = wav_bytes()
+        segments = [{"speaker": "Speaker 0", "text": "Hello", "start": 0.0, "end": 1.0, "time": "00:00.000 → 00:01.000"}]
+        transcription_cache.set(
+            hashlib.sha256(content).hexdigest(),
+            TranscriptionService.cache_version(),
+            {"segments": segments, "duration": "00:01.000", "duration_seconds": 1.0},
+        )
+
+        audio_file = SimpleUploadedFile("test_audio.wav", content, content_type="audio/wav")
+        response = self.client.post('/api/transcribe/', {'audio_file': audio_file, 'mode': 'stream'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        events = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(events[0]['event'], 'segment')
+        self.assertEqual(events[0]['text'], "Hello")
+        self.assertEqual(events[-1]['event'], 'done')
+
+
+class ChunkedTranscriptionTests(TestCase):
+    def test_split_at_silence_cuts_in_quiet_region(self):
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(16000 * 100) * 0.3).astype(np.float32)
+        audio[16000 * 28:16000 * 29] = 0.0
+
+        chunks = split_at_silence(audio, chunk_seconds=30)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        self.assertTrue(16000 * 28 <= chunks[0][1] <= 16000 * 29)
+
+    def test_speakers_are_matched_across_chunks(self):
+        alice, bob, carol = np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0])
+        mapping = reconcile_speakers([
+            {'SPEAKER_00': alice, 'SPEAKER_01': bob},
+            {'SPEAKER_00': bob + 0.1, 'SPEAKER_01': carol, 'SPEAKER_02': None},
+            {'SPEAKER_00': alice},
+        ], threshold=0.5)
+
+        self.assertEqual(mapping[(1, 'SPEAKER_00')], mapping[(0, 'SPEAKER_01')])
+        self.assertEqual(mapping[(2, 'SPEAKER_00')], mapping[(0, 'SPEAKER_00')])
+        self.assertEqual(len({mapping[(1, label)] for label in ('SPEAKER_00', 'SPEAKER_01', 'SPEAKER_02')}), 3)
+
+    def test_concurrent_runs_get_their_own_audio(self):
+        from . import longform
+
+        class FakeChunkService:
+            def _run_whisper(self, chunk, timings, model=None):
+                return {'segments': [], 'text': f"{chunk.mean():.0f}"}
+
+            def _run_diarization(self, chunk, timings, return_embeddings=False):
+                raise RuntimeError("no diarization")
+
+        self.addCleanup(longform._discard_pool)
+        service = FakeChunkService()
+        results = {}
+
+        def run(level):
+            audio = np.full(16000 * 3, level, dtype=np.float32)
+            result, _, timings = longform.transcribe_chunked(
+                service, audio, chunk_seconds=1, num_workers=2, threads_per_worker=1, speaker_threshold=0.5
+            )
+            results[level] = (result['text'], timings['chunks'])
+
+        threads = [threading.Thread(target=run, args=(level,)) for level in (1.0, 2.0)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results[1.0], ("1" * results[1.0][1], results[1.0][1]))
+        self.assertEqual(results[2.0], ("2" * results[2.0][1], results[2.0][1]))
+
+
+class VoiceActivityTests(TestCase):
+    def test_silence_is_skipped(self):
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(16000 * 20) * 0.001).astype(np.float32)
+        tone = (np.sin(np.arange(16000 * 3) / 5) * 0.3).astype(np.float32)
+        audio[16000 * 2:16000 * 5] += tone
+        audio[16000 * 10:16000 * 13] += tone
+
+        regions = detect_speech(audio) / 16000
+        self.assertEqual(len(regions), 2)
+        self.assertTrue(1.5 <= regions[0][0] <= 2.0 and 5.0 <= regions[0][1] <= 5.5)
+        self.assertTrue(9.5 <= regions[1][0] <= 10.0 and 13.0 <= regions[1][1] <= 13.5)
+
+    def test_timeline_maps_back_to_original_times(self):
+        timeline = SpeechTimeline([(16000 * 2, 16000 * 5), (16000 * 10, 16000 * 12)])
+        self.assertEqual(timeline.speech_seconds, 5.0)
+        np.testing.assert_allclose(timeline.to_original([0.0, 1.0, 3.0, 4.5]), [2.0, 3.0, 10.0, 11.5])
+        # A segment ending on the seam ends in the first region, not after the gap
+        np.testing.assert_allclose(timeline.to_original([3.0], is_end=True), [5.0])
+
+
+class LoadAudioTests(TestCase):
+    def _write_wav(self, data, sr):
+        handle, path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        sf.write(path, data, sr, subtype='PCM_16')
+        return path
+
+    def test_16khz_mono_wav_is_read_without_resampling(self):
+        tone = (np.sin(np.arange(16000) / 5) * 0.5).astype(np.float32)
+        audio = load_audio(self._write_wav(tone, 16000))
+
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_allclose(audio, tone, atol=1e-4)
+
+    def test_stereo_44khz_wav_is_downmixed_and_resampled(self):
+        t = np.arange(44100) / 44100
+        left = np.sin(2 * np.pi * 440 * t) * 0.4
+        audio = load_audio(self._write_wav(np.stack([left, left * 0.5], axis=1), 44100))
+
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(len(audio), 16000)
+        expected = np.sin(2 * np.pi * 440 * np.arange(16000) / 16000) * 0.3
+        np.testing.assert_allclose(audio[100:-100], expected[100:-100], atol=1e-2)
+
+
+@override_settings(TRANSCRIPTION_JOB_INPROCESS=False)
+class AudioUploadHandlerTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_upload_is_hashed_while_spooled(self):
+        content = wav_bytes()
+        audio_file = SimpleUploadedFile("test_audio.wav", content, content_type="audio/wav")
+        response = self.client.post('/api/transcribe/', {'audio_file': audio_file, 'mode': 'job'})
+
+        self.assertEqual(response.status_code, 202)
+        job = Transcription.objects.get(pk=response.json()['job_id'])
+        self.assertEqual(job.audio_sha256, hashlib.sha256(content).hexdigest())
+        job.audio_file.delete()
+
+    @override_settings(WHISPER_MODEL_TIERS=['tiny', 'base'])
+    def test_unknown_whisper_model_is_rejected(self):
+        audio_file = SimpleUploadedFile("test_audio.wav", wav_bytes(seconds=1), content_type="audio/wav")
+        response = self.client.post('/api/transcribe/', {'audio_file': audio_file, 'mode': 'job', 'model': 'huge'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown model 'huge'", response.json()['error'])
+        self.assertFalse(Transcription.objects.exists())
+
+    def test_job_records_the_whisper_model(self):
+        audio_file = SimpleUploadedFile("test_audio.wav", wav_bytes(seconds=1), content_type="audio/wav")
+        response = self.client.post('/api/transcribe/?mode=job&model=tiny', {'audio_file': audio_file})
+
+        self.assertEqual(response.status_code, 202)
+        job = Transcription.objects.get(pk=response.json()['job_id'])
+        self.assertEqual(job.whisper_model, 'tiny')
+        job.audio_file.delete()
+
+    def test_non_audio_content_is_rejected(self):
+        audio_file = SimpleUploadedFile("test_audio.mp3", b'not really audio', content_type="audio/mpeg")
+        response = self.client.post('/api/transcribe/', {'audio_file': audio_file, 'mode': 'job'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid file content', response.json()['error'])
+        self.assertFalse(Transcription.objects.exists())
+
+    @override_settings(TRANSCRIPTION_MAX_UPLOAD_MB=0)
+    def test_oversize_upload_is_rejected_before_parsing(self):
+        audio_file = SimpleUploadedFile("test_audio.wav", wav_bytes(seconds=5), content_type="audio/wav")
+        response = self.client.post('/api/transcribe/?mode=job', {'audio_file': audio_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('File size exceeds', response.json()['error'])
+
+    @override_settings(TRANSCRIPTION_MAX_UPLOAD_MB=10, TRANSCRIPTION_STREAM_MAX_UPLOAD_MB=200)
+    def test_default_mode_upload_over_inline_limit_is_not_spooled(self):
+        from unittest import mock
+        from . import uploads
+
+        audio_file = SimpleUploadedFile("test_audio.wav", b'\0' * (11 * 1024 * 1024), content_type="audio/wav")
+        with mock.patch.object(uploads, 'TemporaryUploadedFile') as spooled:
+            response = self.client.post('/api/transcribe/', {'audio_file': audio_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('File size exceeds 10MB limit', response.json()['error'])
+        spooled.assert_not_called()
+
+    @override_settings(TRANSCRIPTION_MAX_UPLOAD_MB=0)
+    def test_other_routes_use_the_default_handlers(self):
+        from django.test import RequestFactory
+
+        audio_file = SimpleUploadedFile("notes.txt", b'x' * 200000, content_type="text/plain")
+        request = RequestFactory().post('/admin/login/', {'attachment': audio_file})
+
+        self.assertEqual(request.FILES['attachment'].size, 200000)
+        self.assertFalse(hasattr(request, 'upload_error'))
+
+
+class AdmissionControlTests(TestCase):
+    def test_full_queue_is_rejected_with_retry_after(self):
+        controller = AdmissionController('whisper', slots=1, max_queue=1, max_wait=5)
+        controller.service_seconds = 3.0
+        release = threading.Event()
+        entered = threading.Event()
+
+        def hold_slot():
+            with controller.slot():
+                entered.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_slot)
+        waiter = threading.Thread(target=hold_slot)
+        holder.start()
+        entered.wait(5)
+        waiter.start()
+        while controller.stats()['queue_depth'] < 1:
+            time.sleep(0.01)
+
+        with self.assertRaises(Overloaded) as raised:
+            controller.check()
+        self.assertEqual(raised.exception.retry_after, 6)
+
+        release.set()
+        holder.join()
+        waiter.join()
+        stats = controller.stats()
+        self.assertEqual((stats['admitted'], stats['rejected'], stats['active']), (2, 1, 0))
+
+    def test_waiting_too_long_is_rejected(self):
+        controller = AdmissionController('gpt2', slots=1, max_queue=4, max_wait=0.05)
+        with controller.slot():
+            with self.assertRaises(Overloaded):
+                with controller.slot():
+                    pass
+
+    def test_overloaded_title_request_returns_429(self):
+        from .admission import admission
+
+        admission.reset()
+        self.addCleanup(admission.reset)
+        with override_settings(ADMISSION_MAX_QUEUE=0), admission.slot('gpt2'):
+            response = Client().post(
+                '/api/suggest-titles/',
+                data=json.dumps({'content': 'Some blog content.'}),
+                content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class MetricsTests(TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', 'Test.', labels=('stage',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage='whisper')
+
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{stage="whisper",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="whisper",le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="whisper",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{stage="whisper"} 3', lines)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        observe_stage('transcription', 'alignment', 0.002)
+        response = Client().get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('darwix_stage_seconds_bucket{service="transcription",stage="alignment",le="0.005"}', body)
+        self.assertIn('# TYPE darwix_cache_hit_ratio gauge', body)
+        self.assertIn('darwix_inference_queued{model="whisper"} 0', body)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def _post_titles(self, client, **headers):
+        return client.post('/api/suggest-titles/', data='not json', content_type='application/json', **headers)
+
+    def test_header_triggers_profile_and_ring_buffer_is_bounded(self):
+        from django.contrib.auth.models import User
+
+        client = Client()
+        with override_settings(PROFILING_ENABLED=True, PROFILING_DIR=self.profile_dir, PROFILING_MAX_FILES=2):
+            self.assertNotIn('X-Profile-Id', self._post_titles(client))
+            names = []
+            for _ in range(3):
+                names.append(self._post_titles(client, HTTP_X_PROFILE='1')['X-Profile-Id'])
+                time.sleep(0.002)
+
+            self.assertEqual(sorted(os.listdir(self.profile_dir)), names[1:])
+            self.assertEqual(client.get('/api/profiles/').status_code, 403)
+
+            client.force_login(User.objects.create_user('admin', password='x', is_staff=True))
+            listed = client.get('/api/profiles/').json()['profiles']
+            self.assertEqual([profile['name'] for profile in listed], names[:0:-1])
+            download = client.get(f'/api/profiles/{names[-1]}/')
+            self.assertEqual(download.status_code, 200)
+            self.assertEqual(client.get('/api/profiles/..%2Fsettings.py/').status_code, 404)
+
+
+class StubModelTests(TestCase):
+    def setUp(self):
+        self.profiles = {
+            'whisper': {'seconds_per_audio_second': 0.0, 'memory_mb': 0},
+            'pyannote': {'seconds_per_audio_second': 0.0, 'memory_mb': 0},
+            'gpt2': {'seconds_per_call': 0.0, 'memory_mb': 0},
+        }
+
+    def test_services_run_end_to_end_on_stubs(self):
+        from unittest import mock
+        from .services import TitleSuggestionService, TranscriptionService, model_registry, whisper_model_key
+        from .stubs import load_stub_pyannote_pipeline, load_stub_title_generator, load_stub_whisper_model
+
+        loaders = {
+            'pyannote': load_stub_pyannote_pipeline,
+            whisper_model_key(): load_stub_whisper_model,
+            'gpt2': load_stub_title_generator,
+        }
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f, \
+                override_settings(STUB_MODELS=True, STUB_MODEL_PROFILES=self.profiles), \
+                mock.patch.object(model_registry, 'get', side_effect=lambda name: loaders[name]()):
+            f.write(wav_bytes(seconds=20))
+            f.flush()
+            result = TranscriptionService().transcribe_audio(f.name)
+            titles = TitleSuggestionService().generate_titles("The team discussed the quarterly budget.")
+            self.assertTrue(TranscriptionService.cache_version().endswith(';stub'))
+
+        self.assertNotIn('error', result)
+        self.assertEqual(result['duration_seconds'], 20.0)
+        self.assertEqual({segment['speaker'] for segment in result['segments']}, {'Speaker 00', 'Speaker 01'})
+        self.assertNotIn('error', titles)
+        self.assertEqual(len(titles['suggestions']), 3)
+
+    def test_audio_is_decoded_once_and_shared_by_both_models(self):
+        from unittest import mock
+        from . import services
+        from .services import TranscriptionService, model_registry, whisper_model_key
+        from .stubs import load_stub_pyannote_pipeline, load_stub_whisper_model
+
+        loaders = {'pyannote': load_stub_pyannote_pipeline, whisper_model_key(): load_stub_whisper_model}
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f, \
+                override_settings(STUB_MODELS=True, STUB_MODEL_PROFILES=self.profiles), \
+                mock.patch.object(model_registry, 'get', side_effect=lambda name: loaders[name]()):
+            f.write(wav_bytes(seconds=5))
+            f.flush()
+            service = TranscriptionService()
+            with mock.patch.object(services, 'load_audio', wraps=services.load_audio) as decode, \
+                    mock.patch.object(service, '_run_whisper', wraps=service._run_whisper) as run_whisper, \
+                    mock.patch.object(service, '_run_diarization', wraps=service._run_diarization) as run_diarization:
+                result = service.transcribe_audio(f.name)
+
+        self.assertNotIn('error', result)
+        decode.assert_called_once_with(f.name)
+        # Both models get the one decoded waveform, not the file path
+        self.assertIs(run_whisper.call_args.args[0], run_diarization.call_args.args[0])
+        self.assertIsInstance(run_whisper.call_args.args[0], np.ndarray)
+        self.assertIn('decode', result['timings'])
+        self.assertIn('whisper', result['timings'])
+
+    def test_failed_whisper_stage_waits_for_diarization(self):
+        from unittest import mock
+        from .services import TranscriptionService, model_registry, whisper_model_key
+        from .stubs import load_stub_pyannote_pipeline, load_stub_whisper_model
+
+        loaders = {'pyannote': load_stub_pyannote_pipeline, whisper_model_key(): load_stub_whisper_model}
+        finished = []
+
+        def slow_diarization(*args, **kwargs):
+            time.sleep(0.2)
+            finished.append(True)
+
+        def failing_whisper(*args, **kwargs):
+            # Let diarization start first; one that has not started is cancelled instead
+            time.sleep(0.05)
+            raise RuntimeError("whisper failed")
+
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f, \
+                override_settings(STUB_MODELS=True, STUB_MODEL_PROFILES=self.profiles, TRANSCRIPTION_PARALLEL_STAGES=True), \
+                mock.patch.object(model_registry, 'get', side_effect=lambda name: loaders[name]()):
+            f.write(wav_bytes(seconds=1))
+            f.flush()
+            service = TranscriptionService()
+            with mock.patch.object(service, '_run_whisper', side_effect=failing_whisper), \
+                    mock.patch.object(service, '_run_diarization', side_effect=slow_diarization):
+                result = service.transcribe_audio(f.name)
+
+        self.assertIn('whisper failed', result['error'])
+        self.assertEqual(finished, [True])
+
+
+class AsyncViewTests(TestCase):
+    async def test_suggest_titles_runs_inference_in_executor(self):
+        from unittest import mock
+        from . import views
+
+        threads = []
+
+        class FakeTitleService:
+            def generate_titles(self, content):
+                threads.append(threading.current_thread().name)
+                return {"suggestions": ["One", "Two", "Three"]}
+
+        request = AsyncRequestFactory().post(
+            '/api/suggest-titles/', data={'content': 'The budget meeting.'}, content_type='application/json'
+        )
+        with mock.patch.object(views, 'get_title_service', return_value=FakeTitleService()):
+            response = await views.suggest_titles_async(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['suggestions'], ["One", "Two", "Three"])
+        self.assertTrue(threads[0].startswith('inference-titles'))
+
+    async def test_stream_is_driven_from_executor(self):
+        from unittest import mock
+        from . import views
+
+        paths = []
+
+        class FakeTranscriptionService:
+            def transcribe_stream(self, audio_path, model=None):
+                paths.append(audio_path)
+                yield {'event': 'segment', 'text': 'Hello', 'thread': threading.current_thread().name}
+                yield {'event': 'done', 'duration': '00:00.100', 'duration_seconds': 0.1}
+
+        request = AsyncRequestFactory().post(
+            '/api/transcribe/?mode=stream',
+            {'audio_file': SimpleUploadedFile('test_audio.wav', wav_bytes(), content_type='audio/wav')},
+        )
+        with override_settings(TRANSCRIPTION_CACHE_ENABLED=False), \
+                mock.patch.object(views, 'get_transcription_service', return_value=FakeTranscriptionService()):
+            response = await views.transcribe_async(request)
+            body = b''.join([chunk async for chunk in response.streaming_content])
+        request.close()
+
+        events = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([event['event'] for event in events], ['segment', 'done'])
+        self.assertTrue(events[0]['thread'].startswith('inference-transcription'))
+        self.assertFalse(os.path.exists(paths[0]))
+
+    async def test_executor_rejects_beyond_max_pending(self):
+        executor = InferenceExecutor('titles')
+        release = threading.Event()
+        with override_settings(ASYNC_INFERENCE_WORKERS={'titles': 1}, ASYNC_INFERENCE_MAX_PENDING=2):
+            running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with self.assertRaises(Overloaded):
+                await executor.run(time.sleep, 0)
+            # Later steps of an admitted request are never rejected
+            running.append(asyncio.ensure_future(executor.run(release.wait, admit=False)))
+            await asyncio.sleep(0.05)
+            self.assertEqual(executor.stats()['pending'], 3)
+            release.set()
+            await asyncio.gather(*running)
+
+        self.assertEqual(executor.stats()['completed'], 3)
+        self.assertEqual(executor.stats()['rejected'], 1)
+
+    @override_settings(ASYNC_INFERENCE_MAX_PENDING=1, TRANSCRIPTION_CACHE_ENABLED=False, TRANSCRIPTION_HISTORY_ENABLED=False)
+    async def test_saturated_executor_rejects_stream_requests(self):
+        from unittest import mock
+        from . import views
+
+        started, release = threading.Event(), threading.Event()
+
+        class SlowTranscriptionService:
+            def transcribe_stream(self, audio_path, model=None):
+                # Decoding and the models run in the first step
+                started.set()
+                release.wait(5)
+                yield {'event': 'done', 'duration': '00:00.100', 'duration_seconds': 0.1}
+
+        def stream_request():
+            return AsyncRequestFactory().post(
+                '/api/transcribe/?mode=stream',
+                {'audio_file': SimpleUploadedFile('test_audio.wav', wav_bytes(), content_type='audio/wav')},
+            )
+
+        requests = [stream_request(), stream_request()]
+        with mock.patch.object(views, 'get_transcription_service', return_value=SlowTranscriptionService()):
+            first = asyncio.ensure_future(views.transcribe_async(requests[0]))
+            for _ in range(200):
+                if started.is_set():
+                    break
+                await asyncio.sleep(0.01)
+            rejected = await views.transcribe_async(requests[1])
+            release.set()
+            response = await first
+            body = b''.join([chunk async for chunk in response.streaming_content])
+        for request in requests:
+            request.close()
+
+        self.assertEqual(rejected.status_code, 429)
+        self.assertEqual(json.loads(body)['event'], 'done')
+
+    async def test_job_mode_stays_off_the_shared_sync_thread(self):
+        from unittest import mock
+        from asgiref.sync import sync_to_async
+        from django.http import JsonResponse
+        from . import views
+
+        threads = []
+
+        def fake_job_response(request, audio_file, use_cache, cache_version, model):
+            threads.append(threading.get_ident())
+            return JsonResponse({}, status=202)
+
+        request = AsyncRequestFactory().post(
+            '/api/transcribe/?mode=job',
+            {'audio_file': SimpleUploadedFile('test_audio.wav', wav_bytes(), content_type='audio/wav')},
+        )
+        with mock.patch.object(views, '_job_response', side_effect=fake_job_response):
+            response = await views.transcribe_async(request)
+        request.close()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(threads[0], await sync_to_async(threading.get_ident)())
+
+
+class ModelServerTests(TestCase):
+    def setUp(self):
+        from .modelserver import ModelServer
+
+        socket_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, socket_dir)
+        self.address = os.path.join(socket_dir, 'models.sock')
+        server = ModelServer(self.address)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(server.shutdown)
+        while not os.path.exists(self.address):
+            time.sleep(0.01)
+
+    def test_clients_get_service_results_and_audio_by_shared_memory(self):
+        from unittest import mock
+        from . import services
+
+        received = {}
+
+        class FakeTranscriptionService:
+            def transcribe_audio(self, audio_path, progress_callback=None, blocking=False, audio=None, model=None):
+                received['audio'] = np.array(audio)
+                progress_callback(0.5)
+                return {"segments": [], "duration_seconds": len(audio) / 16000, "timings": {"whisper": 0.1}}
+
+            def transcribe_stream(self, audio_path, window_seconds=None, audio=None, model=None):
+                yield {"event": "segment", "text": "Hello"}
+                yield {"event": "done", "duration_seconds": len(audio) / 16000}
+
+        class FakeTitleService:
+            def generate_titles(self, content):
+                raise Overloaded('gpt2', 7)
+
+        progress = []
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f, \
+                override_settings(MODEL_SERVER_SOCKET=self.address), \
+                mock.patch.object(services, 'get_transcription_service',
+                                  side_effect=lambda local=False: FakeTranscriptionService()), \
+                mock.patch.object(services, 'get_title_service', side_effect=lambda local=False: FakeTitleService()):
+            f.write(wav_bytes(seconds=0.5))
+            f.flush()
+            from .modelserver import RemoteTitleSuggestionService, RemoteTranscriptionService
+
+            result = RemoteTranscriptionService().transcribe_audio(f.name, progress_callback=progress.append)
+            events = list(RemoteTranscriptionService().transcribe_stream(f.name))
+            with self.assertRaises(Overloaded) as raised:
+                RemoteTitleSuggestionService().generate_titles("Budget talks.")
+            np.testing.assert_array_equal(received['audio'], load_audio(f.name))
+
+            with override_settings(MODEL_SERVER_SOCKET=self.address + '.missing'):
+                missing = RemoteTranscriptionService().transcribe_audio(f.name)
+
+        self.assertEqual(result['duration_seconds'], 0.5)
+        self.assertIn('decode', result['timings'])
+        self.assertEqual(progress, [0.5])
+        self.assertEqual(events, [{"event": "segment", "text": "Hello"}, {"event": "done", "duration_seconds": 0.5}])
+        self.assertEqual(raised.exception.retry_after, 7)
+        self.assertIn('Cannot reach the model server', missing['error'])
+
+
+class QuantizationTests(TestCase):
+    @override_settings(QUANTIZED_MODELS=['whisper'])
+    def test_version_and_memory_follow_whether_int8_actually_runs(self):
+        import sys
+        import types
+        from unittest import mock
+        from .services import TranscriptionService, whisper_tier_memory_mb
+
+        for enabled, suffix, memory_mb in ((True, '+int8', 150), (False, '', 300)):
+            # On CUDA, quantization_enabled() is False and the model stays fp32
+            quantization = types.ModuleType('ai_features.quantization')
+            quantization.quantization_enabled = lambda name, enabled=enabled: enabled
+            with mock.patch.dict(sys.modules, {'ai_features.quantization': quantization}):
+                self.assertTrue(TranscriptionService.cache_version('base').startswith(f"whisper=base{suffix}@"))
+                self.assertEqual(whisper_tier_memory_mb('base'), memory_mb)
+
+    def test_whisper_and_gpt2_linear_layers_are_quantized(self):
+        import torch
+        from torch import nn
+        from transformers.pytorch_utils import Conv1D
+        from whisper.model import Linear
+        from .quantization import quantize_int8
+
+        torch.manual_seed(0)
+        model = nn.Sequential(Linear(16, 32), nn.ReLU(), Conv1D(8, 32))
+        inputs = torch.randn(4, 16)
+        with torch.no_grad():
+            expected = model(inputs)
+            quantized = quantize_int8(model)
+            output = quantized(inputs)
+
+        self.assertIsInstance(quantized[0], torch.ao.nn.quantized.dynamic.Linear)
+        self.assertIsInstance(quantized[2], torch.ao.nn.quantized.dynamic.Linear)
+        torch.testing.assert_close(output, expected, atol=0.05, rtol=0.05)
+
+    def test_quantized_model_is_cached_on_disk(self):
+        from torch import nn
+        from .quantization import load_quantized
+
+        builds = []
+
+        def build():
+            builds.append(1)
+            return nn.Sequential(nn.Linear(8, 8))
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        with override_settings(QUANTIZED_MODEL_DIR=cache_dir):
+            first = load_quantized('fake@1', build)
+            second = load_quantized('fake@1', build)
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertEqual(type(first[0]), type(second[0]))
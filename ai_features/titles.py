@@ -0,0 +1,143 @@
+"""
+Extractive keyword titles, used when GPT-2 is skipped or gives nothing usable.
+
+Keyphrases are scored RAKE-style over the whole content: the text is cut
+into candidate phrases at stopwords, punctuation and numbers, every word
+gets degree / frequency (words that mostly appear inside longer phrases
+score higher) weighted by log(1 + frequency) so topics the text keeps
+returning to win, and a phrase scores the sum of its words, boosted when
+the phrase itself repeats. The scoring runs on NumPy arrays of word ids,
+so the per-request cost is one regex scan plus a handful of vector ops:
+well under a millisecond for a typical blog post. The best phrases that
+share no words are filled into fixed title templates, so the output is
+deterministic for a given text.
+"""
+import math
+import re
+
+import numpy as np
+
+# Words, or single punctuation marks and numbers that end a phrase
+_TOKEN_RE = re.compile(r"[^\W\d_][\w'’-]*|[^\w\s]|\d+")
+
+STOPWORDS = frozenset("""
+a about above across after afterwards again against all almost alone along already also although always am
+among amongst an and another any anyhow anyone anything anyway anywhere are around as at back be became because
+become becomes becoming been before beforehand behind being below beside besides between beyond both but by
+can cannot could did do does doing done down during each either else elsewhere enough even ever every everyone
+everything everywhere except few first for former formerly from further get gets getting give given gives go
+goes going gone got had has have having he hence her here hereafter hereby herein hers herself him himself his
+how however i if in indeed instead into is it its itself just keep last latter least less let like likely made
+make makes making many may maybe me meanwhile might mine more moreover most mostly much must my myself near
+nearly need needs neither never nevertheless new next no nobody none nor not nothing now nowhere of off often
+on once one only onto or other others otherwise our ours ourselves out over own per perhaps please put quite
+rather really said same say says see seem seemed seeming seems several she should since so some somehow someone
+something sometime sometimes somewhere still such than that the their theirs them themselves then thence there
+thereafter thereby therefore therein these they thing things this those though through throughout thus to
+together too toward towards under until up upon us use used uses using very via was way ways we well were what
+whatever when whenever where whereas whether which while who whoever whole whom whose why will with within
+without would yet you your yours yourself yourselves
+zero two three four five six seven eight nine ten hundred thousand million billion
+it's i'm we're they're you're don't doesn't didn't isn't aren't wasn't weren't can't won't
+""".split())
+
+# (number of phrases used, template), tried in order
+TITLE_TEMPLATES = [
+    (1, "{0}: What You Need to Know"),
+    (2, "{1} and {0}: A Closer Look"),
+    (3, "{0}, {1} and {2}"),
+    (1, "Why {0} Matters"),
+    (1, "A Practical Guide to {0}"),
+    (1, "Everything to Know About {0}"),
+]
+
+FALLBACK_PHRASE = "This Topic"
+MAX_PHRASE_WORDS = 3
+MAX_PHRASE_CHARS = 40
+
+
+def _title_case(word):
+    # Keep acronyms and names like "GPT" or "iOS" as written
+    if word[0].isupper() or any(char.isupper() for char in word[1:]):
+        return word
+    return word[0].upper() + word[1:]
+
+
+def extract_keyphrases(content, limit=3):
+    """Return up to `limit` title-cased keyphrases of `content`, best first, sharing no words."""
+    vocabulary = {}
+    word_ids = []
+    surfaces = []
+    starts = []
+    in_phrase = 0
+    for token in _TOKEN_RE.findall(content):
+        lower = token.lower()
+        if lower in STOPWORDS or not token[0].isalpha():
+            in_phrase = 0
+            continue
+        if in_phrase == MAX_PHRASE_WORDS:
+            # Keep the last words of long runs, where English puts the head noun
+            del word_ids[starts[-1]], surfaces[starts[-1]]
+            in_phrase -= 1
+        if in_phrase == 0:
+            starts.append(len(word_ids))
+        word_ids.append(vocabulary.setdefault(lower, len(vocabulary)))
+        surfaces.append(token)
+        in_phrase += 1
+    if not word_ids:
+        return []
+
+    ids = np.asarray(word_ids, dtype=np.intp)
+    bounds = np.asarray(starts + [len(word_ids)], dtype=np.intp)
+    lengths = np.diff(bounds)
+    frequency = np.bincount(ids)
+    # A word's degree counts the words it co-occurs with in phrases, itself included
+    degree = np.bincount(ids, weights=np.repeat(lengths, lengths).astype(np.float64))
+    # Words dropped from the front of long runs may not occur anywhere else
+    word_scores = degree / np.maximum(frequency, 1) * np.log1p(frequency)
+    phrase_scores = np.add.reduceat(word_scores[ids], bounds[:-1])
+
+    # Merge repeats of the same phrase, boosting it by its count
+    phrases = {}
+    for index, (start, end) in enumerate(zip(starts, bounds[1:].tolist())):
+        key = tuple(word_ids[start:end])
+        if key in phrases:
+            phrases[key][1] += 1
+        else:
+            phrases[key] = [float(phrase_scores[index]), 1, start, end]
+    ranked = sorted(
+        phrases.items(),
+        key=lambda item: (-item[1][0] * (1.0 + math.log(item[1][1])), item[1][2]),
+    )
+
+    keyphrases = []
+    used = set()
+    for key, (_, _, start, end) in ranked:
+        if used.intersection(key):
+            continue
+        used.update(key)
+        keyphrases.append(' '.join(_title_case(word) for word in surfaces[start:end]))
+        if len(keyphrases) == limit:
+            break
+    return keyphrases
+
+
+def keyword_titles(content, count=3):
+    """Return `count` distinct titles of 3 to 12 words built from the keyphrases of `content`.
+
+    When the keyphrases don't fit enough templates, the rest are filled
+    with FALLBACK_PHRASE.
+    """
+    # A single run-on "word" (a URL, a pasted hash) would overflow every template
+    keyphrases = [phrase for phrase in extract_keyphrases(content) if len(phrase) <= MAX_PHRASE_CHARS]
+    titles = []
+    for phrases in (keyphrases, [FALLBACK_PHRASE]):
+        for arity, template in TITLE_TEMPLATES:
+            if arity > len(phrases):
+                continue
+            title = template.format(*phrases)
+            if 3 <= len(title.split()) <= 12 and len(title) <= 100 and title not in titles:
+                titles.append(title)
+                if len(titles) == count:
+                    return titles
+    return titles
@@ -0,0 +1,157 @@
+"""
+Upload handler that spools `audio_file` uploads straight to disk.
+
+Django's default chain keeps uploads below FILE_UPLOAD_MAX_MEMORY_SIZE in
+memory, after which the transcribe view copied them into a temporary file.
+This handler instead writes the bytes to a temporary file as they arrive,
+hashes them for the result cache, checks the magic bytes and stops reading
+the request as soon as the upload is too large or not audio. Problems are
+reported through `request.upload_error`, which the view checks first.
+
+The handler is installed for every request but only acts on the
+transcribe route; other multipart forms (the admin, for one) go through
+Django's default handlers and limits.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.datastructures import MultiValueDict
+
+try:
+    import magic
+except ImportError:  # libmagic is missing on some hosts; skip the content check there
+    magic = None
+
+logger = logging.getLogger(__name__)
+
+AUDIO_FIELD_NAME = 'audio_file'
+AUDIO_URL_NAME = 'transcribe'
+
+# libmagic needs only the first few KB to identify a container
+MAGIC_HEADER_BYTES = 2048
+
+# Besides audio/*, libmagic reports some m4a and ogg files as these
+EXTRA_AUDIO_MIME_TYPES = {'video/mp4', 'application/ogg', 'video/ogg'}
+
+# Room for the multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def max_upload_bytes(mode):
+    """Return the largest accepted audio upload for a transcription mode."""
+    if mode == 'stream':
+        return settings.TRANSCRIPTION_STREAM_MAX_UPLOAD_MB * 1024 * 1024
+    return settings.TRANSCRIPTION_MAX_UPLOAD_MB * 1024 * 1024
+
+
+def is_audio_mime_type(mime_type):
+    return mime_type.startswith('audio/') or mime_type in EXTRA_AUDIO_MIME_TYPES
+
+
+class AudioUploadHandler(FileUploadHandler):
+    """Write `audio_file` to a temporary file while hashing and validating it.
+
+    The resulting TemporaryUploadedFile carries `sha256` and `mime_type`
+    attributes. Other file fields are passed on to the next handler.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.enabled = self._is_audio_route()
+        if not self.enabled:
+            return None
+        # The body is not parsed yet, so only a mode in the query string counts
+        # here; without one the inline limit applies, even to a form-field
+        # mode=stream, so oversize uploads are refused before they are read
+        self.max_bytes = max_upload_bytes(self.request.GET.get('mode') if self.request else None)
+        if content_length and content_length > self.max_bytes + MULTIPART_OVERHEAD_BYTES:
+            self._set_error(self._size_error())
+            # Skip parsing entirely; the body is never read
+            return QueryDict(), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.activated = field_name == AUDIO_FIELD_NAME and getattr(self, 'enabled', self._is_audio_route())
+        if not self.activated:
+            return
+
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.file.mime_type = ''
+        self.hasher = hashlib.sha256()
+        self.received = 0
+        self.header = b'' if magic is not None else None
+        if not hasattr(self, 'max_bytes'):
+            self.max_bytes = max_upload_bytes(None)
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self._reject(self._size_error())
+
+        if self.header is not None:
+            self.header += raw_data[:MAGIC_HEADER_BYTES]
+            if len(self.header) >= MAGIC_HEADER_BYTES:
+                if not self._check_type():
+                    self._reject(self._type_error())
+
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return None
+
+        # Files shorter than the sniffed header are checked here instead
+        if self.header is not None and not self._check_type():
+            self._set_error(self._type_error())
+
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if getattr(self, 'activated', False):
+            self.file.close()
+
+    def _is_audio_route(self):
+        if self.request is None:
+            return False
+        try:
+            return resolve(self.request.path_info).url_name == AUDIO_URL_NAME
+        except Resolver404:
+            return False
+
+    def _check_type(self):
+        """Sniff the buffered header once; return whether it looks like audio."""
+        self.file.mime_type = magic.from_buffer(self.header[:MAGIC_HEADER_BYTES], mime=True)
+        self.header = None
+        return is_audio_mime_type(self.file.mime_type)
+
+    def _size_error(self):
+        return f'File size exceeds {self.max_bytes // (1024 * 1024)}MB limit'
+
+    def _type_error(self):
+        return f'Invalid file content ({self.file.mime_type}). Supported types: mp3, wav, m4a, ogg'
+
+    def _set_error(self, message):
+        logger.warning(f"Rejected audio upload: {message}")
+        if self.request is not None:
+            self.request.upload_error = message
+
+    def _reject(self, message):
+        """Record the error and stop reading the request body."""
+        self._set_error(message)
+        raise StopUpload(connection_reset=True)
@@ -1,8 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# The ASGI entry point serves the inference endpoints with the async views
+if settings.ASYNC_VIEWS:
+    transcribe_view, suggest_titles_view = views.transcribe_async, views.suggest_titles_async
+else:
+    transcribe_view, suggest_titles_view = views.transcribe, views.suggest_titles
+
 urlpatterns = [
-    path('transcribe/', views.transcribe, name='transcribe'),
-    path('suggest-titles/', views.suggest_titles, name='suggest_titles'),
+    path('transcribe/', transcribe_view, name='transcribe'),
+    path('transcribe/<int:job_id>/', views.transcription_status, name='transcription_status'),
+    path('transcriptions/', views.transcription_list, name='transcription_list'),
+    path('transcriptions/<int:transcription_id>/', views.transcription_detail, name='transcription_detail'),
+    path('suggest-titles/', suggest_titles_view, name='suggest_titles'),
     path('health/', views.health_check, name='health_check'),
+    path('models/', views.model_stats, name='model_stats'),
+    path('admission/', views.admission_stats, name='admission_stats'),
+    path('metrics/', views.prometheus_metrics, name='prometheus_metrics'),
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:name>/', views.profile_download, name='profile_download'),
 ] 
\ No newline at end of file
@@ -1,19 +1,39 @@
 from django.shortcuts import render
 import os
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import base64
+import binascii
 import json
+import hashlib
 import traceback
 import logging
 import tempfile
-from rest_framework.decorators import api_view
+import time
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 
-from .services import TranscriptionService, TitleSuggestionService
+from .services import TitleSuggestionService, TranscriptionService, get_transcription_service, get_title_service
+from .jobs import submit_job
+from .cache import title_cache, transcription_cache, hash_uploaded_file
+from .admission import Overloaded, admission
+from .executor import title_executor, transcription_executor
+from .metrics import metrics, observe_stage
+from .modelserver import ModelServerError, model_server_stats
+from .profiling import list_profiles, profile_path, profiled
+from .registry import model_registry
+from .titles import keyword_titles
+from .uploads import max_upload_bytes
 from .models import BlogPost, Transcription
 
 logger = logging.getLogger(__name__)
@@ -21,43 +41,65 @@ logger = logging.getLogger(__name__)
 # Create your views here.
 
 @api_view(['POST'])
+@profiled('transcribe')
 def transcribe(request):
     try:
-        if 'audio_file' not in request.FILES:
-            return JsonResponse(
-                {'error': 'No audio file provided'},
-                json_dumps_params={'indent': 4, 'ensure_ascii': False},
-                status=400
-            )
+        # request.FILES triggers the parsing, which AudioUploadHandler
+        # cuts short for oversize or non-audio uploads
+        upload_started = time.perf_counter()
+        files = request.FILES
+        observe_stage('transcription', 'upload', time.perf_counter() - upload_started)
+        mode = request.data.get('mode') or request.query_params.get('mode')
+        model = request.data.get('model') or request.query_params.get('model')
+        error_response = _upload_error_response(request, files, mode) or _model_error_response(model)
+        if error_response is not None:
+            return error_response
 
-        audio_file = request.FILES['audio_file']
-        
-        # Check file size (10MB limit)
-        if audio_file.size > 10 * 1024 * 1024:
-            return JsonResponse(
-                {'error': 'File size exceeds 10MB limit'},
-                json_dumps_params={'indent': 4, 'ensure_ascii': False},
-                status=400
-            )
+        audio_file = files['audio_file']
+        model = model or settings.WHISPER_MODEL
+        use_cache = settings.TRANSCRIPTION_CACHE_ENABLED
+        cache_version = TranscriptionService.cache_version(model)
 
-        # Check file type
-        if not audio_file.name.lower().endswith(('.mp3', '.wav', '.m4a', '.ogg')):
-            return JsonResponse(
-                {'error': 'Invalid file type. Supported types: mp3, wav, m4a, ogg'},
-                json_dumps_params={'indent': 4, 'ensure_ascii': False},
-                status=400
-            )
+        # In job mode the upload is queued and the client polls for the result
+        if mode == 'job':
+            return _job_response(request, audio_file, use_cache, cache_version, model)
 
-        # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file.name)[1]) as temp_file:
-            for chunk in audio_file.chunks():
-                temp_file.write(chunk)
-            temp_path = temp_file.name
+        temp_path, audio_hash = _spool_upload(audio_file)
 
         try:
+            cached = transcription_cache.get(audio_hash, cache_version) if use_cache else None
+
+            # In stream mode segments are sent as soon as they are ready
+            if mode == 'stream':
+                if cached is not None:
+                    os.unlink(temp_path)
+                    events = _cached_events(cached)
+                else:
+                    _check_transcription_capacity()
+                    events = _cleanup_after(
+                        get_transcription_service().transcribe_stream(temp_path, model=model), temp_path
+                    )
+                response = _streaming_response(request, _saving_events(events, audio_hash, model))
+                if use_cache:
+                    response['X-Transcription-Cache'] = 'hit' if cached is not None else 'miss'
+                return response
+
+            if cached is not None:
+                os.unlink(temp_path)
+                saved = _save_transcription(audio_hash, model, cached)
+                response = JsonResponse(
+                    cached,
+                    json_dumps_params={'indent': 4, 'ensure_ascii': False}
+                )
+                response['X-Transcription-Cache'] = 'hit'
+                if saved is not None:
+                    response['X-Transcription-Id'] = str(saved.id)
+                return response
+
             # Process the audio file
-            transcription_service = TranscriptionService()
-            result = transcription_service.transcribe_audio(temp_path)
+            _check_transcription_capacity()
+            transcription_service = get_transcription_service()
+            result = transcription_service.transcribe_audio(temp_path, model=model)
 
             # Remove temporary file
             os.unlink(temp_path)
@@ -69,11 +111,26 @@ def transcribe(request):
                     status=500
                 )
 
-            return JsonResponse(
+            if use_cache:
+                transcription_cache.set(audio_hash, cache_version, result)
+            saved = _save_transcription(audio_hash, model, result)
+
+            serialization_started = time.perf_counter()
+            response = JsonResponse(
                 result,
                 json_dumps_params={'indent': 4, 'ensure_ascii': False}
             )
+            observe_stage('transcription', 'serialization', time.perf_counter() - serialization_started)
+            if use_cache:
+                response['X-Transcription-Cache'] = 'miss'
+            if saved is not None:
+                response['X-Transcription-Id'] = str(saved.id)
+            return response
 
+        except Overloaded as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            return _overloaded_response(e)
         except Exception as e:
             # Clean up temp file in case of error
             if os.path.exists(temp_path):
@@ -93,8 +150,354 @@ def transcribe(request):
             status=500
         )
 
+def _upload_error_response(request, files, mode):
+    """Return a 400 response if the upload is missing, too large or not audio, otherwise None."""
+    # Set by AudioUploadHandler when it stopped reading an oversize or
+    # non-audio upload
+    upload_error = getattr(request, 'upload_error', None)
+    if upload_error:
+        return JsonResponse(
+            {'error': upload_error},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+
+    if 'audio_file' not in files:
+        return JsonResponse(
+            {'error': 'No audio file provided'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+
+    audio_file = files['audio_file']
+
+    # Check file size (10MB limit, streaming mode never holds the whole result)
+    max_size = max_upload_bytes(mode)
+    if audio_file.size > max_size:
+        return JsonResponse(
+            {'error': f'File size exceeds {max_size // (1024 * 1024)}MB limit'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+
+    # Check file type
+    if not audio_file.name.lower().endswith(('.mp3', '.wav', '.m4a', '.ogg')):
+        return JsonResponse(
+            {'error': 'Invalid file type. Supported types: mp3, wav, m4a, ogg'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+    return None
+
+def _model_error_response(model):
+    """Return a 400 response if `model` is given and is not a selectable Whisper tier, otherwise None."""
+    if model and model not in settings.WHISPER_MODEL_TIERS:
+        return JsonResponse(
+            {'error': f"Unknown model '{model}'. Available models: {', '.join(settings.WHISPER_MODEL_TIERS)}"},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+    return None
+
+def _job_response(request, audio_file, use_cache, cache_version, model):
+    """Queue the upload as a background job, or record a finished job for a cached result."""
+    audio_hash = getattr(audio_file, 'sha256', None) or hash_uploaded_file(audio_file)
+    cached = transcription_cache.get(audio_hash, cache_version) if use_cache else None
+    if cached is not None:
+        job = Transcription.objects.create(
+            audio_sha256=audio_hash,
+            whisper_model=model,
+            status=Transcription.STATUS_COMPLETED,
+            progress=1.0,
+            segments=cached['segments'],
+            duration_seconds=cached['duration_seconds'],
+            finished_at=timezone.now(),
+        )
+    else:
+        job = submit_job(audio_file, audio_hash=audio_hash, whisper_model=model)
+    response = JsonResponse(
+        {
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': request.build_absolute_uri(f'/api/transcribe/{job.id}/'),
+        },
+        json_dumps_params={'indent': 4, 'ensure_ascii': False},
+        status=202
+    )
+    if use_cache:
+        response['X-Transcription-Cache'] = 'hit' if cached is not None else 'miss'
+    return response
+
+def _check_transcription_capacity():
+    """Raise Overloaded before any work is done if either transcription model is saturated."""
+    admission.check('whisper')
+    admission.check('pyannote')
+
+def _overloaded_response(error):
+    logger.warning(f"Rejecting request: {str(error)}")
+    response = JsonResponse(
+        {'error': 'Server is busy, please retry later', 'retry_after': error.retry_after},
+        json_dumps_params={'indent': 4, 'ensure_ascii': False},
+        status=429
+    )
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+def _spool_upload(audio_file):
+    """Return the path and SHA-256 of an upload on disk.
+
+    Files spooled by AudioUploadHandler are used where they are; anything
+    else is copied to a temporary file and hashed on the way. Either way
+    the caller may delete the path when done.
+    """
+    if hasattr(audio_file, 'sha256') and hasattr(audio_file, 'temporary_file_path'):
+        return audio_file.temporary_file_path(), audio_file.sha256
+
+    hasher = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file.name)[1]) as temp_file:
+        for chunk in audio_file.chunks():
+            temp_file.write(chunk)
+            hasher.update(chunk)
+    return temp_file.name, hasher.hexdigest()
+
+def _cached_events(cached):
+    for segment in cached['segments']:
+        yield {'event': 'segment', **segment}
+    yield {'event': 'done', 'duration': cached['duration'], 'duration_seconds': cached['duration_seconds']}
+
+def _cleanup_after(events, temp_path):
+    """Delete the temporary upload once the event stream is exhausted or closed."""
+    try:
+        yield from events
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+def _save_transcription(audio_hash, model, result):
+    """Record a finished inline transcription for the history API; return it, or None if not saved."""
+    if not settings.TRANSCRIPTION_HISTORY_ENABLED:
+        return None
+    try:
+        return Transcription.objects.create(
+            audio_sha256=audio_hash,
+            whisper_model=model,
+            status=Transcription.STATUS_COMPLETED,
+            progress=1.0,
+            segments=result['segments'],
+            duration_seconds=result['duration_seconds'],
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        # The client still gets its result
+        logger.error(f"Failed to save transcription history: {str(e)}")
+        return None
+
+def _saving_events(events, audio_hash, model):
+    """Pass stream events through and save the transcript when the done event arrives.
+
+    The done event gains the `transcription_id` of the saved record.
+    """
+    segments = []
+    try:
+        for event in events:
+            if event['event'] == 'segment':
+                segments.append(event)
+            elif event['event'] == 'done':
+                saved = _save_transcription(
+                    audio_hash, model, {'segments': segments, 'duration_seconds': event['duration_seconds']}
+                )
+                if saved is not None:
+                    event = {**event, 'transcription_id': saved.id}
+            yield event
+    finally:
+        # Let _cleanup_after delete the upload when the client disconnects
+        events.close()
+
+def _format_event(event, content_type):
+    if content_type == 'text/event-stream':
+        return f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    return json.dumps(event, ensure_ascii=False) + '\n'
+
+async def _aformat_events(events, content_type):
+    async for event in events:
+        yield _format_event(event, content_type)
+
+def _streaming_response(request, events):
+    """Stream events as NDJSON, or as server-sent events when the client asks for them.
+
+    `events` may be an async iterator, which ASGI servers consume without a thread.
+    """
+    if 'text/event-stream' in request.META.get('HTTP_ACCEPT', ''):
+        content_type = 'text/event-stream'
+    else:
+        content_type = 'application/x-ndjson'
+
+    if hasattr(events, '__aiter__'):
+        lines = _aformat_events(events, content_type)
+    else:
+        lines = (_format_event(event, content_type) for event in events)
+
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+def transcription_status(request, job_id):
+    try:
+        job = Transcription.objects.get(pk=job_id)
+    except Transcription.DoesNotExist:
+        return JsonResponse(
+            {'error': f'Transcription job {job_id} not found'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=404
+        )
+
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == Transcription.STATUS_COMPLETED:
+        payload['segments'] = job.segments
+        payload['duration'] = TranscriptionService.format_timestamp(job.duration_seconds)
+        payload['duration_seconds'] = job.duration_seconds
+    elif job.status == Transcription.STATUS_FAILED:
+        payload['error'] = job.error
+
+    return JsonResponse(payload, json_dumps_params={'indent': 4, 'ensure_ascii': False})
+
+TRANSCRIPTION_PAGE_SIZE = 20
+TRANSCRIPTION_MAX_PAGE_SIZE = 100
+
+def _encode_cursor(transcription):
+    value = f"{transcription.created_at.isoformat()}|{transcription.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor):
+    """Return the (created_at, id) a cursor points at; raise ValueError if it is malformed."""
+    try:
+        value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = value.split('|')
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if created_at is None:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return created_at, pk
+
+@api_view(['GET'])
+def transcription_list(request):
+    """List saved transcriptions, newest first, one keyset-paginated page at a time.
+
+    The page after a cursor is found through the (created_at, id) index,
+    so deep pages cost the same as the first. Segments are not loaded.
+    """
+    try:
+        limit = int(request.GET.get('limit', TRANSCRIPTION_PAGE_SIZE))
+        if limit < 1:
+            raise ValueError
+        cursor = request.GET.get('cursor')
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return JsonResponse(
+            {'error': 'limit must be a positive integer and cursor a value from a previous page'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+    limit = min(limit, TRANSCRIPTION_MAX_PAGE_SIZE)
+
+    queryset = Transcription.objects.only(
+        'id', 'status', 'audio_sha256', 'whisper_model', 'duration_seconds', 'segment_count', 'created_at'
+    ).order_by('-created_at', '-id')
+    if request.GET.get('audio_sha256'):
+        queryset = queryset.filter(audio_sha256=request.GET['audio_sha256'])
+    if request.GET.get('status'):
+        queryset = queryset.filter(status=request.GET['status'])
+    if after is not None:
+        created_at, pk = after
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    # One extra row tells whether there is a next page
+    page = list(queryset[:limit + 1])
+    next_url = None
+    if len(page) > limit:
+        page = page[:limit]
+        query = request.GET.copy()
+        query['cursor'] = _encode_cursor(page[-1])
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+    return JsonResponse(
+        {
+            'results': [
+                {
+                    'id': transcription.id,
+                    'status': transcription.status,
+                    'audio_sha256': transcription.audio_sha256,
+                    'whisper_model': transcription.whisper_model,
+                    'duration_seconds': transcription.duration_seconds,
+                    'segment_count': transcription.segment_count,
+                    'created_at': transcription.created_at.isoformat(),
+                    'url': request.build_absolute_uri(f'/api/transcriptions/{transcription.id}/'),
+                }
+                for transcription in page
+            ],
+            'next': next_url,
+        },
+        json_dumps_params={'indent': 4, 'ensure_ascii': False}
+    )
+
+@api_view(['GET'])
+def transcription_detail(request, transcription_id):
+    """Return a saved transcription, or with `start`/`end` (seconds) only the segments overlapping that range.
+
+    The transcript text is deferred, so a range reads only its own part of it.
+    """
+    try:
+        start = float(request.GET['start']) if request.GET.get('start') else None
+        end = float(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse(
+            {'error': 'start and end must be numbers of seconds'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=400
+        )
+
+    try:
+        transcription = Transcription.objects.defer('transcription_text').get(pk=transcription_id)
+    except Transcription.DoesNotExist:
+        return JsonResponse(
+            {'error': f'Transcription {transcription_id} not found'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=404
+        )
+
+    payload = {
+        'id': transcription.id,
+        'status': transcription.status,
+        'audio_sha256': transcription.audio_sha256,
+        'whisper_model': transcription.whisper_model,
+        'created_at': transcription.created_at.isoformat(),
+        'finished_at': transcription.finished_at.isoformat() if transcription.finished_at else None,
+    }
+    if transcription.status == Transcription.STATUS_COMPLETED:
+        payload['speakers'] = transcription.speakers
+        payload['segment_count'] = transcription.segment_count
+        payload['segments'] = transcription.segment_slice(start, end)
+        payload['duration'] = TranscriptionService.format_timestamp(transcription.duration_seconds)
+        payload['duration_seconds'] = transcription.duration_seconds
+    elif transcription.status == Transcription.STATUS_FAILED:
+        payload['error'] = transcription.error
+
+    return JsonResponse(payload, json_dumps_params={'indent': 4, 'ensure_ascii': False})
+
 @csrf_exempt
 @require_http_methods(["POST"])
+@profiled('suggest_titles')
 def suggest_titles(request):
     try:
         # Log the raw request body for debugging
@@ -108,23 +511,289 @@ def suggest_titles(request):
         content = data.get('content')
         if not content:
             return JsonResponse({'error': 'No content provided'}, status=400)
+
+        if (data.get('mode') or request.GET.get('mode')) == 'fast':
+            return _fast_titles_response(content)
+
+        # Drafts are often re-sent unchanged; `refresh` asks for new titles anyway
+        use_cache = settings.TITLE_CACHE_ENABLED
+        refresh = _refresh_requested(request, data)
+        cache_version = TitleSuggestionService.cache_version()
+        cached = title_cache.get(content, cache_version) if use_cache and not refresh else None
+        if cached is not None:
+            return _titles_response(cached, 'hit')
         
-        # Initialize service and generate titles
-        service = TitleSuggestionService()
+        # Generate titles with the shared service
+        admission.check('gpt2')
+        service = get_title_service()
         result = service.generate_titles(content)
         
         # Check if there was an error in title generation
         if 'error' in result:
             logger.error(f"Error in title generation: {result['error']}")
             return JsonResponse(result, status=500)
-        
-        return JsonResponse(result)
+
+        if use_cache:
+            title_cache.set(content, cache_version, result)
+        return _titles_response(result, ('refresh' if refresh else 'miss') if use_cache else None)
     
+    except Overloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         error_msg = f"Error in suggest_titles: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
         return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
 
+def _refresh_requested(request, data):
+    return str(data.get('refresh') or request.GET.get('refresh', '')).lower() in ['true', 't', '1']
+
+def _titles_response(result, cache_status):
+    response = JsonResponse(result)
+    if cache_status:
+        response['X-Title-Cache'] = cache_status
+    return response
+
+def _fast_titles_response(content):
+    """Answer with extractive keyword titles; no model, slot or executor is involved."""
+    started = time.perf_counter()
+    suggestions = keyword_titles(content)
+    observe_stage('titles', 'keywords', time.perf_counter() - started)
+    return JsonResponse({'suggestions': suggestions})
+
+# Async versions of transcribe and suggest_titles, routed instead of them
+# when ASYNC_VIEWS is set (as darwix_ai/asgi.py does). The ASGI server reads
+# the body without blocking; parsing, database access and inference run off
+# the event loop, inference in the bounded per-endpoint executors. They are not
+# profiled: on the event loop thread cProfile would mix concurrent requests.
+
+async def transcribe_async(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        upload_started = time.perf_counter()
+        files = await sync_to_async(lambda: request.FILES, thread_sensitive=False)()
+        observe_stage('transcription', 'upload', time.perf_counter() - upload_started)
+
+        mode = request.POST.get('mode') or request.GET.get('mode')
+        model = request.POST.get('model') or request.GET.get('model')
+        error_response = _upload_error_response(request, files, mode) or _model_error_response(model)
+        if error_response is not None:
+            return error_response
+
+        audio_file = files['audio_file']
+        model = model or settings.WHISPER_MODEL
+        use_cache = settings.TRANSCRIPTION_CACHE_ENABLED
+        cache_version = TranscriptionService.cache_version(model)
+
+        # Blocking work stays off the shared sync thread that serves the other
+        # views, so it never waits behind hashing or cache and history writes
+        if mode == 'job':
+            return await sync_to_async(_job_response, thread_sensitive=False)(
+                request, audio_file, use_cache, cache_version, model
+            )
+
+        temp_path, audio_hash = await sync_to_async(_spool_upload, thread_sensitive=False)(audio_file)
+
+        try:
+            cached = await sync_to_async(transcription_cache.get, thread_sensitive=False)(audio_hash, cache_version) if use_cache else None
+
+            if mode == 'stream':
+                if cached is not None:
+                    os.unlink(temp_path)
+                    # Django consumes sync iterators in a thread under ASGI
+                    events = _saving_events(_cached_events(cached), audio_hash, model)
+                else:
+                    _check_transcription_capacity()
+                    # The first step decodes the upload and starts the models, so
+                    # that is the call admitted against the pool's pending limit.
+                    # Saving happens in the executor thread along with the last step.
+                    events, first = await transcription_executor.run(
+                        _start_events,
+                        lambda: _saving_events(_cleanup_after(
+                            get_transcription_service().transcribe_stream(temp_path, model=model), temp_path
+                        ), audio_hash, model)
+                    )
+                    events = _events_in_executor(events, first)
+                response = _streaming_response(request, events)
+                if use_cache:
+                    response['X-Transcription-Cache'] = 'hit' if cached is not None else 'miss'
+                return response
+
+            if cached is not None:
+                os.unlink(temp_path)
+                saved = await sync_to_async(_save_transcription, thread_sensitive=False)(audio_hash, model, cached)
+                response = JsonResponse(
+                    cached,
+                    json_dumps_params={'indent': 4, 'ensure_ascii': False}
+                )
+                response['X-Transcription-Cache'] = 'hit'
+                if saved is not None:
+                    response['X-Transcription-Id'] = str(saved.id)
+                return response
+
+            _check_transcription_capacity()
+            result = await transcription_executor.run(
+                lambda: get_transcription_service().transcribe_audio(temp_path, model=model)
+            )
+            os.unlink(temp_path)
+
+            if 'error' in result:
+                return JsonResponse(
+                    {'error': result['error']},
+                    json_dumps_params={'indent': 4, 'ensure_ascii': False},
+                    status=500
+                )
+
+            if use_cache:
+                await sync_to_async(transcription_cache.set, thread_sensitive=False)(audio_hash, cache_version, result)
+            saved = await sync_to_async(_save_transcription, thread_sensitive=False)(audio_hash, model, result)
+
+            # Long transcripts take a while to encode, so keep it off the event loop
+            serialization_started = time.perf_counter()
+            response = await sync_to_async(JsonResponse, thread_sensitive=False)(
+                result,
+                json_dumps_params={'indent': 4, 'ensure_ascii': False}
+            )
+            observe_stage('transcription', 'serialization', time.perf_counter() - serialization_started)
+            if use_cache:
+                response['X-Transcription-Cache'] = 'miss'
+            if saved is not None:
+                response['X-Transcription-Id'] = str(saved.id)
+            return response
+
+        except Overloaded as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            return _overloaded_response(e)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            logger.error(f"Error during transcription: {str(e)}")
+            return JsonResponse(
+                {'error': f'Transcription failed: {str(e)}'},
+                json_dumps_params={'indent': 4, 'ensure_ascii': False},
+                status=500
+            )
+
+    except Exception as e:
+        logger.error(f"Error in transcribe view: {str(e)}")
+        return JsonResponse(
+            {'error': f'Server error: {str(e)}'},
+            json_dumps_params={'indent': 4, 'ensure_ascii': False},
+            status=500
+        )
+
+# Like the DRF view it replaces, which only enforces CSRF for session logins
+transcribe_async.csrf_exempt = True
+
+def _start_events(make_events):
+    """Build a blocking event generator and run its first step; return both (the event is None if it ended)."""
+    events = make_events()
+    return events, next(events, None)
+
+async def _events_in_executor(events, first):
+    """Drive a blocking event generator from the transcription executor, one event per step.
+
+    `first` is the event its admitted first step returned, from _start_events.
+    """
+    done = object()
+    try:
+        if first is None:
+            return
+        yield first
+        while True:
+            # Admitted as a whole already, so later steps are never rejected
+            event = await transcription_executor.run(next, events, done, admit=False)
+            if event is done:
+                return
+            yield event
+    finally:
+        await transcription_executor.run(events.close, admit=False)
+
+async def suggest_titles_async(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        logger.debug(f"Request body: {request.body}")
+
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError as e:
+            return JsonResponse({'error': f'Invalid JSON: {str(e)}'}, status=400)
+
+        content = data.get('content')
+        if not content:
+            return JsonResponse({'error': 'No content provided'}, status=400)
+
+        if (data.get('mode') or request.GET.get('mode')) == 'fast':
+            return _fast_titles_response(content)
+
+        use_cache = settings.TITLE_CACHE_ENABLED
+        refresh = _refresh_requested(request, data)
+        cache_version = TitleSuggestionService.cache_version()
+        cached = None
+        if use_cache and not refresh:
+            cached = await sync_to_async(title_cache.get, thread_sensitive=False)(content, cache_version)
+        if cached is not None:
+            return _titles_response(cached, 'hit')
+
+        admission.check('gpt2')
+        result = await title_executor.run(lambda: get_title_service().generate_titles(content))
+
+        if 'error' in result:
+            logger.error(f"Error in title generation: {result['error']}")
+            return JsonResponse(result, status=500)
+
+        if use_cache:
+            await sync_to_async(title_cache.set, thread_sensitive=False)(content, cache_version, result)
+        return _titles_response(result, ('refresh' if refresh else 'miss') if use_cache else None)
+
+    except Overloaded as e:
+        return _overloaded_response(e)
+    except Exception as e:
+        error_msg = f"Error in suggest_titles: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+
+# csrf_exempt cannot wrap coroutine functions before Django 5.0
+suggest_titles_async.csrf_exempt = True
+
 @api_view(['GET'])
 def health_check(request):
     return Response({"status": "healthy"}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def model_stats(request):
+    if settings.MODEL_SERVER_SOCKET:
+        return _model_server_stats_response('models')
+    return Response(model_registry.stats(), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def admission_stats(request):
+    if settings.MODEL_SERVER_SOCKET:
+        return _model_server_stats_response('admission')
+    return Response(admission.stats(), status=status.HTTP_200_OK)
+
+def _model_server_stats_response(key):
+    """Report the model server's statistics, which is where the models and admission control live."""
+    try:
+        return Response(model_server_stats()[key], status=status.HTTP_200_OK)
+    except ModelServerError as e:
+        return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    return Response({"profiles": list_profiles()}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_download(request, name):
+    path = profile_path(name)
+    if path is None:
+        return Response({"error": f"Profile {name} not found"}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
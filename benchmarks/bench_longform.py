@@ -0,0 +1,64 @@
+"""
+Scaling benchmark for chunked long-audio transcription.
+
+Runs the single-pass pipeline once and then the chunked engine with an
+increasing number of worker processes on the same recording, reporting
+wall time, real-time factor and speedup. Needs the real models (HF_TOKEN
+set) and a long local recording:
+
+    python -m benchmarks.bench_longform path/to/recording.wav --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio_path')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-seconds', type=float, default=300.0)
+    parser.add_argument('--skip-single-pass', action='store_true')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'darwix_ai.settings')
+    django.setup()
+
+    from ai_features.audio import audio_duration, load_audio
+    from ai_features.longform import transcribe_chunked
+    from ai_features.services import get_transcription_service
+
+    service = get_transcription_service()
+    audio = load_audio(args.audio_path)
+    duration = audio_duration(audio)
+    cpu_count = os.cpu_count() or 1
+    print(f"{duration:.0f}s of audio, {cpu_count} CPUs")
+    print(f"{'mode':>14} {'wall (s)':>10} {'RTF':>7} {'speedup':>8}")
+
+    baseline = None
+    if not args.skip_single_pass:
+        started = time.perf_counter()
+        service._run_whisper(audio, {})
+        service._run_diarization(audio, {})
+        baseline = time.perf_counter() - started
+        print(f"{'single pass':>14} {baseline:>10.1f} {baseline / duration:>7.3f} {1.0:>7.2f}x")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        transcribe_chunked(
+            service,
+            audio,
+            chunk_seconds=args.chunk_seconds,
+            num_workers=workers,
+            threads_per_worker=max(1, cpu_count // workers),
+            speaker_threshold=0.5,
+        )
+        wall = time.perf_counter() - started
+        baseline = baseline or wall
+        print(f"{f'{workers} workers':>14} {wall:>10.1f} {wall / duration:>7.3f} {baseline / wall:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for merge_overlapping_segments.
+
+Compares the incremental SegmentMerger with the previous implementation,
+which re-ran clean_text over the whole accumulated text on every merge,
+and checks that both produce the same output.
+
+    python -m benchmarks.bench_merge --sizes 10000 50000
+"""
+import argparse
+import copy
+import time
+
+from ai_features.segments import clean_text, format_timestamp, merge_overlapping_segments
+
+from .synthetic import make_aligned_segments
+
+
+def legacy_merge_overlapping_segments(segments):
+    """The merge loop as it was before SegmentMerger, kept as a reference."""
+    if not segments:
+        return segments
+    sorted_segments = sorted(segments, key=lambda x: x['start'])
+    merged = []
+    current = sorted_segments[0]
+    for next_seg in sorted_segments[1:]:
+        if (next_seg['speaker'] == current['speaker'] and
+                next_seg['start'] - current['end'] < 1.0):
+            current['end'] = max(current['end'], next_seg['end'])
+            current['text'] = clean_text(current['text'] + ' ' + next_seg['text'])
+            current['time'] = f"{format_timestamp(current['start'])} → {format_timestamp(current['end'])}"
+        else:
+            merged.append(current)
+            current = next_seg
+    merged.append(current)
+    return merged
+
+
+def time_call(func, segments, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        data = copy.deepcopy(segments)
+        started = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 20000, 50000])
+    parser.add_argument('--run-lengths', type=int, nargs='+', default=[10, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'segments':>10} {'run':>6} {'legacy (s)':>12} {'incremental (s)':>16} {'speedup':>8}")
+    for size in args.sizes:
+        for run_length in args.run_lengths:
+            segments = make_aligned_segments(size, run_length)
+            legacy_time, legacy_result = time_call(legacy_merge_overlapping_segments, segments, args.repeat)
+            new_time, new_result = time_call(merge_overlapping_segments, segments, args.repeat)
+            if legacy_result != new_result:
+                raise SystemExit(f"Output mismatch for {size} segments with runs of {run_length}")
+            print(f"{size:>10} {run_length:>6} {legacy_time:>12.4f} {new_time:>16.4f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+fp32 versus int8 benchmark for Whisper and GPT-2 on CPU.
+
+Each variant runs in a fresh process with QUANTIZED_MODELS set
+accordingly. That process loads the model (from QUANTIZED_MODEL_DIR if it
+was converted before), transcribes every file of a fixed local audio set
+and generates titles for a fixed set of texts. The report gives load time,
+the memory the model added, peak RSS, latency and real-time factor. It
+also gives the word error rate of the int8 transcripts against the fp32
+ones, and the share of GPT-2 title lists that changed:
+
+    python -m benchmarks.bench_quantization path/to/audio_dir --tier base --output quantization.json
+
+Needs the real Whisper and GPT-2 models; pyannote is not loaded.
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import django
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg')
+
+TITLE_TEXTS = [
+    "The city council approved a new budget that moves funding from road repairs to public transport, "
+    "adding three bus lines and extending night service on weekends.",
+    "Researchers trained a small language model on hospital discharge notes and found it summarized "
+    "them as accurately as clinicians while taking a fraction of the time.",
+    "Our team migrated the billing service from a monolith to separate services, cutting deploy times "
+    "from an hour to ten minutes but adding new failure modes around retries.",
+    "A long dry summer has lowered the reservoir to its lowest level in decades, and farmers are "
+    "switching to drip irrigation to save water for the autumn harvest.",
+]
+
+
+def audio_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(AUDIO_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def words(text):
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_errors(reference, hypothesis):
+    """Return the word-level edit distance between two token lists."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def rss_mb():
+    import psutil
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def run_variant(args):
+    """Load and run one variant in this process and print its measurements as JSON."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'darwix_ai.settings')
+    django.setup()
+
+    from ai_features.audio import audio_duration, load_audio
+    from ai_features.services import load_title_generator, load_whisper_model
+
+    result = {'variant': args.variant}
+    if 'whisper' in args.models:
+        before = rss_mb()
+        started = time.perf_counter()
+        model = load_whisper_model(args.tier)
+        result['whisper_load_seconds'] = round(time.perf_counter() - started, 3)
+        result['whisper_model_mb'] = round(rss_mb() - before, 1)
+
+        transcripts, seconds, audio_seconds = [], [], 0.0
+        for path in audio_files(args.audio):
+            audio = load_audio(path)
+            audio_seconds += audio_duration(audio)
+            started = time.perf_counter()
+            # Same decoding options as TranscriptionService._run_whisper
+            output = model.transcribe(
+                audio, language="en", task="transcribe", initial_prompt="This is an audio clip.", temperature=0.0
+            )
+            seconds.append(time.perf_counter() - started)
+            transcripts.append(output['text'])
+        result['transcripts'] = transcripts
+        result['whisper_seconds'] = [round(value, 3) for value in seconds]
+        result['whisper_rtf'] = round(sum(seconds) / audio_seconds, 4) if audio_seconds else None
+        del model
+
+    if 'gpt2' in args.models:
+        before = rss_mb()
+        started = time.perf_counter()
+        generator = load_title_generator()
+        result['gpt2_load_seconds'] = round(time.perf_counter() - started, 3)
+        result['gpt2_model_mb'] = round(rss_mb() - before, 1)
+
+        titles, seconds = [], []
+        for text in TITLE_TEXTS:
+            prompt = f"Write a short blog post title about: {text}\nTitle:"
+            started = time.perf_counter()
+            output = generator(
+                [prompt] * 3, max_new_tokens=15, do_sample=False, num_beams=1,
+                pad_token_id=generator.tokenizer.eos_token_id,
+            )
+            seconds.append(time.perf_counter() - started)
+            titles.append([item[0]['generated_text'][len(prompt):].strip() for item in output])
+        result['titles'] = titles
+        result['gpt2_seconds'] = [round(value, 3) for value in seconds]
+
+    result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    json.dump(result, sys.stdout)
+
+
+def measure(variant, args):
+    env = dict(os.environ, QUANTIZED_MODELS=','.join(args.models) if variant == 'int8' else '')
+    command = [
+        sys.executable, '-m', 'benchmarks.bench_quantization', *args.audio,
+        '--tier', args.tier, '--models', *args.models, '--variant', variant,
+    ]
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True)
+    return json.loads(completed.stdout)
+
+
+def median(values):
+    return statistics.median(values) if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='+', help='audio files or directories of them')
+    parser.add_argument('--tier', default='base', help='Whisper tier to compare')
+    parser.add_argument('--models', nargs='+', default=['whisper', 'gpt2'], choices=['whisper', 'gpt2'])
+    parser.add_argument('--output', help='write the measurements as JSON')
+    parser.add_argument('--variant', choices=['fp32', 'int8'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args)
+        return
+
+    files = audio_files(args.audio)
+    if 'whisper' in args.models and not files:
+        parser.error('no audio files found')
+    print(f"{len(files)} audio files, Whisper {args.tier}, {os.cpu_count()} CPUs", flush=True)
+
+    # The first int8 run converts the models; run it before timing so the
+    # reported load time is the cached one
+    results = {'fp32': measure('fp32', args)}
+    measure('int8', args)
+    results['int8'] = measure('int8', args)
+
+    print(f"{'variant':>8} {'model':>8} {'load (s)':>9} {'model MB':>9} {'peak RSS':>9} "
+          f"{'p50 (s)':>8} {'RTF':>7} {'drift':>7}")
+    for variant, result in results.items():
+        if 'whisper' in args.models:
+            reference = results['fp32']['transcripts']
+            errors = sum(word_errors(words(ref), words(hyp)) for ref, hyp in zip(reference, result['transcripts']))
+            total = sum(len(words(ref)) for ref in reference)
+            result['whisper_wer_vs_fp32'] = round(errors / total, 4) if total else 0.0
+            print(f"{variant:>8} {'whisper':>8} {result['whisper_load_seconds']:>9.2f} "
+                  f"{result['whisper_model_mb']:>9.0f} {result['peak_rss_mb']:>9.0f} "
+                  f"{median(result['whisper_seconds']):>8.2f} {result['whisper_rtf']:>7.3f} "
+                  f"{result['whisper_wer_vs_fp32']:>7.2%}")
+        if 'gpt2' in args.models:
+            reference = results['fp32']['titles']
+            changed = sum(ref != titles for ref, titles in zip(reference, result['titles']))
+            result['gpt2_changed_vs_fp32'] = round(changed / len(reference), 4)
+            print(f"{variant:>8} {'gpt2':>8} {result['gpt2_load_seconds']:>9.2f} "
+                  f"{result['gpt2_model_mb']:>9.0f} {result['peak_rss_mb']:>9.0f} "
+                  f"{median(result['gpt2_seconds']):>8.2f} {'':>7} {result['gpt2_changed_vs_fp32']:>7.0%}")
+
+    print("drift: word error rate of the int8 transcripts against fp32; share of changed title lists for GPT-2")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""
+End-to-end load test with stub models.
+
+For every server configuration this starts the app on a free local port
+with STUB_MODELS enabled, drives /api/transcribe/ and /api/suggest-titles/
+from concurrent clients for a fixed time and reports throughput, latency
+percentiles, 429 rejections and the peak resident memory of the server
+process tree. Nothing leaves the machine and no model is downloaded.
+
+    python -m benchmarks.loadtest --configs sync:workers=1 gthread:workers=2,threads=4 asgi:workers=2 \\
+        --concurrency 8 --duration 60 --output loadtest.json
+
+Configurations are `<kind>:<key>=<value>,...` with kind one of
+  sync     gunicorn sync workers (workers=N)
+  gthread  gunicorn threaded workers (workers=N, threads=N)
+  asgi     gunicorn with uvicorn workers (workers=N)
+  uvicorn  python -m darwix_ai.serve (workers=N)
+  runserver  Django's threaded development server, for a quick check
+The stub latency and memory are set with the STUB_* variables described in
+darwix_ai/settings.py; --env passes extra variables to the server. The
+server runs with DEBUG=1 so plain HTTP is not redirected to HTTPS, and with
+the result cache disabled so every request reaches the models. With
+--model-server the models run in one `manage.py model_server` process whose
+memory is included in the peak RSS.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+import psutil
+
+from .synthetic import make_transcript_text, make_wav_bytes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_COMMANDS = {
+    'sync': ['gunicorn', 'darwix_ai.wsgi:application', '--workers', '{workers}', '--worker-class', 'sync',
+             '--timeout', '600'],
+    'gthread': ['gunicorn', 'darwix_ai.wsgi:application', '--workers', '{workers}', '--threads', '{threads}',
+                '--worker-class', 'gthread', '--timeout', '600'],
+    'asgi': ['gunicorn', 'darwix_ai.asgi:application', '--workers', '{workers}',
+             '--worker-class', 'uvicorn.workers.UvicornWorker', '--timeout', '600'],
+    'uvicorn': [sys.executable, '-m', 'darwix_ai.serve', '--workers', '{workers}', '--log-level', 'warning'],
+    'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload'],
+}
+DEFAULT_OPTIONS = {'workers': '1', 'threads': '4'}
+
+
+def parse_config(spec):
+    """Parse `gthread:workers=2,threads=4` into (kind, options)."""
+    kind, _, rest = spec.partition(':')
+    if kind not in SERVER_COMMANDS:
+        raise SystemExit(f"Unknown server kind '{kind}', expected one of {', '.join(SERVER_COMMANDS)}")
+    options = dict(DEFAULT_OPTIONS)
+    for pair in filter(None, rest.split(',')):
+        key, _, value = pair.partition('=')
+        options[key.strip()] = value.strip()
+    return kind, options
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, options, port, extra_env):
+    command = [part.format(**options) for part in SERVER_COMMANDS[kind]]
+    if kind == 'runserver':
+        command.append(f'127.0.0.1:{port}')
+    elif kind == 'uvicorn':
+        command += ['--host', '127.0.0.1', '--port', str(port)]
+    else:
+        command += ['--bind', f'127.0.0.1:{port}']
+    env = {
+        **os.environ,
+        'DEBUG': '1',
+        'STUB_MODELS': '1',
+        'WARM_MODELS': '1',
+        'TRANSCRIPTION_CACHE_ENABLED': '0',
+        'TITLE_CACHE_ENABLED': '0',
+        **extra_env,
+    }
+    return subprocess.Popen(
+        command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def start_model_server(socket_path, extra_env):
+    env = {**os.environ, 'DEBUG': '1', 'STUB_MODELS': '1', **extra_env}
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', 'model_server', '--socket', socket_path],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    deadline = time.monotonic() + 120
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            stop_server(process)
+            raise RuntimeError("Model server did not start")
+        time.sleep(0.2)
+    return process
+
+
+def wait_until_healthy(base_url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode} during startup")
+        try:
+            with urllib.request.urlopen(f'{base_url}/api/health/', timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server did not become healthy within {timeout}s")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+class RssSampler(threading.Thread):
+    """Track the peak summed RSS of some processes and their children."""
+
+    def __init__(self, pids, interval=0.1):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.peak_bytes = 0
+        self._done = threading.Event()
+
+    def run(self):
+        try:
+            roots = [psutil.Process(pid) for pid in self.pids]
+        except psutil.NoSuchProcess:
+            return
+        while not self._done.is_set():
+            total = 0
+            try:
+                for root in roots:
+                    for process in [root] + root.children(recursive=True):
+                        try:
+                            total += process.memory_info().rss
+                        except psutil.NoSuchProcess:
+                            pass
+            except psutil.NoSuchProcess:
+                return
+            self.peak_bytes = max(self.peak_bytes, total)
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def multipart_body(fields, files):
+    """Encode form fields and (name, filename, content_type, bytes) files as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, filename, content_type, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Workload:
+    """Pre-built requests for both endpoints, so the clients only send bytes."""
+
+    def __init__(self, base_url, audio_seconds, num_files, text_sentences, mix):
+        self.base_url = base_url
+        self.transcribe_bodies = [
+            multipart_body({}, [('audio_file', f'load_{seed}.wav', 'audio/wav', make_wav_bytes(audio_seconds, seed=seed))])
+            for seed in range(num_files)
+        ]
+        self.title_bodies = [
+            json.dumps({'content': make_transcript_text(text_sentences, seed=seed)}).encode()
+            for seed in range(num_files)
+        ]
+        self.schedule = [endpoint for endpoint, weight in mix.items() for _ in range(weight)]
+
+    def request(self, rng):
+        endpoint = rng.choice(self.schedule)
+        if endpoint == 'transcribe':
+            body, content_type = rng.choice(self.transcribe_bodies)
+            return endpoint, urllib.request.Request(
+                f'{self.base_url}/api/transcribe/', data=body, headers={'Content-Type': content_type}
+            )
+        return endpoint, urllib.request.Request(
+            f'{self.base_url}/api/suggest-titles/', data=rng.choice(self.title_bodies),
+            headers={'Content-Type': 'application/json'},
+        )
+
+
+def send(request, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def drive(workload, concurrency, duration, timeout, seed=0):
+    """Send requests from `concurrency` threads for `duration` seconds; return (endpoint, status, latency) records."""
+    records = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            endpoint, request = workload.request(rng)
+            status, latency = send(request, timeout)
+            with lock:
+                records.append((endpoint, status, latency))
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def summarize(records, wall_seconds):
+    def latency_stats(latencies):
+        if not latencies:
+            return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        return {'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'p99_ms': round(p99, 1)}
+
+    summary = {}
+    for endpoint in sorted({record[0] for record in records}) + ['all']:
+        selected = [r for r in records if endpoint == 'all' or r[0] == endpoint]
+        ok = [latency for _, status, latency in selected if status == 200]
+        summary[endpoint] = {
+            'requests': len(selected),
+            'ok': len(ok),
+            'rejected_429': sum(1 for _, status, _ in selected if status == 429),
+            'errors': sum(1 for _, status, _ in selected if status not in (200, 429)),
+            'throughput_rps': round(len(ok) / wall_seconds, 2),
+            **latency_stats(ok),
+        }
+    return summary
+
+
+def run_config(spec, args, extra_env):
+    kind, options = parse_config(spec)
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    print(f"\n== {spec} on port {port}", flush=True)
+
+    processes = []
+    if args.model_server:
+        # One process owns the models and the web workers load none
+        socket_path = os.path.join(tempfile.mkdtemp(), 'models.sock')
+        processes.append(start_model_server(socket_path, extra_env))
+        extra_env = {**extra_env, 'MODEL_SERVER_SOCKET': socket_path}
+    try:
+        process = start_server(kind, options, port, extra_env)
+        processes.append(process)
+        wait_until_healthy(base_url, process)
+        workload = Workload(base_url, args.audio_seconds, args.distinct_files, args.text_sentences, args.mix)
+        if args.warmup:
+            drive(workload, args.concurrency, args.warmup, args.timeout, seed=1)
+
+        sampler = RssSampler([p.pid for p in processes])
+        sampler.start()
+        started = time.monotonic()
+        records = drive(workload, args.concurrency, args.duration, args.timeout)
+        wall_seconds = time.monotonic() - started
+        sampler.stop()
+    finally:
+        for p in reversed(processes):
+            stop_server(p)
+
+    return {
+        'config': spec + (' +model-server' if args.model_server else ''),
+        'kind': kind,
+        'options': options,
+        'concurrency': args.concurrency,
+        'duration_seconds': round(wall_seconds, 2),
+        'peak_rss_mb': round(sampler.peak_bytes / (1024 * 1024), 1),
+        'endpoints': summarize(records, wall_seconds),
+    }
+
+
+def print_table(results):
+    print(f"\n{'config':<32} {'endpoint':<12} {'ok/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'429':>5} {'err':>5} {'peak RSS MB':>12}")
+    for result in results:
+        for endpoint, stats in result['endpoints'].items():
+            def fmt(value):
+                return '-' if value is None else f'{value:.0f}'
+            print(
+                f"{result['config']:<32} {endpoint:<12} {stats['throughput_rps']:>7.2f} {fmt(stats['p50_ms']):>8} "
+                f"{fmt(stats['p95_ms']):>8} {fmt(stats['p99_ms']):>8} {stats['rejected_429']:>5} "
+                f"{stats['errors']:>5} {result['peak_rss_mb'] if endpoint == 'all' else '':>12}"
+            )
+
+
+def parse_mix(value):
+    mix = {}
+    for pair in value.split(','):
+        endpoint, _, weight = pair.partition('=')
+        if endpoint not in ('transcribe', 'titles'):
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{endpoint}' in --mix")
+        mix[endpoint] = int(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', default=['sync:workers=1', 'gthread:workers=2,threads=4'])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds before each run')
+    parser.add_argument('--timeout', type=float, default=300, help='per-request timeout in seconds')
+    parser.add_argument('--mix', type=parse_mix, default={'transcribe': 1, 'titles': 1},
+                        help='endpoint weights, e.g. transcribe=3,titles=1')
+    parser.add_argument('--audio-seconds', type=float, default=30)
+    parser.add_argument('--distinct-files', type=int, default=8)
+    parser.add_argument('--text-sentences', type=int, default=20)
+    parser.add_argument('--env', nargs='*', default=[], metavar='KEY=VALUE',
+                        help='extra environment for the server, e.g. STUB_MODEL_WORK=cpu ADMISSION_MAX_QUEUE=8')
+    parser.add_argument('--model-server', action='store_true',
+                        help='run the models in a separate model_server process shared by the web workers')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    extra_env = dict(pair.split('=', 1) for pair in args.env)
+    results = [run_config(spec, args, extra_env) for spec in args.configs]
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'env': extra_env, 'results': results},
+                      f, indent=2)
+        print(f"\nWrote results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
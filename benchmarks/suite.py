@@ -0,0 +1,210 @@
+"""
+Micro-benchmarks for the transcription post-processing hot paths.
+
+Runs clean_text, merge_overlapping_segments, align_segments (both
+attachment modes) and format_timestamp on synthetic data from 10 to 100k
+segments, and keyword_titles on texts of as many sentences. Nothing is
+downloaded and no model is loaded. Results can be written as JSON and
+compared against a run from another commit:
+
+    python -m benchmarks.suite --output before.json
+    git checkout my-branch
+    python -m benchmarks.suite --output after.json --compare before.json
+
+With --fail-above the command exits non-zero when any benchmark is slower
+than the baseline by more than that factor, so it can gate CI.
+"""
+import argparse
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from ai_features.segments import align_segments, clean_text, format_timestamp, merge_overlapping_segments
+from ai_features.titles import keyword_titles
+
+from .synthetic import make_aligned_segments, make_transcript_text, make_turns, make_whisper_segments
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+# Each benchmark maps a size to a `prepare` callable. `prepare` returns the
+# zero-argument function that is timed, so inputs the function mutates can
+# be rebuilt outside the timed region.
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark('clean_text')
+def _clean_text(size):
+    text = make_transcript_text(size)
+    return lambda: lambda: clean_text(text)
+
+
+@benchmark('merge_overlapping_segments')
+def _merge_overlapping_segments(size):
+    segments = make_aligned_segments(size, run_length=20)
+
+    def prepare():
+        # Merging updates the open segment in place
+        data = copy.deepcopy(segments)
+        return lambda: merge_overlapping_segments(data)
+    return prepare
+
+
+@benchmark('align_segments')
+def _align_segments(size):
+    whisper_segments = make_whisper_segments(size)
+    turns = make_turns(size, duration=whisper_segments[-1]['end'])
+    return lambda: lambda: align_segments(turns, whisper_segments)
+
+
+@benchmark('align_segments_split')
+def _align_segments_split(size):
+    whisper_segments = make_whisper_segments(size)
+    turns = make_turns(size, duration=whisper_segments[-1]['end'])
+    return lambda: lambda: align_segments(turns, whisper_segments, split_by_overlap=True)
+
+
+@benchmark('format_timestamp')
+def _format_timestamp(size):
+    seconds = [index * 3.217 for index in range(size)]
+    return lambda: lambda: [format_timestamp(value) for value in seconds]
+
+
+@benchmark('keyword_titles')
+def _keyword_titles(size):
+    content = make_transcript_text(size)
+    return lambda: lambda: keyword_titles(content)
+
+
+def measure(prepare, repeat, min_time):
+    """Time the prepared function; return per-call seconds for each of `repeat` rounds.
+
+    Fast functions are called in loops of at least `min_time` seconds so the
+    timer resolution does not dominate.
+    """
+    run = prepare()
+    started = time.perf_counter()
+    run()
+    single = time.perf_counter() - started
+    loops = max(1, min(10000, int(min_time / single) if single > 0 else 10000))
+
+    rounds = []
+    for _ in range(repeat):
+        runs = [prepare() for _ in range(loops)]
+        started = time.perf_counter()
+        for run in runs:
+            run()
+        rounds.append((time.perf_counter() - started) / loops)
+    return rounds, loops
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, sizes, repeat, min_time):
+    results = []
+    for name in names:
+        for size in sizes:
+            rounds, loops = measure(BENCHMARKS[name](size), repeat, min_time)
+            result = {
+                'benchmark': name,
+                'size': size,
+                'best_seconds': min(rounds),
+                'median_seconds': statistics.median(rounds),
+                'loops': loops,
+                'repeat': repeat,
+            }
+            results.append(result)
+            print(
+                f"{name:<28} {size:>8} {result['best_seconds'] * 1e3:>12.4f} "
+                f"{result['best_seconds'] / size * 1e9:>12.1f}",
+                flush=True,
+            )
+    return results
+
+
+def compare(results, baseline_path, fail_above):
+    """Print the ratio to a baseline run; return the regressions above `fail_above`."""
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+
+    print(f"\n{'benchmark':<28} {'size':>8} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['size']))
+        if previous is None:
+            continue
+        ratio = result['best_seconds'] / previous['best_seconds']
+        flag = ''
+        if fail_above and ratio > fail_above:
+            regressions.append((result['benchmark'], result['size'], ratio))
+            flag = '  REGRESSION'
+        print(
+            f"{result['benchmark']:<28} {result['size']:>8} {previous['best_seconds'] * 1e3:>12.4f} "
+            f"{result['best_seconds'] * 1e3:>12.4f} {ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='minimum seconds per timed round; fast calls are looped')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--fail-above', type=float, default=None,
+                        help='exit with status 1 if any benchmark is this many times slower than the baseline')
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<28} {'size':>8} {'best ms':>12} {'ns/item':>12}")
+    results = run_suite(args.benchmarks, args.sizes, args.repeat, args.min_time)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.fail_above)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks regressed by more than {args.fail_above}x")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Synthetic Whisper and pyannote output, and synthetic audio, for the benchmarks.
+
+Everything is generated from a seed, so runs on different commits see the
+same data and no model or audio file is needed.
+"""
+import io
+import random
+
+import numpy as np
+
+WORDS = (
+    "the customer called about an order that arrived late and the agent "
+    "offered a refund while checking the account history for similar issues "
+    "we discussed pricing renewal dates support tickets and the next steps"
+).split()
+
+
+def make_sentence(rng, min_words=4, max_words=14):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))).capitalize()
+
+
+def make_transcript_text(num_sentences, repeat_ratio=0.3, seed=0):
+    """Return text of `num_sentences` sentences where about `repeat_ratio` repeat earlier ones.
+
+    Repeats differ in case and spacing, as Whisper output overlapping a
+    diarization boundary does, so clean_text has to normalize them.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        if sentences and rng.random() < repeat_ratio:
+            repeated = rng.choice(sentences)
+            sentences.append(repeated.upper() if rng.random() < 0.5 else '  '.join(repeated.split()))
+        else:
+            sentences.append(make_sentence(rng))
+    return '. '.join(sentences) + '.'
+
+
+def make_whisper_segments(count, seed=0):
+    """Return `count` back-to-back Whisper segment dicts of 1-6 seconds each."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    for index in range(count):
+        end = start + rng.uniform(1.0, 6.0)
+        segments.append({
+            "id": index,
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "text": " " + make_sentence(rng) + ".",
+        })
+        start = end + rng.uniform(0.0, 0.5)
+    return segments
+
+
+def make_turns(count, duration, num_speakers=3, overlap_ratio=0.1, seed=0):
+    """Return `count` diarization turns covering `duration` seconds.
+
+    Turns are (start, end, label) tuples in start order, as pyannote's
+    itertracks yields them. About `overlap_ratio` of them overlap the
+    previous turn, like crosstalk.
+    """
+    rng = random.Random(seed)
+    boundaries = sorted(rng.uniform(0.0, duration) for _ in range(count - 1))
+    edges = [0.0] + boundaries + [duration]
+    turns = []
+    speaker = 0
+    for start, end in zip(edges[:-1], edges[1:]):
+        if rng.random() < overlap_ratio and turns:
+            start = max(0.0, start - rng.uniform(0.2, 1.5))
+        speaker = (speaker + rng.randint(1, num_speakers - 1)) % num_speakers
+        turns.append((start, max(end, start + 0.05), f"SPEAKER_{speaker:02d}"))
+    return turns
+
+
+def make_aligned_segments(count, run_length, seed=0):
+    """Build `count` aligned speaker segments in same-speaker runs of about `run_length`."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    speaker = 0
+    for index in range(count):
+        if index % run_length == 0:
+            speaker = 1 - speaker
+            start += 1.5
+        duration = rng.uniform(1.0, 4.0)
+        segments.append({
+            "speaker": f"Speaker {speaker}",
+            "text": f"Sentence number {index} is here. It repeats sometimes {index % 7}",
+            "start": round(start, 2),
+            "end": round(start + duration, 2),
+            "time": "",
+        })
+        start += duration + 0.2
+    return segments
+
+
+def make_audio(seconds, sr=16000, seed=0):
+    """Return a float32 waveform of speech-like bursts separated by pauses.
+
+    Bursts are harmonic tones with a wandering pitch and a syllable-rate
+    amplitude envelope; pauses hold a faint noise floor. That is enough
+    structure for the VAD and the silence-based chunking to behave as they
+    do on recordings.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sr)
+    audio = (rng.standard_normal(total) * 0.002).astype(np.float32)
+
+    position = int(rng.uniform(0.1, 0.5) * sr)
+    while position < total:
+        length = min(int(rng.uniform(0.5, 3.0) * sr), total - position)
+        t = np.arange(length) / sr
+        pitch = rng.uniform(90, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sr
+        voice = sum(np.sin(phase * harmonic) / harmonic for harmonic in range(1, 6))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * rng.uniform(3, 6) * t))
+        audio[position:position + length] += (0.15 * voice * envelope).astype(np.float32)
+        position += length + int(rng.uniform(0.2, 1.5) * sr)
+
+    return np.clip(audio, -1.0, 1.0)
+
+
+def make_wav_bytes(seconds, sr=16000, seed=0):
+    """Return make_audio() encoded as a 16-bit PCM WAV file."""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, make_audio(seconds, sr, seed), sr, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
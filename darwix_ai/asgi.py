@@ -2,6 +2,9 @@
 ASGI config for darwix_ai project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Under ASGI the inference endpoints are served by the async views unless
+ASYNC_VIEWS is set to 0; run it with ``python -m darwix_ai.serve`` or with
+Gunicorn's uvicorn worker (see darwix_ai/serve.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -12,5 +15,20 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "darwix_ai.settings")
+os.environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.ASYNC_VIEWS:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+    from django.views import static
+
+    class CollectedStaticFilesHandler(ASGIStaticFilesHandler):
+        """Serve STATIC_ROOT, including the hashed names of the manifest storage, in place of WhiteNoise."""
+
+        def serve(self, request):
+            return static.serve(request, self.file_path(request.path), document_root=settings.STATIC_ROOT)
+
+    application = CollectedStaticFilesHandler(application)
@@ -0,0 +1,40 @@
+"""
+ASGI server entry point.
+
+    python -m darwix_ai.serve --port 8000 --workers 2
+
+Runs darwix_ai.asgi:application under uvicorn, which serves the inference
+endpoints with the async views. Each uvicorn worker is a separate process
+that loads its own models. To have workers share models preloaded by the
+master process (WARM_MODELS), run Gunicorn with uvicorn workers instead;
+gunicorn.conf.py applies there as well:
+
+    gunicorn darwix_ai.asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '1')))
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(
+        'darwix_ai.asgi:application',
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        # Django does not implement the lifespan protocol
+        lifespan='off',
+    )
+
+
+if __name__ == '__main__':
+    main()
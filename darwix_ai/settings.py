@@ -158,7 +158,9 @@ CORS_ALLOW_ALL_ORIGINS = False  # Explicitly disable wildcard
 CORS_ALLOWED_ORIGIN_REGEXES = []
 
 # File upload settings
+# Audio uploads are spooled to disk, hashed and validated as they arrive
 FILE_UPLOAD_HANDLERS = [
+    'ai_features.uploads.AudioUploadHandler',
     'django.core.files.uploadhandler.MemoryFileUploadHandler',
     'django.core.files.uploadhandler.TemporaryFileUploadHandler',
 ]
@@ -176,6 +178,170 @@ REST_FRAMEWORK = {
     ],
 }
 
+# AI model settings
+# Load Whisper, pyannote and GPT-2 when the app starts instead of on the first request
+WARM_MODELS = os.getenv('WARM_MODELS', '0').lower() in ['true', 't', '1']
+# Comma separated registry names to warm up; empty means pyannote, gpt2 and the default Whisper tier
+WARM_MODEL_NAMES = [name.strip() for name in os.getenv('WARM_MODEL_NAMES', '').split(',') if name.strip()]
+
+# Whisper tiers a request may pick with the `model` option, and the tier used without it
+WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+WHISPER_MODEL_TIERS = [name.strip() for name in os.getenv('WHISPER_MODEL_TIERS', 'tiny,base,small').split(',') if name.strip()]
+if WHISPER_MODEL not in WHISPER_MODEL_TIERS:
+    WHISPER_MODEL_TIERS.insert(0, WHISPER_MODEL)
+# Memory the loaded models may use in MB before the least recently used
+# Whisper tier is unloaded to make room for another one; 0 means unlimited
+MODEL_MEMORY_BUDGET_MB = int(os.getenv('MODEL_MEMORY_BUDGET_MB', '0'))
+
+# Run the listed models (`whisper`, `gpt2`) with int8 dynamically quantized
+# linear layers on CPU; the converted models are cached in QUANTIZED_MODEL_DIR
+QUANTIZED_MODELS = [name.strip() for name in os.getenv('QUANTIZED_MODELS', '').split(',') if name.strip()]
+QUANTIZED_MODEL_DIR = os.getenv('QUANTIZED_MODEL_DIR', os.path.join(BASE_DIR, 'model_cache'))
+
+# Run Whisper and pyannote diarization concurrently. The CPU cores are split
+# between the two stages so they don't oversubscribe the machine.
+TRANSCRIPTION_PARALLEL_STAGES = os.getenv('TRANSCRIPTION_PARALLEL_STAGES', '0').lower() in ['true', 't', '1']
+CPU_COUNT = os.cpu_count() or 2
+TRANSCRIPTION_DIARIZATION_THREADS = int(os.getenv('TRANSCRIPTION_DIARIZATION_THREADS', str(max(1, CPU_COUNT // 2))))
+TRANSCRIPTION_WHISPER_THREADS = int(os.getenv('TRANSCRIPTION_WHISPER_THREADS', str(max(1, CPU_COUNT - CPU_COUNT // 2))))
+
+# Divide a Whisper segment's words between the speaker turns it overlaps
+# instead of attaching the whole segment to each of them
+TRANSCRIPTION_SPLIT_SEGMENTS = os.getenv('TRANSCRIPTION_SPLIT_SEGMENTS', '0').lower() in ['true', 't', '1']
+
+# Energy-based silence skipping before Whisper and diarization; aggressiveness
+# runs from 0 (keep quiet speech) to 3 (drop everything near the noise floor)
+TRANSCRIPTION_VAD = os.getenv('TRANSCRIPTION_VAD', '0').lower() in ['true', 't', '1']
+TRANSCRIPTION_VAD_AGGRESSIVENESS = min(max(int(os.getenv('TRANSCRIPTION_VAD_AGGRESSIVENESS', '1')), 0), 3)
+
+# Title generation
+# Token budget for each generated title; generation also stops at the first newline
+TITLE_MAX_NEW_TOKENS = int(os.getenv('TITLE_MAX_NEW_TOKENS', '24'))
+# Merge concurrent title requests arriving within this window into one GPT-2 batch (0 disables)
+TITLE_MICROBATCH_WINDOW_MS = float(os.getenv('TITLE_MICROBATCH_WINDOW_MS', '0'))
+TITLE_MICROBATCH_MAX_PROMPTS = int(os.getenv('TITLE_MICROBATCH_MAX_PROMPTS', '24'))
+
+# Chunked transcription of long recordings across worker processes (0 workers disables it)
+TRANSCRIPTION_CHUNKED_WORKERS = int(os.getenv('TRANSCRIPTION_CHUNKED_WORKERS', '0'))
+TRANSCRIPTION_CHUNKED_MIN_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNKED_MIN_SECONDS', '600'))
+TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_SECONDS', '300'))
+TRANSCRIPTION_CHUNK_WORKER_THREADS = int(os.getenv('TRANSCRIPTION_CHUNK_WORKER_THREADS', str(max(1, CPU_COUNT // max(1, TRANSCRIPTION_CHUNKED_WORKERS)))))
+# Minimum cosine similarity for two chunks' speakers to be treated as the same person
+TRANSCRIPTION_CHUNK_SPEAKER_THRESHOLD = float(os.getenv('TRANSCRIPTION_CHUNK_SPEAKER_THRESHOLD', '0.5'))
+
+# Model server: with a socket path set, the web workers send model calls to
+# `python manage.py model_server` listening there instead of loading the
+# models themselves. Run both with the same settings.
+MODEL_SERVER_SOCKET = os.getenv('MODEL_SERVER_SOCKET', '')
+
+# Admission control: concurrent calls per model in each process, and how
+# many callers may wait for a slot before requests are answered with 429
+ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', '1').lower() in ['true', 't', '1']
+ADMISSION_SLOTS = {
+    'whisper': int(os.getenv('ADMISSION_WHISPER_SLOTS', '1')),
+    'pyannote': int(os.getenv('ADMISSION_PYANNOTE_SLOTS', '1')),
+    'gpt2': int(os.getenv('ADMISSION_GPT2_SLOTS', '1')),
+}
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '4'))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', '60'))
+
+# Async inference views, switched on by the ASGI entry point (darwix_ai/asgi.py).
+# Model calls run in a thread pool per endpoint; once ASYNC_INFERENCE_MAX_PENDING
+# calls of a pool are queued or running, requests get 429.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '0').lower() in ['true', 't', '1']
+ASYNC_INFERENCE_WORKERS = {
+    'transcription': int(os.getenv('ASYNC_TRANSCRIPTION_WORKERS', '2')),
+    # Concurrent title requests are what the micro-batcher merges
+    'titles': int(os.getenv('ASYNC_TITLE_WORKERS', '4')),
+}
+ASYNC_INFERENCE_MAX_PENDING = int(os.getenv('ASYNC_INFERENCE_MAX_PENDING', '256'))
+if ASYNC_VIEWS:
+    # WhiteNoise's middleware is sync-only and would hold a thread for every
+    # request; asgi.py serves static files with Django's async handler instead
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
+# Request profiling: requests with an X-Profile header, or a random
+# PROFILING_SAMPLE_RATE share of them, are profiled and kept on disk
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0').lower() in ['true', 't', '1']
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '50'))
+
+# Load testing: replace Whisper, pyannote and GPT-2 with deterministic stubs
+# that hold the given memory and spend the given time (sleeping, or busy on
+# a core with STUB_MODEL_WORK=cpu). See benchmarks/loadtest.py.
+STUB_MODELS = os.getenv('STUB_MODELS', '0').lower() in ['true', 't', '1']
+STUB_MODEL_WORK = os.getenv('STUB_MODEL_WORK', 'sleep')
+STUB_MODEL_PROFILES = {
+    'whisper': {
+        'seconds_per_audio_second': float(os.getenv('STUB_WHISPER_SECONDS_PER_AUDIO_SECOND', '0.1')),
+        'memory_mb': int(os.getenv('STUB_WHISPER_MEMORY_MB', '300')),
+    },
+    'pyannote': {
+        'seconds_per_audio_second': float(os.getenv('STUB_PYANNOTE_SECONDS_PER_AUDIO_SECOND', '0.05')),
+        'memory_mb': int(os.getenv('STUB_PYANNOTE_MEMORY_MB', '100')),
+    },
+    'gpt2': {
+        'seconds_per_call': float(os.getenv('STUB_GPT2_SECONDS_PER_CALL', '0.3')),
+        'memory_mb': int(os.getenv('STUB_GPT2_MEMORY_MB', '500')),
+    },
+}
+
+# Largest audio upload accepted outside streaming mode
+TRANSCRIPTION_MAX_UPLOAD_MB = int(os.getenv('TRANSCRIPTION_MAX_UPLOAD_MB', '10'))
+
+# Streaming transcription (mode=stream)
+TRANSCRIPTION_STREAM_WINDOW_SECONDS = float(os.getenv('TRANSCRIPTION_STREAM_WINDOW_SECONDS', '30'))
+TRANSCRIPTION_STREAM_MAX_UPLOAD_MB = int(os.getenv('TRANSCRIPTION_STREAM_MAX_UPLOAD_MB', '200'))
+
+# Transcription job queue
+# Start a worker pool inside web processes when a job is submitted
+TRANSCRIPTION_JOB_INPROCESS = os.getenv('TRANSCRIPTION_JOB_INPROCESS', '1').lower() in ['true', 't', '1']
+TRANSCRIPTION_JOB_WORKERS = int(os.getenv('TRANSCRIPTION_JOB_WORKERS', '1'))
+TRANSCRIPTION_JOB_POLL_SECONDS = float(os.getenv('TRANSCRIPTION_JOB_POLL_SECONDS', '2'))
+# Running jobs that have not reported progress for this long are requeued
+TRANSCRIPTION_JOB_STALE_SECONDS = int(os.getenv('TRANSCRIPTION_JOB_STALE_SECONDS', '3600'))
+TRANSCRIPTION_JOB_KEEP_AUDIO = os.getenv('TRANSCRIPTION_JOB_KEEP_AUDIO', '0').lower() in ['true', 't', '1']
+
+# Transcription result cache, keyed on the SHA-256 of the uploaded audio
+TRANSCRIPTION_CACHE_ENABLED = os.getenv('TRANSCRIPTION_CACHE_ENABLED', '1').lower() in ['true', 't', '1']
+TRANSCRIPTION_CACHE_MAX_MB = int(os.getenv('TRANSCRIPTION_CACHE_MAX_MB', '256'))
+# Entries of model versions this process doesn't produce are deleted after this long unused
+TRANSCRIPTION_CACHE_STALE_DAYS = int(os.getenv('TRANSCRIPTION_CACHE_STALE_DAYS', '7'))
+
+# Save the results of inline and streaming transcriptions for /api/transcriptions/;
+# job mode always keeps them
+TRANSCRIPTION_HISTORY_ENABLED = os.getenv('TRANSCRIPTION_HISTORY_ENABLED', '1').lower() in ['true', 't', '1']
+
+# Title suggestion cache, keyed on the normalized content and the generation
+# parameters. The local-memory backend is per process and evicts the least
+# recently used entries past TITLE_CACHE_MAX_ENTRIES; with TITLE_CACHE_REDIS_URL
+# all workers share one cache and Redis' maxmemory policy bounds its size.
+TITLE_CACHE_ENABLED = os.getenv('TITLE_CACHE_ENABLED', '1').lower() in ['true', 't', '1']
+TITLE_CACHE_TTL_SECONDS = int(os.getenv('TITLE_CACHE_TTL_SECONDS', '86400'))
+TITLE_CACHE_MAX_ENTRIES = int(os.getenv('TITLE_CACHE_MAX_ENTRIES', '5000'))
+TITLE_CACHE_REDIS_URL = os.getenv('TITLE_CACHE_REDIS_URL', '')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'titles': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'titles',
+        'TIMEOUT': TITLE_CACHE_TTL_SECONDS,
+        'OPTIONS': {'MAX_ENTRIES': TITLE_CACHE_MAX_ENTRIES},
+        'KEY_PREFIX': 'darwix',
+    },
+}
+if TITLE_CACHE_REDIS_URL:
+    CACHES['titles'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TITLE_CACHE_REDIS_URL,
+        'TIMEOUT': TITLE_CACHE_TTL_SECONDS,
+        'KEY_PREFIX': 'darwix',
+    }
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for darwix_ai.
+
+Gunicorn reads this file automatically from the working directory. With
+WARM_MODELS enabled the app is preloaded in the master process, so
+AppConfig.ready loads the models once and forked workers share them
+copy-on-write instead of each loading their own copy.
+"""
+
+import os
+
+warm_models = os.getenv('WARM_MODELS', '0').lower() in ['true', 't', '1']
+
+preload_app = warm_models
+
+
+def post_fork(server, worker):
+    if warm_models:
+        from ai_features.registry import model_registry
+
+        server.log.info(f"Worker {worker.pid} sharing preloaded models: {model_registry.stats()}")